@@ -52,7 +52,15 @@ INSTALLED_APPS = [
 
 AUTH_USER_MODEL = 'users.User'
 
+# Session user is resolved from cache (users/backends.py)
+AUTHENTICATION_BACKENDS = ['users.backends.CachedModelBackend']
+USER_CACHE_TIMEOUT = env.int('USER_CACHE_TIMEOUT', 60)
+
 MIDDLEWARE = [
+    'core.middleware.MetricsMiddleware',
+    'core.middleware.QueryInstrumentationMiddleware',
+    'core.middleware.AdmissionControlMiddleware',
+    'core.middleware.CompressionMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -104,6 +112,13 @@ DATABASES = {
     }
 }
 
+# Shared cache of all web and job worker processes (e.g. redis://redis:6379/1):
+# user cache, similar listings and co-favorites invalidation, index generation.
+# Required unless DEBUG, per-process memory cache would serve stale data to other workers
+CACHES = {
+    'default': env.cache_url('CACHE_URL', default='locmemcache://' if DEBUG else Env.NOTSET),
+}
+
 
 # Password validation
 # https://docs.djangoproject.com/en/6.0/ref/settings/#auth-password-validators
@@ -124,6 +139,11 @@ AUTH_PASSWORD_VALIDATORS = [
 ]
 
 REST_FRAMEWORK = {
+    'DEFAULT_AUTHENTICATION_CLASSES': [
+        'users.authentication.SignedTokenAuthentication',
+        'rest_framework.authentication.SessionAuthentication',
+        'rest_framework.authentication.BasicAuthentication',
+    ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticatedOrReadOnly',
     ],
@@ -132,9 +152,156 @@ REST_FRAMEWORK = {
         'rest_framework.filters.SearchFilter',
         'rest_framework.filters.OrderingFilter',
     ],
+    'DEFAULT_RENDERER_CLASSES': [
+        'core.renderers.FastJSONRenderer',
+        'core.renderers.MessagePackRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'rest_framework.parsers.JSONParser',
+        'core.renderers.MessagePackParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
+    'DEFAULT_THROTTLE_CLASSES': [
+        'core.throttling.TokenBucketThrottle',
+    ],
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 20,
     'EXCEPTION_HANDLER': 'rest_framework.views.exception_handler',
+    # Reverse proxies in front of the app; anonymous clients are identified (rate limits)
+    # by the X-Forwarded-For address this many hops back, 0 ignores the header (REMOTE_ADDR)
+    'NUM_PROXIES': env.int('NUM_PROXIES', 0),
+}
+
+# Signed access/refresh tokens (users/tokens.py), lifetimes in seconds
+TOKEN_AUTH = {
+    'ACCESS_LIFETIME': env.int('TOKEN_ACCESS_LIFETIME', 60 * 5),
+    'REFRESH_LIFETIME': env.int('TOKEN_REFRESH_LIFETIME', 60 * 60 * 24 * 14),
+    # Revocations of other workers are seen after at most this many seconds
+    'DENYLIST_SYNC_INTERVAL': env.int('TOKEN_DENYLIST_SYNC_INTERVAL', 5),
+}
+
+# Token bucket rate limits per client and endpoint class (core/throttling.py),
+# STORE=shared keeps buckets in a SQLite file shared by workers of the host
+RATE_LIMIT = {
+    'ENABLED': env.bool('RATE_LIMIT_ENABLED', True),
+    'STORE': env.str('RATE_LIMIT_STORE', 'local'),
+    'SHARED_PATH': env.str('RATE_LIMIT_SHARED_PATH', '/tmp/rentalproject/ratelimit.sqlite3'),
+    'RATES': {
+        'read': env.str('RATE_LIMIT_READ', '600/min'),
+        'write': env.str('RATE_LIMIT_WRITE', '120/min'),
+        'search': env.str('RATE_LIMIT_SEARCH', '60/min'),
+        'auth': env.str('RATE_LIMIT_AUTH', '10/min'),
+    },
+    # Admission control: max sum of view cost weights in flight per worker
+    'MAX_INFLIGHT_COST': env.int('MAX_INFLIGHT_COST', 20),
+    'RETRY_AFTER': 1,
+}
+
+# Response compression (core/middleware.py), brotli is used when installed
+RESPONSE_COMPRESSION = {
+    'MIN_SIZE': env.int('COMPRESSION_MIN_SIZE', 1024),
+    'GZIP_LEVEL': env.int('COMPRESSION_GZIP_LEVEL', 6),
+    'BROTLI_QUALITY': env.int('COMPRESSION_BROTLI_QUALITY', 4),
+}
+
+# Soft deleted listings, bookings and reviews are purged after retention (purge_deleted command)
+SOFT_DELETE = {
+    'RETENTION_DAYS': env.int('SOFT_DELETE_RETENTION_DAYS', 30),
+    'PURGE_BATCH_SIZE': env.int('SOFT_DELETE_PURGE_BATCH_SIZE', 500),
+}
+
+# Temporary date holds during checkout (bookings/services.py, reap_booking_holds command)
+BOOKING_HOLDS = {
+    'TTL': env.int('BOOKING_HOLD_TTL', 60 * 10),
+    'REAP_BATCH_SIZE': env.int('BOOKING_HOLD_REAP_BATCH_SIZE', 1000),
+}
+
+# Listing delta sync for offline clients (listings/sync.py)
+LISTING_SYNC = {
+    'PAGE_SIZE': env.int('LISTING_SYNC_PAGE_SIZE', 500),
+    'MAX_PAGE_SIZE': 1000,
+    'LAG_SECONDS': env.int('LISTING_SYNC_LAG_SECONDS', 5),
+}
+
+# Transactional outbox relay of domain events (core/outbox.py, relay_outbox command)
+OUTBOX = {
+    'BATCH_SIZE': env.int('OUTBOX_BATCH_SIZE', 100),
+    'POLL_INTERVAL': env.float('OUTBOX_POLL_INTERVAL', 1.0),
+    'MAX_ATTEMPTS': env.int('OUTBOX_MAX_ATTEMPTS', 10),
+    'RETRY_BACKOFF': 2.0,
+    'MAX_BACKOFF': 60 * 10,
+    'RETENTION_HOURS': env.int('OUTBOX_RETENTION_HOURS', 72),
+    'WEBHOOK_URLS': env.list('OUTBOX_WEBHOOK_URLS', default=[]),
+    'WEBHOOK_SECRET': env.str('OUTBOX_WEBHOOK_SECRET', default=''),
+    'WEBHOOK_TIMEOUT': env.float('OUTBOX_WEBHOOK_TIMEOUT', 5.0),
+}
+
+# Database job queue (core/jobs.py, run_jobs command), tasks live in tasks.py of apps
+JOB_QUEUE = {
+    'THREADS': env.int('JOB_QUEUE_THREADS', 4),
+    'PROCESSES': env.int('JOB_QUEUE_PROCESSES', 1),
+    'POLL_INTERVAL': env.float('JOB_QUEUE_POLL_INTERVAL', 1.0),
+    'HOUSEKEEPING_INTERVAL': 5.0,
+    # Running job extends its lease every LEASE_SECONDS / 3 (heartbeat thread),
+    # it is given back to the queue when its worker is silent for longer
+    'LEASE_SECONDS': env.int('JOB_QUEUE_LEASE_SECONDS', 60 * 15),
+    'MAX_ATTEMPTS': env.int('JOB_QUEUE_MAX_ATTEMPTS', 5),
+    'RETRY_BACKOFF': 5.0,
+    'MAX_BACKOFF': 60 * 60,
+    'RETENTION_DAYS': env.int('JOB_QUEUE_RETENTION_DAYS', 7),
+    # name -> task with interval in seconds (and optional kwargs, priority)
+    'PERIODIC': {
+        'reap-booking-holds': {'task': 'bookings.reap_expired_holds', 'interval': 60 * 5},
+        'listing-deletion-jobs': {'task': 'listings.run_deletion_jobs', 'interval': 60 * 60},
+        # Incremental co-favorite updates cover wishlist changes, bookings are picked up by the rebuild
+        'rebuild-co-favorites': {'task': 'users.rebuild_co_favorites', 'interval': 60 * 60 * 24},
+        'purge-finished-jobs': {'task': 'core.purge_finished_jobs', 'interval': 60 * 60 * 24},
+        'purge-revoked-tokens': {'task': 'users.purge_revoked_tokens', 'interval': 60 * 60},
+    },
+}
+
+# Server-sent booking events (bookings/live.py), needs ASGI server (RentalProject/asgi.py)
+BOOKING_EVENTS = {
+    'POLL_INTERVAL': env.float('BOOKING_EVENTS_POLL_INTERVAL', 1.0),
+    'FEED_BATCH_SIZE': 500,
+    'HEARTBEAT': env.int('BOOKING_EVENTS_HEARTBEAT', 20),
+    # Pending events per connection, slower clients get resync event
+    'MAX_PENDING': 100,
+    'MAX_SUBSCRIBERS': env.int('BOOKING_EVENTS_MAX_SUBSCRIBERS', 10000),
+    'MAX_CONNECTION_SECONDS': env.int('BOOKING_EVENTS_MAX_CONNECTION_SECONDS', 60 * 30),
+    'REPLAY_LIMIT': 100,
+    'RETRY_MS': 3000,
+}
+
+# Idempotency-Key responses of booking endpoints (core/idempotency.py)
+IDEMPOTENCY = {
+    'TTL': env.int('IDEMPOTENCY_KEY_TTL', 60 * 60 * 24),
+    'WAIT_TIMEOUT': env.float('IDEMPOTENCY_WAIT_TIMEOUT', 10.0),
+    'POLL_INTERVAL': 0.05,
+}
+
+# Admin changelists of bigger tables are counted from table statistics (core/paginator.py)
+ADMIN_PAGINATION = {
+    'APPROXIMATE_COUNT_THRESHOLD': env.int('ADMIN_APPROXIMATE_COUNT_THRESHOLD', 100000),
+}
+
+# Per request SQL instrumentation (core/middleware.py), off unless enabled explicitly,
+# then only a sample of requests is instrumented
+SQL_INSTRUMENTATION = {
+    'ENABLED': env.bool('SQL_INSTRUMENTATION_ENABLED', False),
+    'SAMPLE_RATE': env.float('SQL_INSTRUMENTATION_SAMPLE_RATE', 0.05),
+    'SLOW_QUERY_MS': env.int('SLOW_QUERY_MS', 100),
+    'DUPLICATE_THRESHOLD': env.int('DUPLICATE_QUERY_THRESHOLD', 3),
+}
+
+# Prometheus metrics (core/metrics.py), set MULTIPROC_DIR when running several workers
+METRICS = {
+    'MULTIPROC_DIR': env.str('METRICS_MULTIPROC_DIR', ''),
+    'FLUSH_INTERVAL': env.int('METRICS_FLUSH_INTERVAL', 5),
+    # Client addresses allowed to scrape /metrics without staff login
+    'ALLOWED_IPS': env.list('METRICS_ALLOWED_IPS', default=['127.0.0.1', '::1']),
 }
 
 MEDIA_URL = '/media/'
@@ -18,11 +18,15 @@ from django.contrib import admin
 from django.urls import path, include
 from django.conf import settings
 from django.conf.urls.static import static
+from core.views import metrics
 urlpatterns = [
     path('admin/', admin.site.urls),
+    path('metrics', metrics, name='metrics'),
     path('api/', include('users.urls')),
     path('api/', include('listings.urls')),
-    path('api/', include('bookings.urls'))
+    path('api/', include('bookings.urls')),
+    path('api/', include('reviews.urls')),
+    path('api/', include('core.urls')),
 ]
 
 if settings.DEBUG:
@@ -1,5 +1,6 @@
 from django.contrib import admin
 from .models import Booking, BookingStatusHistory
+from core.paginator import ApproximateCountPaginator
 
 
 class BookingStatusHistoryInline(admin.TabularInline):
@@ -9,6 +10,9 @@ class BookingStatusHistoryInline(admin.TabularInline):
     readonly_fields = ['history_status', 'comment', 'changed_by', 'created_at']
     can_delete = False
 
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('changed_by')
+
 @admin.register(Booking)
 class BookingAdmin(admin.ModelAdmin):
     """Admin configuration for bookings"""
@@ -20,10 +24,13 @@ class BookingAdmin(admin.ModelAdmin):
     search_fields = ['tenant__username', 'listing__title']
     readonly_fields = ['total_price', 'created_at', 'updated_at']
     inlines = [BookingStatusHistoryInline]
+    raw_id_fields = ['tenant', 'listing']
+    paginator = ApproximateCountPaginator
+    show_full_result_count = False
 
     def get_queryset(self, request):
-        """Optimized queries with related objects"""
-        return super().get_queryset(request).select_related('tenant', 'listing')
+        """Optimized queries with related objects (listing is shown with address city)"""
+        return super().get_queryset(request).select_related('tenant', 'listing__address')
 
 @admin.register(BookingStatusHistory)
 class BookingStatusHistoryAdmin(admin.ModelAdmin):
@@ -31,6 +38,10 @@ class BookingStatusHistoryAdmin(admin.ModelAdmin):
     list_display = ['id', 'booking', 'history_status', 'changed_by', 'created_at']
     list_filter = ['history_status', 'created_at']
     readonly_fields = ['booking', 'history_status', 'comment', 'changed_by', 'created_at']
+    # Booking.__str__ uses listing title
+    list_select_related = ['booking__listing', 'changed_by']
+    paginator = ApproximateCountPaginator
+    show_full_result_count = False
 
     def has_add_permission(self, request):
         """Prevent from manual creation of history records"""
@@ -0,0 +1,128 @@
+from datetime import datetime, timedelta
+
+# Minimal iCalendar (RFC 5545) support for listing calendar sync
+PRODID = '-//RentalProject//Listing calendar//EN'
+MAX_LINE_OCTETS = 75
+
+
+def escape(text):
+    """TEXT value escaping"""
+    return (
+        text.replace('\\', '\\\\').replace(';', '\\;')
+        .replace(',', '\\,').replace('\n', '\\n')
+    )
+
+
+def unescape(text):
+    result, chars = [], iter(text)
+    for char in chars:
+        if char == '\\':
+            char = next(chars, '')
+            result.append('\n' if char in 'nN' else char)
+        else:
+            result.append(char)
+    return ''.join(result)
+
+
+def fold(line):
+    """Split content line to 75 octet parts, continuation lines start with a space"""
+    encoded = line.encode()
+    if len(encoded) <= MAX_LINE_OCTETS:
+        return line
+    parts, start, limit = [], 0, MAX_LINE_OCTETS
+    while start < len(encoded):
+        end = min(start + limit, len(encoded))
+        # Never split UTF-8 sequence
+        while end < len(encoded) and encoded[end] & 0xC0 == 0x80:
+            end -= 1
+        parts.append(encoded[start:end].decode())
+        start, limit = end, MAX_LINE_OCTETS - 1
+    return '\r\n '.join(parts)
+
+
+def format_date(value):
+    return value.strftime('%Y%m%d')
+
+
+def render_calendar(name, events, dtstamp):
+    """
+    VCALENDAR bytes of all-day events (uid, check_in, check_out, summary, status)
+    Output depends only on arguments, so equal data gives equal bytes (strong ETag)
+    """
+    stamp = dtstamp.strftime('%Y%m%dT%H%M%SZ')
+    lines = [
+        'BEGIN:VCALENDAR', 'VERSION:2.0', f'PRODID:{PRODID}',
+        'CALSCALE:GREGORIAN', 'METHOD:PUBLISH', f'X-WR-CALNAME:{escape(name)}',
+    ]
+    for uid, check_in, check_out, summary, status in events:
+        lines += [
+            'BEGIN:VEVENT',
+            f'UID:{uid}',
+            f'DTSTAMP:{stamp}',
+            f'DTSTART;VALUE=DATE:{format_date(check_in)}',
+            f'DTEND;VALUE=DATE:{format_date(check_out)}',
+            f'SUMMARY:{escape(summary)}',
+            f'STATUS:{status}',
+            'TRANSP:OPAQUE',
+            'END:VEVENT',
+        ]
+    lines.append('END:VCALENDAR')
+    return ('\r\n'.join(fold(line) for line in lines) + '\r\n').encode()
+
+
+def unfold(lines):
+    """Content lines of a text stream with continuation lines joined"""
+    current = None
+    for raw in lines:
+        line = raw.rstrip('\r\n')
+        if line[:1] in (' ', '\t') and current is not None:
+            current += line[1:]
+            continue
+        if current:
+            yield current
+        current = line
+    if current:
+        yield current
+
+
+def parse_date(value):
+    """DATE or DATE-TIME value -> date (time part and zone are dropped)"""
+    return datetime.strptime(value[:8], '%Y%m%d').date()
+
+
+def parse_events(lines):
+    """
+    Generator of VEVENTs of a calendar stream, one event in memory at a time:
+    dicts with uid, check_in, check_out, summary and status
+    Events without DTSTART or UID are skipped, missing DTEND means one day
+    """
+    event = None
+    for line in unfold(lines):
+        name, _, value = line.partition(':')
+        name, _, params = name.partition(';')
+        name = name.upper()
+        if name == 'BEGIN' and value.upper() == 'VEVENT':
+            event = {}
+        elif name == 'END' and value.upper() == 'VEVENT':
+            if event and 'uid' in event and 'check_in' in event:
+                event.setdefault('check_out', event['check_in'] + timedelta(days=1))
+                event.setdefault('summary', '')
+                event.setdefault('status', 'CONFIRMED')
+                if event['check_out'] > event['check_in']:
+                    yield event
+            event = None
+        elif event is not None:
+            try:
+                if name == 'UID':
+                    event['uid'] = value.strip()[:255]
+                elif name == 'DTSTART':
+                    event['check_in'] = parse_date(value)
+                elif name == 'DTEND':
+                    event['check_out'] = parse_date(value)
+                elif name == 'SUMMARY':
+                    event['summary'] = unescape(value)[:255]
+                elif name == 'STATUS':
+                    event['status'] = value.strip().upper()
+            except ValueError:
+                # Malformed date, whole event is dropped
+                event = None
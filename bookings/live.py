@@ -0,0 +1,153 @@
+import asyncio
+import json
+import logging
+import time
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q, Max
+from rest_framework.exceptions import APIException
+
+from core.models import OutboxEvent
+from core.pubsub import Broker
+from users.authentication import SignedTokenAuthentication
+
+logger = logging.getLogger(__name__)
+
+# Outbox events pushed to connected tenants and owners
+EVENT_TYPES = ('booking.created', 'booking.status_changed')
+# Ids skipped by the feed are rechecked this long (transactions commit out of id order)
+GAP_TIMEOUT = 10.0
+
+broker = Broker()
+
+
+def user_channel(user_id):
+    return f'user:{user_id}'
+
+
+def encode_event(event_id, event_type, payload):
+    """SSE frame of outbox event, built once and shared by all subscribers"""
+    data = json.dumps(payload, cls=DjangoJSONEncoder, separators=(',', ':'))
+    return event_id, f'id: {event_id}\nevent: {event_type}\ndata: {data}\n\n'.encode()
+
+
+class BookingEventFeed:
+    """
+    Tails booking events of the outbox table (written by BookingService in the transaction
+    of the change) and publishes them to channels of tenant and owner
+    One query per POLL_INTERVAL per process while anyone is connected,
+    however many connections there are
+    """
+    def __init__(self):
+        self.task = None
+        self.last_id = None
+        self.gaps = {}
+
+    def ensure_running(self):
+        if self.task is None or self.task.done():
+            self.task = asyncio.get_running_loop().create_task(self.run())
+
+    @staticmethod
+    def latest_id():
+        return OutboxEvent.objects.aggregate(last_id=Max('id'))['last_id'] or 0
+
+    def fetch(self, batch_size):
+        condition = Q(id__gt=self.last_id)
+        if self.gaps:
+            condition |= Q(id__in=list(self.gaps))
+        return list(
+            OutboxEvent.objects.filter(condition).order_by('id')
+            .values_list('id', 'event_type', 'payload')[:batch_size]
+        )
+
+    def advance(self, rows):
+        """Track skipped ids and move the cursor, returns rows to publish"""
+        now = time.monotonic()
+        for event_id, _, _ in rows:
+            if event_id in self.gaps:
+                del self.gaps[event_id]
+            elif event_id > self.last_id:
+                for missing in range(self.last_id + 1, event_id):
+                    self.gaps[missing] = now
+                self.last_id = event_id
+        self.gaps = {event_id: seen for event_id, seen in self.gaps.items() if now - seen < GAP_TIMEOUT}
+        return [row for row in rows if row[1] in EVENT_TYPES]
+
+    async def run(self):
+        config = settings.BOOKING_EVENTS
+        try:
+            if self.last_id is None:
+                self.last_id = await sync_to_async(self.latest_id, thread_sensitive=False)()
+            while broker.count:
+                try:
+                    rows = await sync_to_async(self.fetch, thread_sensitive=False)(config['FEED_BATCH_SIZE'])
+                except Exception:
+                    logger.exception('Booking event feed query failed')
+                    rows = []
+                for event_id, event_type, payload in self.advance(rows):
+                    message = encode_event(event_id, event_type, payload)
+                    for user_id in {payload.get('tenant_id'), payload.get('owner_id')}:
+                        if user_id:
+                            broker.publish(user_channel(user_id), message)
+                if len(rows) < config['FEED_BATCH_SIZE']:
+                    await asyncio.sleep(config['POLL_INTERVAL'])
+        finally:
+            # Cursor is kept only while the feed runs, idle process starts again from the latest event
+            self.last_id = None
+            self.gaps = {}
+
+
+feed = BookingEventFeed()
+
+
+def authenticate(request):
+    """User of Bearer token or session, None for anonymous requests"""
+    try:
+        result = SignedTokenAuthentication().authenticate(request)
+    except APIException:
+        return None
+    if result is not None:
+        return result[0]
+    user = request.user
+    return user if user.is_authenticated else None
+
+
+def replay(user_id, last_event_id, limit):
+    """Booking events of user after Last-Event-ID (reconnect), None if there are more than limit"""
+    rows = list(
+        OutboxEvent.objects.filter(
+            Q(payload__tenant_id=user_id) | Q(payload__owner_id=user_id),
+            id__gt=last_event_id, event_type__in=EVENT_TYPES
+        ).order_by('id').values_list('id', 'event_type', 'payload')[:limit + 1]
+    )
+    if len(rows) > limit:
+        return None
+    return [encode_event(*row) for row in rows]
+
+
+async def stream(subscription, replayed, resync):
+    """SSE frames: replayed events, live events, heartbeats, until connection lifetime ends"""
+    config = settings.BOOKING_EVENTS
+    # Replayed events can arrive from the feed too
+    replayed_ids = {event_id for event_id, _ in replayed}
+    try:
+        yield f'retry: {config["RETRY_MS"]}\n\n'.encode()
+        if resync:
+            yield b'event: resync\ndata: {}\n\n'
+        for _, frame in replayed:
+            yield frame
+        deadline = time.monotonic() + config['MAX_CONNECTION_SECONDS']
+        while time.monotonic() < deadline:
+            messages, overflowed = await subscription.receive(config['HEARTBEAT'])
+            if overflowed:
+                # Client was too slow, it reloads bookings over REST instead
+                yield b'event: resync\ndata: {}\n\n'
+            if not messages and not overflowed:
+                yield b': ping\n\n'
+            for event_id, frame in messages:
+                if event_id not in replayed_ids:
+                    yield frame
+    finally:
+        broker.unsubscribe(subscription)
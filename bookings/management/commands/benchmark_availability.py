@@ -0,0 +1,95 @@
+import random
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from bookings.models import Booking
+from bookings.services import BookingService
+from core.benchmark import measure, write_results, compare
+from listings.models import Listing
+
+
+class Command(BaseCommand):
+    """
+    Stress benchmark of availability for search result pages:
+    check_availability per listing vs one batch query, and GET /api/bookings/availability/
+    Run against a large dataset (generate_synthetic_data --scale large for millions of bookings)
+    python manage.py benchmark_availability --ids 100 --output bench_availability.json
+    """
+    help = 'Benchmark batch listing availability and save results as JSON'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--ids', type=int, default=100, help='Listings per request (max 100 for endpoint)')
+        parser.add_argument('--nights', type=int, default=3)
+        parser.add_argument('--iterations', type=int, default=100)
+        parser.add_argument('--warmup', type=int, default=5)
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--output', default='bench_availability.json')
+        parser.add_argument('--compare', help='Baseline JSON file to compare with')
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        listing_ids = list(Listing.objects.filter(is_active=True).values_list('id', flat=True)[:options['ids'] * 20])
+        if len(listing_ids) < options['ids']:
+            raise CommandError('Not enough listings, run generate_synthetic_data first')
+        listing_ids = rng.sample(listing_ids, options['ids'])
+
+        today = timezone.now().date()
+        ranges = [
+            today + timedelta(days=rng.randint(1, 180))
+            for _ in range(options['iterations'] + options['warmup'])
+        ]
+        nights = timedelta(days=options['nights'])
+
+        def next_range():
+            check_in = rng.choice(ranges)
+            return check_in, check_in + nights
+
+        listings = list(Listing.objects.filter(id__in=listing_ids))
+
+        def per_listing():
+            check_in, check_out = next_range()
+            return [BookingService.check_availability(listing, check_in, check_out) for listing in listings]
+
+        def batch():
+            check_in, check_out = next_range()
+            return BookingService.available_listing_ids(listing_ids, check_in, check_out)
+
+        client = Client(SERVER_NAME='localhost')
+        path = reverse('booking-availability')
+        ids_csv = ','.join(map(str, listing_ids[:100]))
+
+        def endpoint():
+            check_in, check_out = next_range()
+            return client.get(path, {'listing_ids': ids_csv, 'check_in': check_in, 'check_out': check_out})
+
+        cases = {
+            f'check_availability x{len(listings)}': per_listing,
+            f'available_listing_ids {len(listing_ids)}': batch,
+            f'GET booking-availability {min(len(listing_ids), 100)}': endpoint,
+        }
+
+        results = {}
+        with override_settings(RATE_LIMIT={**settings.RATE_LIMIT, 'ENABLED': False}):
+            for name, func in cases.items():
+                result = measure(func, iterations=options['iterations'], warmup=options['warmup'])
+                results[name] = result
+                self.stdout.write(
+                    f"{name:<40} p50={result['p50_ms']}ms p95={result['p95_ms']}ms "
+                    f"ops={result['rps']} queries={result['queries']}"
+                )
+
+        write_results(
+            options['output'], 'availability', results,
+            iterations=options['iterations'], ids=len(listing_ids), nights=options['nights'],
+            bookings=Booking.objects.count()
+        )
+        self.stdout.write(self.style.SUCCESS(f'Results saved to {options["output"]}'))
+
+        if options['compare']:
+            for name, metric, old, new, change in compare(options['compare'], results):
+                self.stdout.write(f'{name:<40} {metric:<8} {old:>10} -> {new:>10} ({change:+}%)')
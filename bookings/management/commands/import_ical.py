@@ -0,0 +1,40 @@
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from bookings.ical import parse_events
+from bookings.services import CalendarService
+from listings.models import Listing
+
+
+class Command(BaseCommand):
+    """
+    Sync blocked dates of a listing with an external .ics calendar
+    File is read line by line, only changed events are written
+    python manage.py import_ical 42 airbnb.ics --source airbnb
+    """
+    help = 'Import external iCalendar events as blocked date ranges of a listing'
+
+    def add_arguments(self, parser):
+        parser.add_argument('listing_id', type=int)
+        parser.add_argument('path')
+        parser.add_argument('--source', help='Calendar name, defaults to file name without extension')
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        listing = Listing.objects.filter(pk=options['listing_id']).first()
+        if listing is None:
+            raise CommandError(f'Listing {options["listing_id"]} not found')
+
+        path = Path(options['path'])
+        source = options['source'] or path.stem
+        try:
+            with path.open(encoding='utf-8', errors='replace') as calendar:
+                counts = CalendarService.sync_blocks(listing, source, parse_events(calendar), options['batch_size'])
+        except OSError as e:
+            raise CommandError(f'Cannot read {path}: {e}')
+
+        self.stdout.write(self.style.SUCCESS(
+            f"{source}: {counts['created']} created, {counts['updated']} updated, "
+            f"{counts['deleted']} deleted, {counts['unchanged']} unchanged"
+        ))
@@ -0,0 +1,20 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from bookings.services import BookingHoldService
+
+
+class Command(BaseCommand):
+    """
+    Delete expired booking holds in batches (expired holds never block dates,
+    this only keeps booking_holds table small), schedule it with cron
+    python manage.py reap_booking_holds --batch-size 1000
+    """
+    help = 'Delete expired temporary booking holds'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=settings.BOOKING_HOLDS['REAP_BATCH_SIZE'])
+
+    def handle(self, *args, **options):
+        count = BookingHoldService.reap_expired(options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'{count} expired holds deleted'))
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from bookings.services import BookingRollupService
+
+
+class Command(BaseCommand):
+    """
+    Rebuild daily listing rollups from bookings
+    python manage.py rebuild_booking_rollups [--listing 1 --listing 2]
+    """
+    help = 'Recalculate listing_daily_stats table from bookings'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--listing', type=int, action='append', dest='listing_ids',
+                            help='Rebuild only given listing (can be repeated)')
+
+    def handle(self, *args, **options):
+        count = BookingRollupService.rebuild(options['listing_ids'])
+        self.stdout.write(self.style.SUCCESS(f'Rollups rebuilt from {count} bookings'))
@@ -0,0 +1,81 @@
+# Generated by Django 6.0 on 2026-10-19 07:03
+
+from collections import defaultdict
+from datetime import timedelta
+from decimal import Decimal, ROUND_DOWN
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+BATCH_SIZE = 5000
+BOOKED_STATUSES = ('confirmed', 'completed')
+
+
+def rebuild_rollups(apps, schema_editor):
+    """
+    Backfill rollups of existing bookings, same as BookingRollupService.rebuild
+    (historical models, the service uses fields added by later migrations)
+    """
+    Booking = apps.get_model('bookings', 'Booking')
+    ListingDailyStat = apps.get_model('bookings', 'ListingDailyStat')
+
+    def flush(stats):
+        ListingDailyStat.objects.bulk_create([
+            ListingDailyStat(listing_id=listing_id, day=day, **values)
+            for (listing_id, day), values in stats.items()
+        ], batch_size=BATCH_SIZE)
+        stats.clear()
+
+    stats = defaultdict(lambda: defaultdict(int))
+    last_listing_id = None
+    for listing_id, check_in, check_out, total_price, book_status in Booking.objects.order_by(
+        'listing_id'
+    ).values_list('listing_id', 'check_in', 'check_out', 'total_price', 'book_status').iterator(chunk_size=BATCH_SIZE):
+        if listing_id != last_listing_id and len(stats) >= BATCH_SIZE:
+            flush(stats)
+        last_listing_id = listing_id
+
+        nights = (check_out - check_in).days
+        if nights <= 0:
+            continue
+        base = (total_price / nights).quantize(Decimal('0.01'), rounding=ROUND_DOWN)
+        remainder = total_price - base * nights
+        for night in range(nights):
+            values = stats[(listing_id, check_in + timedelta(days=night))]
+            values[f'{book_status}_nights'] += 1
+            if book_status in BOOKED_STATUSES:
+                values['booked_nights'] += 1
+                values['revenue'] += base + (remainder if night == 0 else 0)
+    flush(stats)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookings', '0001_initial'),
+        ('listings', '0002_listingsimilarity'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ListingDailyStat',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('booked_nights', models.PositiveIntegerField(default=0)),
+                ('revenue', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('pending_nights', models.PositiveIntegerField(default=0)),
+                ('rejected_nights', models.PositiveIntegerField(default=0)),
+                ('confirmed_nights', models.PositiveIntegerField(default=0)),
+                ('cancelled_nights', models.PositiveIntegerField(default=0)),
+                ('completed_nights', models.PositiveIntegerField(default=0)),
+                ('listing', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_stats', to='listings.listing')),
+            ],
+            options={
+                'db_table': 'listing_daily_stats',
+                'ordering': ['listing', 'day'],
+                'unique_together': {('listing', 'day')},
+            },
+        ),
+        migrations.RunPython(rebuild_rollups, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 6.0 on 2026-10-19 09:40
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookings', '0002_listingdailystat'),
+        ('listings', '0004_soft_delete'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='booking',
+            name='bookings_listing_f5464a_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='booking',
+            name='bookings_tenant__51b695_idx',
+        ),
+        migrations.AddField(
+            model_name='booking',
+            name='deleted_at',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='Deletion date'),
+        ),
+        migrations.AddIndex(
+            model_name='booking',
+            index=models.Index(fields=['listing', 'deleted_at', 'check_in'], name='bookings_listing_359c06_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='booking',
+            index=models.Index(fields=['tenant', 'deleted_at', '-created_at'], name='bookings_tenant__d50320_idx'),
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 6.0 on 2026-10-19 10:55
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookings', '0003_soft_delete'),
+        ('listings', '0005_listingdeletionjob'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BookingHold',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Creation date')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Update date')),
+                ('check_in', models.DateField()),
+                ('check_out', models.DateField()),
+                ('expires_at', models.DateTimeField()),
+                ('listing', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='holds', to='listings.listing')),
+                ('tenant', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='booking_holds', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'db_table': 'booking_holds',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['listing', 'check_in', 'expires_at'], name='booking_hol_listing_dd3e7a_idx'), models.Index(fields=['expires_at'], name='booking_hol_expires_ebfcc7_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 6.0 on 2026-10-19 11:20
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookings', '0004_bookinghold'),
+        ('listings', '0005_listingdeletionjob'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BlockedDateRange',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Creation date')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Update date')),
+                ('source', models.CharField(max_length=100)),
+                ('uid', models.CharField(max_length=255)),
+                ('check_in', models.DateField()),
+                ('check_out', models.DateField()),
+                ('summary', models.CharField(blank=True, max_length=255)),
+                ('listing', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='blocked_ranges', to='listings.listing')),
+            ],
+            options={
+                'db_table': 'blocked_date_ranges',
+                'ordering': ['check_in'],
+                'indexes': [models.Index(fields=['listing', 'check_in'], name='blocked_dat_listing_044734_idx')],
+                'unique_together': {('listing', 'source', 'uid')},
+            },
+        ),
+    ]
@@ -1,12 +1,12 @@
 from django.db import models
 from django.utils import timezone
 from core.validators import validate_future_date
-from core.mixins import TimestampMixin
+from core.mixins import TimestampMixin, SoftDeleteMixin
 from core.enums import BookingStatus
 from django.core.exceptions import ValidationError
 
 
-class Booking(TimestampMixin):
+class Booking(SoftDeleteMixin, TimestampMixin):
     """Class that represents booking made by a user for specific listing"""
     listing = models.ForeignKey('listings.Listing', on_delete=models.CASCADE, related_name='bookings')
     tenant = models.ForeignKey('users.User', on_delete=models.CASCADE, related_name='bookings')
@@ -20,9 +20,10 @@ class Booking(TimestampMixin):
     class Meta:
         db_table = 'bookings'
         ordering = ['-created_at']
+        # Availability checks and booking lists filter by listing/tenant and deleted_at IS NULL
         indexes = [
-            models.Index(fields=['listing']),
-            models.Index(fields=['tenant']),
+            models.Index(fields=['listing', 'deleted_at', 'check_in']),
+            models.Index(fields=['tenant', 'deleted_at', '-created_at']),
             models.Index(fields=['check_in']),
             models.Index(fields=['book_status']),
         ]
@@ -64,3 +65,75 @@ class BookingStatusHistory(TimestampMixin):
 
     def __str__(self):
         return f'{self.booking.id} - {self.history_status}'
+
+
+class ListingDailyStat(models.Model):
+    """
+    Daily rollup of bookings per listing
+    Every booked night counts on the day it starts, per booking status.
+    Rows are maintained by BookingRollupService
+    """
+    listing = models.ForeignKey('listings.Listing', on_delete=models.CASCADE, related_name='daily_stats')
+    day = models.DateField()
+    booked_nights = models.PositiveIntegerField(default=0)
+    revenue = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    pending_nights = models.PositiveIntegerField(default=0)
+    rejected_nights = models.PositiveIntegerField(default=0)
+    confirmed_nights = models.PositiveIntegerField(default=0)
+    cancelled_nights = models.PositiveIntegerField(default=0)
+    completed_nights = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        db_table = 'listing_daily_stats'
+        ordering = ['listing', 'day']
+        unique_together = ('listing', 'day')
+
+    def __str__(self):
+        return f'{self.listing_id} - {self.day}: {self.booked_nights} nights'
+
+
+class BookingHold(TimestampMixin):
+    """
+    Short-lived reservation of listing dates while tenant finishes checkout
+    Blocks the dates for everyone else until expires_at, turned into a booking by BookingService
+    """
+    listing = models.ForeignKey('listings.Listing', on_delete=models.CASCADE, related_name='holds')
+    tenant = models.ForeignKey('users.User', on_delete=models.CASCADE, related_name='booking_holds')
+    check_in = models.DateField()
+    check_out = models.DateField()
+    expires_at = models.DateTimeField()
+
+    class Meta:
+        db_table = 'booking_holds'
+        ordering = ['-created_at']
+        # Overlap check of availability, expired holds are reaped by expires_at
+        indexes = [
+            models.Index(fields=['listing', 'check_in', 'expires_at']),
+            models.Index(fields=['expires_at']),
+        ]
+
+    def __str__(self):
+        return f'Hold of listing {self.listing_id}: {self.check_in} - {self.check_out}'
+
+
+class BlockedDateRange(TimestampMixin):
+    """
+    Dates blocked by an event of external calendar (other booking platforms)
+    Synced from .ics files by import_ical command, respected by availability checks
+    """
+    listing = models.ForeignKey('listings.Listing', on_delete=models.CASCADE, related_name='blocked_ranges')
+    # Calendar the event comes from (e.g. "airbnb"), events are synced per source
+    source = models.CharField(max_length=100)
+    uid = models.CharField(max_length=255)
+    check_in = models.DateField()
+    check_out = models.DateField()
+    summary = models.CharField(max_length=255, blank=True)
+
+    class Meta:
+        db_table = 'blocked_date_ranges'
+        ordering = ['check_in']
+        unique_together = ('listing', 'source', 'uid')
+        indexes = [models.Index(fields=['listing', 'check_in'])]
+
+    def __str__(self):
+        return f'{self.source} block of listing {self.listing_id}: {self.check_in} - {self.check_out}'
@@ -1,7 +1,8 @@
 from rest_framework import serializers
 from django.utils import timezone
-from .models import Booking, BookingStatusHistory
+from .models import Booking, BookingStatusHistory, BookingHold
 from listings.serializers import ListingSerializer
+from core.exceptions import DateRangeError
 from users.serializers import UserProfileSerializer
 
 
@@ -46,10 +47,12 @@ class BookingDetailSerializer(serializers.ModelSerializer):
 class BookingCreateSerializer(serializers.ModelSerializer):
     """Serializer for creating new bookings"""
     listing_id = serializers.IntegerField(write_only=True)
+    # Hold of the same dates placed at checkout start (POST /api/bookings/holds/)
+    hold_id = serializers.IntegerField(write_only=True, required=False)
 
     class Meta:
         model = Booking
-        fields = ['listing_id', 'check_in', 'check_out', 'stayers']
+        fields = ['listing_id', 'check_in', 'check_out', 'stayers', 'hold_id']
 
     def validate(self, data):
         """Validation of booking dates before creating booking"""
@@ -86,3 +89,38 @@ class BookingCreateSerializer(serializers.ModelSerializer):
         )
 
         return booking
+
+class BookingHoldSerializer(serializers.ModelSerializer):
+    """Serializer for temporary date holds"""
+    listing_id = serializers.IntegerField()
+
+    class Meta:
+        model = BookingHold
+        fields = ['id', 'listing_id', 'check_in', 'check_out', 'expires_at']
+        read_only_fields = ['id', 'expires_at']
+
+    def validate(self, data):
+        """Same date rules as for bookings"""
+        if data['check_out'] <= data['check_in']:
+            raise serializers.ValidationError('Check-in cant be before Check-out date')
+
+        if data['check_in'] < timezone.now().date():
+            raise serializers.ValidationError('Check-in cannot be in the past')
+
+        return data
+
+class AvailabilityQuerySerializer(serializers.Serializer):
+    """Query params of batch availability"""
+    listing_ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        allow_empty=False,
+        max_length=100
+    )
+    check_in = serializers.DateField()
+    check_out = serializers.DateField()
+
+    def validate(self, data):
+        """Check that date range is valid"""
+        if data['check_out'] <= data['check_in']:
+            raise DateRangeError()
+        return data
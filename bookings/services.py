@@ -1,16 +1,52 @@
+import hashlib
 import logging
+from collections import defaultdict
+from datetime import timedelta
+from decimal import Decimal, ROUND_DOWN
+from django.conf import settings
 from django.db import transaction
-from django.db.models import Q
-from .models import Booking, BookingStatusHistory
+from django.db.models import (
+    Q, F, Sum, Count, Max, Exists, OuterRef, Prefetch, Case, When, Value, prefetch_related_objects
+)
+from django.db.models.functions import TruncMonth, Greatest
+from django.utils import timezone
+from .ical import render_calendar
+from .models import Booking, BookingStatusHistory, ListingDailyStat, BookingHold, BlockedDateRange
 from listings.models import Listing
+from listings.services import ListingService
 from core.enums import BookingStatus
 from core.exceptions import BookingNotAvailableError, ListingNotAvailableError, AccessRightsError
+from core.metrics import BOOKING_TRANSITIONS, AVAILABILITY_CONFLICTS
+from core.outbox import emit
 
 logger = logging.getLogger(__name__)
 
 
 class BookingService:
     """Service for booking business logic"""
+    @staticmethod
+    def get_booking_detail(pk, user):
+        """
+        Booking with everything BookingDetailSerializer renders, or None without access
+        Primary key probe (joined listing, owner, address, tenant) and access check on
+        the loaded row instead of tenant OR listing__owner across the join,
+        relations are prefetched only for allowed users: 3 queries in total
+        """
+        booking = Booking.objects.select_related(
+            'tenant', 'listing__owner', 'listing__address'
+        ).filter(pk=pk).first()
+        if booking is None:
+            return None
+        if not (user.is_admin or booking.tenant_id == user.id or booking.listing.owner_id == user.id):
+            return None
+
+        prefetch_related_objects(
+            [booking],
+            Prefetch('status_history', queryset=BookingStatusHistory.objects.select_related('changed_by')),
+            ListingService.main_image_prefetch('listing__images'),
+        )
+        return booking
+
     @staticmethod
     def calculate_price(listing, check_in, check_out):
         """Calculate booking total price"""
@@ -19,7 +55,12 @@ class BookingService:
 
     @staticmethod
     def check_availability(listing, check_in, check_out, exclude_booking_id=None):
-        """Check listing availability for speicifc date range"""
+        """Check listing availability for speicifc date range (bookings, active holds, external blocks)"""
+        if BookingHoldService.is_held(listing, check_in, check_out):
+            return False
+        if CalendarService.is_blocked(listing, check_in, check_out):
+            return False
+
         overlapping = Booking.objects.filter(
             listing=listing,
             book_status__in=[BookingStatus.pending.name, BookingStatus.confirmed.name]
@@ -32,6 +73,34 @@ class BookingService:
 
         return not overlapping.exists()
 
+    @staticmethod
+    def available_listing_ids(listing_ids, check_in, check_out):
+        """
+        Which of active listings are free for date range, in one query:
+        NOT EXISTS probes per listing over (listing, deleted_at, check_in) booking index,
+        (listing, check_in, expires_at) hold index and (listing, check_in) block index
+        """
+        overlapping = Booking.objects.filter(
+            listing=OuterRef('pk'),
+            book_status__in=[BookingStatus.pending.name, BookingStatus.confirmed.name],
+            check_in__lt=check_out,
+            check_out__gt=check_in
+        )
+        held = BookingHold.objects.filter(
+            listing=OuterRef('pk'),
+            check_in__lt=check_out,
+            check_out__gt=check_in,
+            expires_at__gt=timezone.now()
+        )
+        blocked = BlockedDateRange.objects.filter(
+            listing=OuterRef('pk'),
+            check_in__lt=check_out,
+            check_out__gt=check_in
+        )
+        return set(Listing.objects.filter(
+            id__in=listing_ids, is_active=True
+        ).exclude(Exists(overlapping)).exclude(Exists(held)).exclude(Exists(blocked)).values_list('id', flat=True))
+
     @staticmethod
     def create_booking(tenant, validated_data):
         """Creates a booking with all needed validations"""
@@ -42,22 +111,31 @@ class BookingService:
         except Listing.DoesNotExist:
             raise ListingNotAvailableError()
 
-        if listing.owner == tenant:
+        if listing.owner_id == tenant.id:
             raise AccessRightsError('Cannot book your own listing')
 
         check_in = validated_data['check_in']
         check_out = validated_data['check_out']
         stayers = validated_data['stayers']
+        hold_id = validated_data.pop('hold_id', None)
 
         if stayers > listing.max_stayers:
             raise ValueError(f'Maximum {listing.max_stayers} stayers allowed')
 
-        if not BookingService.check_availability(listing, check_in, check_out):
-            raise BookingNotAvailableError()
-
         total_price = BookingService.calculate_price(listing, check_in, check_out)
 
         with transaction.atomic():
+            # Serialized with place_hold and listing soft delete on the listing row
+            if Listing.objects.select_for_update().filter(pk=listing.pk, is_active=True).first() is None:
+                raise ListingNotAvailableError()
+            if hold_id:
+                # Removed together with booking insert, restored on rollback
+                BookingHoldService.claim(hold_id, tenant, listing, check_in, check_out)
+
+            if not BookingService.check_availability(listing, check_in, check_out):
+                AVAILABILITY_CONFLICTS.inc()
+                raise BookingNotAvailableError()
+
             booking = Booking.objects.create(
                 tenant=tenant,
                 listing=listing,
@@ -71,6 +149,11 @@ class BookingService:
                 comment='Booking created',
                 changed_by=tenant
             )
+            BookingRollupService.apply(booking, None, booking.book_status)
+            emit('booking', booking.id, 'booking.created', BookingService.event_payload(booking))
+            transaction.on_commit(
+                lambda: BOOKING_TRANSITIONS.inc(from_status='none', to_status=BookingStatus.pending.name)
+            )
 
             logger.info(f'Created booking {booking.id}')
             return booking
@@ -79,8 +162,13 @@ class BookingService:
     def update_status(booking, new_status, user, comment=''):
         """Updating booking status and contain status history"""
         with transaction.atomic():
+            old_status = booking.book_status
             booking.book_status = new_status
             booking.save()
+            BookingRollupService.apply(booking, old_status, new_status)
+            transaction.on_commit(
+                lambda: BOOKING_TRANSITIONS.inc(from_status=old_status, to_status=new_status)
+            )
 
             BookingStatusHistory.objects.create(
                 booking=booking,
@@ -88,14 +176,54 @@ class BookingService:
                 comment=comment,
                 changed_by=user
             )
+            emit('booking', booking.id, 'booking.status_changed', {
+                **BookingService.event_payload(booking),
+                'from_status': old_status,
+                'changed_by': user.id,
+                'comment': comment,
+            })
 
             logger.info(f'Booking {booking.id} -> {new_status}')
             return booking
 
+    @staticmethod
+    def close_for_listing(listing, user=None):
+        """
+        Reject pending and cancel confirmed bookings of deleted listing
+        (runs in the transaction of the listing soft delete)
+        """
+        user = user or listing.owner
+        statuses = {
+            BookingStatus.pending.name: BookingStatus.rejected.name,
+            BookingStatus.confirmed.name: BookingStatus.cancelled.name,
+        }
+        bookings = Booking.objects.select_for_update().filter(listing=listing, book_status__in=list(statuses))
+        count = 0
+        for booking in bookings:
+            booking.listing = listing
+            BookingService.update_status(booking, statuses[booking.book_status], user, 'Listing deleted')
+            count += 1
+        return count
+
+    @staticmethod
+    def event_payload(booking):
+        """Outbox payload of booking events, listing owner is taken from loaded listing"""
+        return {
+            'booking_id': booking.id,
+            'listing_id': booking.listing_id,
+            'owner_id': booking.listing.owner_id,
+            'tenant_id': booking.tenant_id,
+            'check_in': booking.check_in,
+            'check_out': booking.check_out,
+            'stayers': booking.stayers,
+            'total_price': booking.total_price,
+            'status': booking.book_status,
+        }
+
     @staticmethod
     def confirm_booking(booking, user):
         """Confirm booking by listing owner"""
-        if booking.listing.owner != user and not user.is_admin:
+        if booking.listing.owner_id != user.id and not user.is_admin:
             raise AccessRightsError('Only owner can confirm')
 
         return BookingService.update_status(
@@ -108,7 +236,7 @@ class BookingService:
     @staticmethod
     def reject_booking(booking, user, reason=''):
         """Reject booking by listing owner"""
-        if booking.listing.owner != user and not user.is_admin:
+        if booking.listing.owner_id != user.id and not user.is_admin:
             raise AccessRightsError('Only can be rejected by an owner')
 
         return BookingService.update_status(
@@ -121,7 +249,7 @@ class BookingService:
     @staticmethod
     def cancel_booking(booking, user):
         """Cancel booking by tenant"""
-        if booking.tenant != user and not user.is_admin:
+        if booking.tenant_id != user.id and not user.is_admin:
             raise AccessRightsError('Only can be canceled by tenant')
 
         if not booking.cancelation:
@@ -132,4 +260,370 @@ class BookingService:
             BookingStatus.cancelled.name,
             user,
             'Cancelled by tenant'
-        )
\ No newline at end of file
+        )
+
+
+class BookingHoldService:
+    """Service for temporary date holds during checkout"""
+    @staticmethod
+    def active_holds(listing, check_in, check_out):
+        """Not expired holds overlapping date range"""
+        return BookingHold.objects.filter(
+            listing=listing,
+            check_in__lt=check_out,
+            check_out__gt=check_in,
+            expires_at__gt=timezone.now()
+        )
+
+    @staticmethod
+    def is_held(listing, check_in, check_out):
+        """Single lookup over (listing, check_in, expires_at) index"""
+        return BookingHoldService.active_holds(listing, check_in, check_out).exists()
+
+    @staticmethod
+    def place_hold(tenant, validated_data):
+        """Hold dates for tenant for BOOKING_HOLDS['TTL'] seconds"""
+        try:
+            listing = Listing.objects.get(id=validated_data['listing_id'], is_active=True)
+        except Listing.DoesNotExist:
+            raise ListingNotAvailableError()
+
+        if listing.owner_id == tenant.id:
+            raise AccessRightsError('Cannot book your own listing')
+
+        check_in = validated_data['check_in']
+        check_out = validated_data['check_out']
+        with transaction.atomic():
+            # Concurrent holds of the listing are serialized on its row
+            Listing.objects.select_for_update().filter(pk=listing.pk).first()
+            if not BookingService.check_availability(listing, check_in, check_out):
+                AVAILABILITY_CONFLICTS.inc()
+                raise BookingNotAvailableError()
+
+            hold = BookingHold.objects.create(
+                listing=listing,
+                tenant=tenant,
+                check_in=check_in,
+                check_out=check_out,
+                expires_at=timezone.now() + timedelta(seconds=settings.BOOKING_HOLDS['TTL'])
+            )
+        logger.info(f'Hold {hold.id} of listing {listing.id} until {hold.expires_at}')
+        return hold
+
+    @staticmethod
+    def claim(hold_id, tenant, listing, check_in, check_out):
+        """Lock and remove tenant hold that is turned into a booking (inside transaction)"""
+        hold = BookingHold.objects.select_for_update().filter(
+            pk=hold_id, tenant=tenant, expires_at__gt=timezone.now()
+        ).first()
+        if hold is None or (hold.listing_id, hold.check_in, hold.check_out) != (listing.id, check_in, check_out):
+            raise BookingNotAvailableError('Hold is expired or does not match booking dates')
+        hold.delete()
+
+    @staticmethod
+    def release_hold(hold_id, user):
+        """Release hold before its expiry, returns False if there is no such hold"""
+        deleted, _ = BookingHold.objects.filter(pk=hold_id, tenant=user).delete()
+        return bool(deleted)
+
+    @staticmethod
+    def reap_expired(batch_size=None):
+        """Delete expired holds in batches, returns number of deleted holds"""
+        batch_size = batch_size or settings.BOOKING_HOLDS['REAP_BATCH_SIZE']
+        total = 0
+        while True:
+            ids = list(BookingHold.objects.filter(
+                expires_at__lte=timezone.now()
+            ).order_by().values_list('pk', flat=True)[:batch_size])
+            if not ids:
+                return total
+            BookingHold.objects.filter(pk__in=ids).delete()
+            total += len(ids)
+
+
+class CalendarService:
+    """Service for iCalendar export of bookings and import of external calendars"""
+    EXPORT_STATUSES = {
+        BookingStatus.pending.name: 'TENTATIVE',
+        BookingStatus.confirmed.name: 'CONFIRMED',
+    }
+
+    @staticmethod
+    def export_version(listing):
+        """
+        (ETag, Last-Modified) of listing calendar from one aggregate query,
+        so conditional requests are answered without building the calendar
+        Counts change when rows are purged, updated_at covers edits and soft deletes
+        """
+        today = timezone.now().date()
+        stats = Booking.objects.all_records().filter(listing=listing).aggregate(
+            total=Count('id'),
+            live=Count('id', filter=Q(deleted_at__isnull=True)),
+            updated=Max('updated_at'),
+            deleted=Max('deleted_at'),
+        )
+        last_modified = max(filter(None, [stats['updated'], stats['deleted'], listing.updated_at]))
+        version = f"{listing.id}:{listing.title}:{today}:{stats['total']}:{stats['live']}:{stats['updated']}:{stats['deleted']}"
+        return f'"{hashlib.sha1(version.encode()).hexdigest()}"', last_modified
+
+    @staticmethod
+    def export_calendar(listing, dtstamp):
+        """.ics of current and future pending/confirmed bookings (dates only, no tenant data)"""
+        bookings = Booking.objects.filter(
+            listing=listing,
+            book_status__in=list(CalendarService.EXPORT_STATUSES),
+            check_out__gte=timezone.now().date()
+        ).order_by('check_in', 'id').values_list('id', 'check_in', 'check_out', 'book_status')
+        events = (
+            (f'booking-{booking_id}@rentalproject', check_in, check_out, 'Reserved',
+             CalendarService.EXPORT_STATUSES[book_status])
+            for booking_id, check_in, check_out, book_status in bookings.iterator()
+        )
+        return render_calendar(listing.title, events, dtstamp)
+
+    @staticmethod
+    def is_blocked(listing, check_in, check_out):
+        """Single lookup over (listing, check_in) index of blocked ranges"""
+        return BlockedDateRange.objects.filter(
+            listing=listing,
+            check_in__lt=check_out,
+            check_out__gt=check_in
+        ).exists()
+
+    @staticmethod
+    def sync_blocks(listing, source, events, batch_size=500):
+        """
+        Make blocked ranges of listing source equal to calendar events
+        Only changed events are written (in batches), events missing from
+        the calendar, cancelled or already past are removed
+        """
+        today = timezone.now().date()
+        existing = {
+            uid: (pk, check_in, check_out, summary)
+            for pk, uid, check_in, check_out, summary in BlockedDateRange.objects.filter(
+                listing=listing, source=source
+            ).values_list('id', 'uid', 'check_in', 'check_out', 'summary')
+        }
+        counts = {'created': 0, 'updated': 0, 'deleted': 0, 'unchanged': 0}
+        seen, to_create, to_update = set(), [], []
+
+        def flush():
+            BlockedDateRange.objects.bulk_create(to_create)
+            BlockedDateRange.objects.bulk_update(to_update, ['check_in', 'check_out', 'summary', 'updated_at'])
+            counts['created'] += len(to_create)
+            counts['updated'] += len(to_update)
+            to_create.clear()
+            to_update.clear()
+
+        for event in events:
+            if event['status'] == 'CANCELLED' or event['check_out'] < today or event['uid'] in seen:
+                continue
+            seen.add(event['uid'])
+            values = (event['check_in'], event['check_out'], event['summary'])
+            current = existing.get(event['uid'])
+            if current is None:
+                to_create.append(BlockedDateRange(listing=listing, source=source, uid=event['uid'],
+                                                  check_in=values[0], check_out=values[1], summary=values[2]))
+            elif current[1:] != values:
+                to_update.append(BlockedDateRange(pk=current[0], check_in=values[0], check_out=values[1],
+                                                  summary=values[2], updated_at=timezone.now()))
+            else:
+                counts['unchanged'] += 1
+            if len(to_create) + len(to_update) >= batch_size:
+                flush()
+        flush()
+
+        stale = [current[0] for uid, current in existing.items() if uid not in seen]
+        for start in range(0, len(stale), batch_size):
+            BlockedDateRange.objects.filter(pk__in=stale[start:start + batch_size]).delete()
+        counts['deleted'] = len(stale)
+        logger.info(f'Calendar {source} of listing {listing.id} synced: {counts}')
+        return counts
+
+
+class BookingRollupService:
+    """Service for daily listing rollups (occupancy, revenue, status counts)"""
+    BOOKED_STATUSES = [BookingStatus.confirmed.name, BookingStatus.completed.name]
+    BATCH_SIZE = 5000
+    LISTING_BATCH_SIZE = 100
+
+    @staticmethod
+    def nightly_revenue(total_price, nights):
+        """Split total price to nights: base price per night and remainder of the first night"""
+        # Unsaved instances can hold int/float price
+        total_price = Decimal(str(total_price))
+        base = (total_price / nights).quantize(Decimal('0.01'), rounding=ROUND_DOWN)
+        return base, total_price - base * nights
+
+    @staticmethod
+    def _add(field, delta):
+        """
+        Counter update that never goes below zero (rows of bookings created before rollups
+        existed can miss the nights being moved out of them)
+        Decrement is guarded by CASE, UNSIGNED column minus 1 fails on MySQL before GREATEST applies
+        """
+        if delta >= 0:
+            return F(field) + delta
+        return Case(When(**{f'{field}__gte': -delta, 'then': F(field) + delta}), default=Value(0))
+
+    @staticmethod
+    def apply(booking, old_status, new_status):
+        """
+        Move booking nights from old status bucket to the new one
+        old_status=None for new booking, new_status=None for removed booking
+        """
+        nights = booking.nights_to_stay
+        if old_status == new_status or nights <= 0:
+            return
+
+        ListingDailyStat.objects.bulk_create([
+            ListingDailyStat(listing_id=booking.listing_id, day=booking.check_in + timedelta(days=night))
+            for night in range(nights)
+        ], ignore_conflicts=True)
+
+        add = BookingRollupService._add
+        changes = {}
+        if old_status:
+            changes[f'{old_status}_nights'] = add(f'{old_status}_nights', -1)
+        if new_status:
+            changes[f'{new_status}_nights'] = add(f'{new_status}_nights', 1)
+
+        booked = BookingRollupService.BOOKED_STATUSES
+        booked_delta = (new_status in booked) - (old_status in booked)
+        base, remainder = BookingRollupService.nightly_revenue(booking.total_price, nights)
+        if booked_delta:
+            changes['booked_nights'] = add('booked_nights', booked_delta)
+            changes['revenue'] = Greatest(F('revenue') + base * booked_delta, Value(Decimal('0')))
+
+        days = ListingDailyStat.objects.filter(
+            listing_id=booking.listing_id,
+            day__gte=booking.check_in,
+            day__lt=booking.check_out
+        )
+        days.update(**changes)
+        if booked_delta and remainder:
+            days.filter(day=booking.check_in).update(
+                revenue=Greatest(F('revenue') + remainder * booked_delta, Value(Decimal('0')))
+            )
+
+    @staticmethod
+    def _flush(stats):
+        """Save accumulated rollup rows"""
+        ListingDailyStat.objects.bulk_create([
+            ListingDailyStat(listing_id=listing_id, day=day, **values)
+            for (listing_id, day), values in stats.items()
+        ], batch_size=BookingRollupService.BATCH_SIZE)
+
+    @staticmethod
+    def _rebuild_listings(listing_ids):
+        """Replace rollups of given listings in one transaction, return count of their bookings"""
+        booked = BookingRollupService.BOOKED_STATUSES
+        stats = defaultdict(lambda: defaultdict(int))
+        count = 0
+
+        with transaction.atomic():
+            ListingDailyStat.objects.filter(listing_id__in=listing_ids).delete()
+            for listing_id, check_in, check_out, total_price, book_status in Booking.objects.filter(
+                listing_id__in=listing_ids
+            ).values_list(
+                'listing_id', 'check_in', 'check_out', 'total_price', 'book_status'
+            ).iterator(chunk_size=BookingRollupService.BATCH_SIZE):
+                nights = (check_out - check_in).days
+                if nights <= 0:
+                    continue
+                base, remainder = BookingRollupService.nightly_revenue(total_price, nights)
+                for night in range(nights):
+                    values = stats[(listing_id, check_in + timedelta(days=night))]
+                    values[f'{book_status}_nights'] += 1
+                    if book_status in booked:
+                        values['booked_nights'] += 1
+                        values['revenue'] += base + (remainder if night == 0 else 0)
+                count += 1
+
+            BookingRollupService._flush(stats)
+        return count
+
+    @staticmethod
+    def rebuild(listing_ids=None):
+        """
+        Recalculate rollups from bookings (for all listings or only given ones)
+        Every LISTING_BATCH_SIZE listings are replaced in their own short transaction,
+        rows of other listings stay readable and writable while a full rebuild runs
+        """
+        if not listing_ids:
+            listing_ids = Listing.objects.all_records().order_by('id').values_list('id', flat=True)
+        listing_ids = list(listing_ids)
+
+        batch_size = BookingRollupService.LISTING_BATCH_SIZE
+        count = 0
+        for start in range(0, len(listing_ids), batch_size):
+            count += BookingRollupService._rebuild_listings(listing_ids[start:start + batch_size])
+
+        logger.info(f'Rebuilt daily rollups of {len(listing_ids)} listings from {count} bookings')
+        return count
+
+    @staticmethod
+    def owner_analytics(owner, date_from, date_to, listing_id=None, group_by='month'):
+        """
+        Occupancy, ADR and revenue of owner listings for date range
+        Reads only rollup rows, one row per listing per day
+        Nights and revenue are of the same (not deleted) listings as available nights
+        """
+        listings = Listing.objects.filter(owner=owner)
+        if listing_id:
+            listings = listings.filter(id=listing_id)
+        listing_count = listings.count()
+
+        rows = ListingDailyStat.objects.filter(
+            listing__in=listings,
+            day__gte=date_from,
+            day__lte=date_to
+        )
+
+        bucket = TruncMonth('day') if group_by == 'month' else F('day')
+        status_fields = [f'{book_stat.name}_nights' for book_stat in BookingStatus]
+        buckets = rows.annotate(bucket=bucket).values('bucket').annotate(
+            booked_nights_sum=Sum('booked_nights'),
+            revenue_sum=Sum('revenue'),
+            **{f'{field}_sum': Sum(field) for field in status_fields}
+        ).order_by('bucket')
+
+        def summary(start, end, values):
+            days = (end - start).days + 1
+            available = listing_count * days
+            booked_nights = values.get('booked_nights_sum') or 0
+            revenue = values.get('revenue_sum') or Decimal('0')
+            return {
+                'date_from': start,
+                'date_to': end,
+                'booked_nights': booked_nights,
+                'available_nights': available,
+                'occupancy_rate': round(booked_nights / available, 4) if available else 0,
+                'revenue': revenue,
+                'adr': (revenue / booked_nights).quantize(Decimal('0.01')) if booked_nights else Decimal('0'),
+                'status_nights': {
+                    field.removesuffix('_nights'): values.get(f'{field}_sum') or 0
+                    for field in status_fields
+                },
+            }
+
+        result = []
+        totals = defaultdict(int)
+        for values in buckets:
+            start = max(values['bucket'], date_from)
+            if group_by == 'month':
+                next_month = (values['bucket'].replace(day=28) + timedelta(days=4)).replace(day=1)
+                end = min(next_month - timedelta(days=1), date_to)
+            else:
+                end = start
+            result.append(summary(start, end, values))
+            for key, value in values.items():
+                if key.endswith('_sum'):
+                    totals[key] += value or 0
+
+        return {
+            'listings': listing_count,
+            'group_by': group_by,
+            'totals': summary(date_from, date_to, totals),
+            'buckets': result,
+        }
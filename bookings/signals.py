@@ -0,0 +1,25 @@
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from .models import Booking
+from .services import BookingRollupService
+from core.signals import bulk_soft_deleted
+
+
+@receiver(post_save, sender=Booking)
+def booking_soft_deleted(sender, instance, created, update_fields=None, **kwargs):
+    """Keep daily rollups in sync when booking is soft deleted or restored (rebuild skips deleted bookings)"""
+    if created or not update_fields or 'deleted_at' not in update_fields:
+        return
+    if instance.deleted_at:
+        BookingRollupService.apply(instance, instance.book_status, None)
+    else:
+        BookingRollupService.apply(instance, None, instance.book_status)
+
+
+@receiver(bulk_soft_deleted, sender=Booking)
+def bookings_bulk_soft_deleted(sender, pks, **kwargs):
+    """Keep daily rollups in sync when bookings are soft deleted by queryset"""
+    for booking in Booking.objects.all_records().filter(pk__in=pks):
+        BookingRollupService.apply(booking, booking.book_status, None)
+
@@ -0,0 +1,14 @@
+from core.jobs import task
+from .services import BookingHoldService, BookingRollupService
+
+
+@task('bookings.reap_expired_holds')
+def reap_expired_holds(batch_size=None):
+    """Delete expired temporary booking holds"""
+    return {'deleted': BookingHoldService.reap_expired(batch_size)}
+
+
+@task('bookings.rebuild_rollups')
+def rebuild_rollups(listing_ids=None):
+    """Recalculate daily booking rollups (of given listings or all of them)"""
+    return {'bookings': BookingRollupService.rebuild(listing_ids)}
@@ -1,3 +1,240 @@
-from django.test import TestCase
+from datetime import timedelta
+from decimal import Decimal
+from unittest import mock
 
-# Create your tests here.
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from .models import Booking, BookingStatusHistory, ListingDailyStat
+from .services import BookingRollupService
+from core.enums import BookingStatus, UserRole
+from listings.models import Address, Listing, ListingImg
+from users.models import User
+
+
+class BookingDetailQueriesTest(APITestCase):
+    """Booking detail is served in a fixed number of queries for every allowed user"""
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = User.objects.create_user(
+            email='owner@example.com', password='OwnerPassword123',
+            username='owner', role=UserRole.owner.name
+        )
+        cls.tenant = User.objects.create_user(
+            email='tenant@example.com', password='TenantPassword123',
+            username='tenant', role=UserRole.tenant.name
+        )
+        cls.stranger = User.objects.create_user(
+            email='stranger@example.com', password='StrangerPassword123',
+            username='stranger', role=UserRole.tenant.name
+        )
+        cls.listing = Listing.objects.create(
+            title='Flat', description='Flat', owner=cls.owner, house_type='apartment',
+            address=Address.objects.create(city='Berlin', street='Hauptstrasse 1', postal_code='10115'),
+            max_stayers=2, bedrooms=1, bathrooms=1, price_per_night=80
+        )
+        ListingImg.objects.create(listing=cls.listing, img='listings/main.png', main=True)
+        ListingImg.objects.create(listing=cls.listing, img='listings/other.png')
+        check_in = timezone.now().date() + timedelta(days=10)
+        cls.booking = Booking.objects.create(
+            listing=cls.listing, tenant=cls.tenant, stayers=2, total_price=240,
+            check_in=check_in, check_out=check_in + timedelta(days=3)
+        )
+        cls.url = reverse('booking-detail', kwargs={'pk': cls.booking.id})
+
+    def add_history(self, count):
+        BookingStatusHistory.objects.bulk_create([
+            BookingStatusHistory(
+                booking=self.booking, history_status=BookingStatus.pending.name,
+                changed_by=self.tenant if i % 2 else self.owner
+            )
+            for i in range(count)
+        ])
+
+    def get(self, user, queries):
+        self.client.force_authenticate(user)
+        with self.assertNumQueries(queries):
+            return self.client.get(self.url)
+
+    def test_tenant_detail_fixed_queries(self):
+        self.add_history(5)
+        response = self.get(self.tenant, 3)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data['status_history']), 5)
+        self.assertTrue(response.data['listing']['main_img'].endswith('listings/main.png'))
+        self.assertEqual(response.data['listing']['city'], 'Berlin')
+
+    def test_queries_do_not_grow_with_history(self):
+        self.add_history(1)
+        self.get(self.owner, 3)
+        self.add_history(20)
+        response = self.get(self.owner, 3)
+        self.assertEqual(len(response.data['status_history']), 21)
+
+    def test_stranger_gets_not_found(self):
+        response = self.get(self.stranger, 1)
+        self.assertEqual(response.status_code, 404)
+
+    def test_deleted_booking_not_found(self):
+        self.booking.delete()
+        response = self.get(self.tenant, 1)
+        self.assertEqual(response.status_code, 404)
+
+
+class ListingDeletionBookingsTest(APITestCase):
+    """Soft deleting a listing closes its active bookings"""
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = User.objects.create_user(
+            email='owner@example.com', password='OwnerPassword123',
+            username='owner', role=UserRole.owner.name
+        )
+        cls.tenant = User.objects.create_user(
+            email='tenant@example.com', password='TenantPassword123',
+            username='tenant', role=UserRole.tenant.name
+        )
+        cls.listing = Listing.objects.create(
+            title='Flat', description='Flat', owner=cls.owner, house_type='apartment',
+            address=Address.objects.create(city='Berlin', street='Hauptstrasse 1', postal_code='10115'),
+            max_stayers=2, bedrooms=1, bathrooms=1, price_per_night=80
+        )
+        check_in = timezone.now().date() + timedelta(days=10)
+        for offset, book_status in enumerate([BookingStatus.pending, BookingStatus.confirmed, BookingStatus.completed]):
+            Booking.objects.create(
+                listing=cls.listing, tenant=cls.tenant, stayers=2, total_price=240,
+                check_in=check_in + timedelta(days=offset * 5),
+                check_out=check_in + timedelta(days=offset * 5 + 3),
+                book_status=book_status.name
+            )
+
+    def statuses(self):
+        return sorted(Booking.objects.filter(listing=self.listing).values_list('book_status', flat=True))
+
+    def test_delete_closes_active_bookings(self):
+        self.listing.delete()
+        self.assertEqual(self.statuses(), sorted([
+            BookingStatus.rejected.name, BookingStatus.cancelled.name, BookingStatus.completed.name
+        ]))
+        self.assertEqual(BookingStatusHistory.objects.filter(comment='Listing deleted').count(), 2)
+
+    def test_queryset_delete_closes_active_bookings_once(self):
+        Listing.objects.filter(pk=self.listing.pk).delete()
+        Listing.objects.all_records().filter(pk=self.listing.pk).delete()
+        Listing.objects.all_records().get(pk=self.listing.pk).delete()
+        self.assertNotIn(BookingStatus.pending.name, self.statuses())
+        self.assertEqual(BookingStatusHistory.objects.filter(comment='Listing deleted').count(), 2)
+
+
+class BookingRollupSoftDeleteTest(APITestCase):
+    """Daily rollups follow booking soft delete and restore like a rebuild would"""
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = User.objects.create_user(
+            email='owner@example.com', password='OwnerPassword123',
+            username='owner', role=UserRole.owner.name
+        )
+        cls.tenant = User.objects.create_user(
+            email='tenant@example.com', password='TenantPassword123',
+            username='tenant', role=UserRole.tenant.name
+        )
+        cls.listing = Listing.objects.create(
+            title='Flat', description='Flat', owner=cls.owner, house_type='apartment',
+            address=Address.objects.create(city='Berlin', street='Hauptstrasse 1', postal_code='10115'),
+            max_stayers=2, bedrooms=1, bathrooms=1, price_per_night=80
+        )
+        check_in = timezone.now().date() + timedelta(days=10)
+        for offset in range(3):
+            Booking.objects.create(
+                listing=cls.listing, tenant=cls.tenant, stayers=2, total_price=240,
+                check_in=check_in + timedelta(days=offset * 5),
+                check_out=check_in + timedelta(days=offset * 5 + 3),
+                book_status=BookingStatus.confirmed.name
+            )
+        BookingRollupService.rebuild()
+
+    def rollups(self):
+        return list(ListingDailyStat.objects.filter(booked_nights__gt=0).values_list(
+            'day', 'booked_nights', 'confirmed_nights', 'revenue'
+        ))
+
+    def rebuilt(self):
+        current = self.rollups()
+        BookingRollupService.rebuild()
+        return current, self.rollups()
+
+    def test_soft_delete_and_restore(self):
+        booking = Booking.objects.first()
+        booking.delete()
+        current, rebuilt = self.rebuilt()
+        self.assertEqual(current, rebuilt)
+        self.assertEqual(len(rebuilt), 6)
+
+        booking.restore()
+        current, rebuilt = self.rebuilt()
+        self.assertEqual(current, rebuilt)
+        self.assertEqual(len(rebuilt), 9)
+
+    def test_queryset_soft_delete(self):
+        Booking.objects.filter(pk__in=list(Booking.objects.values_list('pk', flat=True)[:2])).delete()
+        current, rebuilt = self.rebuilt()
+        self.assertEqual(current, rebuilt)
+        self.assertEqual(len(rebuilt), 3)
+
+
+class OwnerAnalyticsTest(APITestCase):
+    """Rollups rebuilt in listing batches and analytics over one set of owner listings"""
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = User.objects.create_user(
+            email='owner@example.com', password='OwnerPassword123',
+            username='owner', role=UserRole.owner.name
+        )
+        cls.tenant = User.objects.create_user(
+            email='tenant@example.com', password='TenantPassword123',
+            username='tenant', role=UserRole.tenant.name
+        )
+        cls.check_in = timezone.now().date() - timedelta(days=20)
+        cls.listings = []
+        for i in range(3):
+            listing = Listing.objects.create(
+                title=f'Flat {i}', description='Flat', owner=cls.owner, house_type='apartment',
+                address=Address.objects.create(city='Berlin', street=f'Hauptstrasse {i}', postal_code='10115'),
+                max_stayers=2, bedrooms=1, bathrooms=1, price_per_night=80
+            )
+            Booking.objects.create(
+                listing=listing, tenant=cls.tenant, stayers=2, total_price=300,
+                check_in=cls.check_in, check_out=cls.check_in + timedelta(days=3),
+                book_status=BookingStatus.completed.name
+            )
+            cls.listings.append(listing)
+
+    def rollups(self):
+        return list(ListingDailyStat.objects.order_by('listing_id', 'day').values_list(
+            'listing_id', 'day', 'booked_nights', 'completed_nights', 'revenue'
+        ))
+
+    def test_rebuild_in_listing_batches(self):
+        BookingRollupService.rebuild()
+        full = self.rollups()
+        with mock.patch.object(BookingRollupService, 'LISTING_BATCH_SIZE', 2):
+            self.assertEqual(BookingRollupService.rebuild(), 3)
+        self.assertEqual(self.rollups(), full)
+        self.assertEqual(len(full), 9)
+
+        ListingDailyStat.objects.filter(listing=self.listings[0]).delete()
+        self.assertEqual(BookingRollupService.rebuild([self.listings[0].id]), 1)
+        self.assertEqual(self.rollups(), full)
+
+    def test_analytics_skip_deleted_listing(self):
+        BookingRollupService.rebuild()
+        self.listings[2].delete()
+
+        analytics = BookingRollupService.owner_analytics(
+            self.owner, self.check_in, self.check_in + timedelta(days=9), group_by='day'
+        )
+        totals = analytics['totals']
+        self.assertEqual(analytics['listings'], 2)
+        self.assertEqual(totals['booked_nights'], 6)
+        self.assertEqual(totals['available_nights'], 20)
+        self.assertEqual(totals['revenue'], Decimal('600'))
@@ -3,6 +3,11 @@ from . import views
 
 urlpatterns = [
     path('bookings/', views.BookingListCreateView.as_view(), name='booking-list-create'),
+    path('bookings/availability/', views.batch_availability, name='booking-availability'),
+    path('bookings/calendar/<int:listing_id>.ics', views.listing_calendar, name='booking-calendar'),
+    path('bookings/events/', views.booking_events, name='booking-events'),
+    path('bookings/holds/', views.create_booking_hold, name='booking-hold-create'),
+    path('bookings/holds/<int:pk>/', views.release_booking_hold, name='booking-hold-release'),
     path('bookings/received/', views.OwnerBookingsView.as_view(), name='owner-bookings'),
     path('bookings/<int:pk>/', views.BookingDetailView.as_view(), name='booking-detail'),
     path('bookings/<int:pk>/confirm/', views.confirm_booking, name='booking-confirm'),
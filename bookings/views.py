@@ -1,23 +1,38 @@
 import logging
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import Http404, JsonResponse, StreamingHttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.decorators import method_decorator
+from django.utils.http import http_date
+from django.views.decorators.http import require_GET
 from rest_framework import status
-from rest_framework.decorators import api_view, permission_classes
+from rest_framework.decorators import api_view, permission_classes, renderer_classes
 from rest_framework.generics import ListAPIView, RetrieveAPIView, ListCreateAPIView
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
 
+from .live import broker, feed, authenticate, replay, stream, user_channel
 from .models import Booking
-from .serializers import BookingSerializer, BookingDetailSerializer, BookingCreateSerializer
-from .services import BookingService
+from .serializers import (
+    BookingSerializer, BookingDetailSerializer, BookingCreateSerializer,
+    BookingHoldSerializer, AvailabilityQuerySerializer
+)
+from .services import BookingService, BookingHoldService, CalendarService
 from users.permissions import Tenant
+from core.idempotency import idempotent
+from core.renderers import ICalendarRenderer
+from listings.models import Listing
 
 logger = logging.getLogger(__name__)
 
 
+@method_decorator(idempotent, name='post')
 class BookingListCreateView(ListCreateAPIView):
     """
     Create new booking and list all tenants bookings
     GET /api/bookings/
-    POST /api/bookings/
+    POST /api/bookings/ (Idempotency-Key header supported)
     """
     permission_classes = [Tenant]
 
@@ -41,6 +56,123 @@ class BookingListCreateView(ListCreateAPIView):
         )
         serializer.instance = booking
 
+@api_view(['POST'])
+@permission_classes([Tenant])
+def create_booking_hold(request):
+    """
+    Hold dates for a few minutes while tenant finishes checkout,
+    booking of the same dates with hold_id turns the hold into a booking
+    POST /api/bookings/holds/
+    """
+    serializer = BookingHoldSerializer(data=request.data)
+    serializer.is_valid(raise_exception=True)
+    hold = BookingHoldService.place_hold(request.user, serializer.validated_data)
+    return Response(BookingHoldSerializer(hold).data, status=status.HTTP_201_CREATED)
+
+@api_view(['DELETE'])
+@permission_classes([Tenant])
+def release_booking_hold(request, pk):
+    """
+    Release hold before its expiry
+    DELETE /api/bookings/holds/{id}/
+    """
+    if not BookingHoldService.release_hold(pk, request.user):
+        return Response(
+            {'error': 'Hold not found'},
+            status=status.HTTP_404_NOT_FOUND
+        )
+    return Response(status=status.HTTP_204_NO_CONTENT)
+
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def batch_availability(request):
+    """
+    Availability of up to 100 listings for the same dates (search result pages)
+    GET /api/bookings/availability/?listing_ids=1,2,3&check_in=2026-11-01&check_out=2026-11-05
+    Missing and inactive listings are reported as unavailable
+    """
+    raw_ids = request.query_params.get('listing_ids', '')
+    serializer = AvailabilityQuerySerializer(data={
+        'listing_ids': [listing_id for listing_id in raw_ids.split(',') if listing_id],
+        'check_in': request.query_params.get('check_in'),
+        'check_out': request.query_params.get('check_out'),
+    })
+    serializer.is_valid(raise_exception=True)
+
+    data = serializer.validated_data
+    available = BookingService.available_listing_ids(data['listing_ids'], data['check_in'], data['check_out'])
+    return Response({
+        'check_in': data['check_in'],
+        'check_out': data['check_out'],
+        'availability': {str(listing_id): listing_id in available for listing_id in data['listing_ids']},
+    })
+
+@api_view(['GET'])
+@permission_classes([AllowAny])
+@renderer_classes([ICalendarRenderer])
+def listing_calendar(request, listing_id):
+    """
+    iCalendar feed of listing bookings for calendar sync with other platforms
+    GET /api/bookings/calendar/{listing_id}.ics
+    Conditional requests (If-None-Match/If-Modified-Since) of unchanged calendar get 304
+    """
+    listing = Listing.objects.filter(pk=listing_id, is_active=True).only('id', 'title', 'updated_at').first()
+    if listing is None:
+        return Response('Listing not found', status=status.HTTP_404_NOT_FOUND)
+
+    etag, last_modified = CalendarService.export_version(listing)
+    headers = {
+        'ETag': etag,
+        'Last-Modified': http_date(last_modified.timestamp()),
+        'Cache-Control': 'no-cache',
+    }
+    not_modified = get_conditional_response(request, etag=etag, last_modified=int(last_modified.timestamp()))
+    if not_modified is not None:
+        for name, value in headers.items():
+            not_modified[name] = value
+        return not_modified
+
+    return Response(CalendarService.export_calendar(listing, last_modified), headers=headers)
+
+@require_GET
+async def booking_events(request):
+    """
+    Server-sent events of bookings of current user (run under ASGI, idle connections cost no thread)
+    GET /api/bookings/events/
+    Tenants get status changes of their bookings, owners new bookings and changes on their listings
+    Reconnect with Last-Event-ID replays missed events, resync event means reload bookings over REST
+    """
+    config = settings.BOOKING_EVENTS
+    user = await sync_to_async(authenticate)(request)
+    if user is None:
+        return JsonResponse({'detail': 'Authentication credentials were not provided.'}, status=401)
+    if broker.count >= config['MAX_SUBSCRIBERS']:
+        response = JsonResponse({'detail': 'Server is busy, try again later'}, status=503)
+        response['Retry-After'] = str(config['RETRY_MS'] // 1000)
+        return response
+
+    # Subscribed before replay, so nothing committed in between is lost
+    subscription = broker.subscribe([user_channel(user.id)], config['MAX_PENDING'])
+    feed.ensure_running()
+    replayed, resync = [], False
+    last_event_id = request.headers.get('Last-Event-ID', '')
+    try:
+        if last_event_id.isdigit():
+            replayed = await sync_to_async(replay, thread_sensitive=False)(
+                user.id, int(last_event_id), config['REPLAY_LIMIT']
+            )
+            if replayed is None:
+                replayed, resync = [], True
+    except Exception:
+        broker.unsubscribe(subscription)
+        raise
+
+    return StreamingHttpResponse(
+        stream(subscription, replayed, resync),
+        content_type='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
 class BookingDetailView(RetrieveAPIView):
     """
     Retrieves detailed info about booking
@@ -50,17 +182,12 @@ class BookingDetailView(RetrieveAPIView):
     permission_classes = [IsAuthenticated]
     lookup_field = 'pk'
 
-    def get_queryset(self):
-        """Return bookings that user can access"""
-        user = self.request.user
-        if user.is_admin:
-            return Booking.objects.all()
-
-        return Booking.objects.filter(
-            tenant=user
-        ) | Booking.objects.filter(
-            listing__owner=user
-        )
+    def get_object(self):
+        """Return booking if user is admin, its tenant or listing owner"""
+        booking = BookingService.get_booking_detail(self.kwargs['pk'], self.request.user)
+        if booking is None:
+            raise Http404
+        return booking
 
 class OwnerBookingsView(ListAPIView):
     """
@@ -78,13 +205,14 @@ class OwnerBookingsView(ListAPIView):
 
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
+@idempotent
 def confirm_booking(request, pk):
     """
     Confirm booking by listing owner
-    POST /api/bookings/{id}/confirm/
+    POST /api/bookings/{id}/confirm/ (Idempotency-Key header supported)
     """
     try:
-        booking = Booking.objects.get(pk=pk)
+        booking = Booking.objects.select_related('listing').get(pk=pk)
     except Booking.DoesNotExist:
         return Response(
             {'error': 'Booking not found'},
@@ -106,13 +234,14 @@ def confirm_booking(request, pk):
 
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
+@idempotent
 def reject_booking(request, pk):
     """
     Reject booking by listing owner
-    POST /api/bookings/{id}/reject/
+    POST /api/bookings/{id}/reject/ (Idempotency-Key header supported)
     """
     try:
-        booking = Booking.objects.get(pk=pk)
+        booking = Booking.objects.select_related('listing').get(pk=pk)
     except Booking.DoesNotExist:
         return Response(
             {'error': 'Booking not found'},
@@ -135,13 +264,14 @@ def reject_booking(request, pk):
 
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
+@idempotent
 def cancel_booking(request, pk):
     """
     Cancel booking by tenant
-    POST /api/bookings/{id}/cancel/
+    POST /api/bookings/{id}/cancel/ (Idempotency-Key header supported)
     """
     try:
-        booking = Booking.objects.get(pk=pk)
+        booking = Booking.objects.select_related('listing').get(pk=pk)
     except Booking.DoesNotExist:
         return Response(
             {'error': 'Booking not found'},
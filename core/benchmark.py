@@ -0,0 +1,105 @@
+import json
+import statistics
+import subprocess
+import time
+
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+
+def git_commit():
+    """Current git commit of the project (None outside of git checkout)"""
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def percentile(values, percent):
+    """Percentile of sorted values (nearest rank)"""
+    if not values:
+        return 0.0
+    index = max(0, min(len(values) - 1, round(percent / 100 * len(values)) - 1))
+    return values[index]
+
+
+def measure(func, iterations=50, warmup=5, rollback=False):
+    """
+    Run func repeatedly and collect latency, throughput and query count
+    rollback=True runs every call in a transaction that is rolled back,
+    so write endpoints can be measured on the same data
+    """
+    def call():
+        if not rollback:
+            return func()
+        with transaction.atomic():
+            result = func()
+            transaction.set_rollback(True)
+        return result
+
+    for _ in range(warmup):
+        call()
+
+    with CaptureQueriesContext(connection) as queries:
+        result = call()
+    query_count = len(queries.captured_queries)
+
+    latencies = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        call()
+        latencies.append(time.perf_counter() - start)
+    latencies.sort()
+
+    total = sum(latencies)
+    return {
+        'status': getattr(result, 'status_code', None),
+        'queries': query_count,
+        'iterations': iterations,
+        'mean_ms': round(statistics.fmean(latencies) * 1000, 3),
+        'p50_ms': round(percentile(latencies, 50) * 1000, 3),
+        'p95_ms': round(percentile(latencies, 95) * 1000, 3),
+        'p99_ms': round(percentile(latencies, 99) * 1000, 3),
+        'max_ms': round(latencies[-1] * 1000, 3),
+        'rps': round(iterations / total, 1) if total else None,
+    }
+
+
+def write_results(path, suite, results, **extra):
+    """Save results as JSON, keys are sorted so files diff cleanly between commits"""
+    data = {
+        'suite': suite,
+        'commit': git_commit(),
+        'created_at': timezone.now().isoformat(),
+        **extra,
+        'results': results,
+    }
+    with open(path, 'w') as file:
+        json.dump(data, file, indent=2, sort_keys=True, default=str)
+        file.write('\n')
+    return data
+
+
+def compare(baseline_path, results):
+    """
+    Compare results with baseline JSON file
+    Returns rows (name, metric, old, new, change %)
+    """
+    with open(baseline_path) as file:
+        baseline = json.load(file)['results']
+
+    rows = []
+    for name, new in sorted(results.items()):
+        old = baseline.get(name)
+        if not old:
+            continue
+        for metric in ('p50_ms', 'p95_ms', 'queries', 'bytes'):
+            if old.get(metric) is None or new.get(metric) is None:
+                continue
+            change = (new[metric] - old[metric]) / old[metric] * 100 if old[metric] else 0.0
+            rows.append((name, metric, old[metric], new[metric], round(change, 1)))
+    return rows
@@ -76,3 +76,16 @@ class VerificationStatus(StrEnum):
     @classmethod
     def choices(cls):
         return [(verif_stat.name, verif_stat.value) for verif_stat in cls]
+
+
+class JobStatus(StrEnum):
+    """Status of background job"""
+    pending = "Pending"
+    running = "Running"
+    done = "Done"
+    failed = "Failed"
+    cancelled = "Cancelled"
+
+    @classmethod
+    def choices(cls):
+        return [(job_stat.name, job_stat.value) for job_stat in cls]
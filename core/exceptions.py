@@ -1,4 +1,4 @@
-from rest_framework.exceptions import APIException
+from rest_framework.exceptions import APIException, AuthenticationFailed
 from rest_framework import status
 
 
@@ -30,4 +30,21 @@ class ReviewError(APIException):
     """Exception if user already left a review"""
     status_code = status.HTTP_400_BAD_REQUEST
     default_detail = 'User already left a review'
-    default_code = 'already_reviewed'
\ No newline at end of file
+    default_code = 'already_reviewed'
+
+class InvalidTokenError(AuthenticationFailed):
+    """Exception if auth token is malformed, expired or revoked"""
+    default_detail = 'Token is invalid or expired'
+    default_code = 'invalid_token'
+
+class IdempotencyKeyError(APIException):
+    """Exception if Idempotency-Key is reused for a different request"""
+    status_code = status.HTTP_422_UNPROCESSABLE_ENTITY
+    default_detail = 'Idempotency-Key was already used for a different request'
+    default_code = 'idempotency_key_reused'
+
+class IdempotencyKeyInProgressError(APIException):
+    """Exception if request with the same Idempotency-Key is still running"""
+    status_code = status.HTTP_409_CONFLICT
+    default_detail = 'Request with this Idempotency-Key is still in progress, retry later'
+    default_code = 'idempotency_key_in_progress'
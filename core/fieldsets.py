@@ -0,0 +1,97 @@
+from rest_framework import serializers
+
+
+class Fieldset:
+    """
+    Sparse fieldset requested by client
+    ?fields=id,title,address.city  - only these fields (dotted names prune nested serializers)
+    ?expand=address,images         - only these nested relations are serialized
+    Missing parameters keep full representation
+    """
+    def __init__(self, fields=None, expand=None):
+        self.tree = None
+        if fields:
+            self.tree = {}
+            for path in fields:
+                node = self.tree
+                for name in path.split('.'):
+                    node = node.setdefault(name, {})
+        self.expand = set(expand) if expand is not None else None
+
+    @classmethod
+    def from_query_params(cls, query_params):
+        def names(param):
+            raw = query_params.get(param)
+            if raw is None:
+                return None
+            return [name.strip() for name in raw.split(',') if name.strip()]
+        return cls(names('fields'), names('expand'))
+
+    @property
+    def is_full(self):
+        return self.tree is None and self.expand is None
+
+    def includes(self, name, nested=False):
+        """Is top level field serialized (nested relations also have to be expanded)"""
+        if self.tree is not None:
+            return name in self.tree
+        if nested and self.expand is not None:
+            return name in self.expand
+        return True
+
+    def related(self, select_related=(), prefetch_related=()):
+        """
+        Relations to load for requested fields
+        Lookups are skipped when their top level field is not serialized
+        """
+        def needed(lookup):
+            return self.includes(lookup.split('__')[0], nested=True)
+        return [lookup for lookup in select_related if needed(lookup)], \
+            [lookup for lookup in prefetch_related if needed(lookup)]
+
+
+def _is_nested(field):
+    return isinstance(field, (serializers.BaseSerializer, serializers.RelatedField, serializers.ManyRelatedField))
+
+
+def _prune(fields, tree):
+    """Keep fields of tree level, recurse into nested serializers with sub-trees"""
+    for name in list(fields):
+        if name not in tree:
+            fields.pop(name)
+            continue
+        subtree = tree[name]
+        if not subtree:
+            continue
+        nested = fields[name]
+        nested = getattr(nested, 'child', nested)
+        if isinstance(nested, serializers.BaseSerializer):
+            _prune(nested.fields, subtree)
+    return fields
+
+
+class SparseFieldsetMixin:
+    """
+    Serializer mixin pruning the serializer tree by context['fieldset']
+    Pruned nested serializers are never built or run
+    """
+    def get_fields(self):
+        fields = super().get_fields()
+        fieldset = self.context.get('fieldset')
+        if fieldset is None or fieldset.is_full or not self._is_root():
+            return fields
+
+        if fieldset.tree is not None:
+            return _prune(fields, fieldset.tree)
+
+        for name in list(fields):
+            if _is_nested(fields[name]) and name not in fieldset.expand:
+                fields.pop(name)
+        return fields
+
+    def _is_root(self):
+        """Fieldset paths start at the top level serializer (or child of top level many=True)"""
+        parent = self.parent
+        if isinstance(parent, serializers.ListSerializer):
+            parent = parent.parent
+        return parent is None
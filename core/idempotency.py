@@ -0,0 +1,225 @@
+import hashlib
+import json
+import logging
+import random
+import threading
+import time
+from datetime import timedelta
+from functools import wraps
+
+import msgpack
+from django.conf import settings
+from django.core.files.uploadedfile import UploadedFile
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction, IntegrityError
+from django.utils import timezone
+from rest_framework.response import Response
+
+from .exceptions import IdempotencyKeyError, IdempotencyKeyInProgressError
+from .models import IdempotencyKey
+from .renderers import _default
+
+logger = logging.getLogger(__name__)
+
+HEADER = 'HTTP_IDEMPOTENCY_KEY'
+MAX_KEY_LENGTH = 255
+# Response headers stored with the data
+REPLAYED_HEADERS = ('Location',)
+# Share of new keys that also delete a batch of expired ones
+PURGE_PROBABILITY = 0.01
+PURGE_BATCH_SIZE = 500
+
+
+def idempotency_settings():
+    return getattr(settings, 'IDEMPOTENCY', {})
+
+
+def _canonical(value):
+    """JSON serializable form of parsed request data (form lists, uploaded files)"""
+    if hasattr(value, 'lists'):
+        return {key: [_canonical(item) for item in items] for key, items in value.lists()}
+    if isinstance(value, UploadedFile):
+        return {'name': value.name, 'size': value.size, 'content_type': value.content_type}
+    if isinstance(value, dict):
+        return {str(key): _canonical(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_canonical(item) for item in value]
+    if isinstance(value, bytes):
+        return value.hex()
+    return value
+
+
+def request_fingerprint(request):
+    """
+    sha256 of method, path and parsed data (canonical JSON)
+    Parsed data, not raw body: authentication (CSRF check) may have read the form already
+    """
+    digest = hashlib.sha256(f'{request.method} {request.path}\n'.encode())
+    digest.update(json.dumps(
+        _canonical(request.data), sort_keys=True, separators=(',', ':'), cls=DjangoJSONEncoder
+    ).encode())
+    return digest.hexdigest()
+
+
+class InflightRequests:
+    """
+    Keys being executed by this process, duplicates wait for the first request
+    instead of polling the store
+    """
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.events = {}
+
+    def start(self, scope):
+        """Event of running request with this key, None if caller runs it"""
+        with self.lock:
+            event = self.events.get(scope)
+            if event is None:
+                self.events[scope] = threading.Event()
+            return event
+
+    def finish(self, scope):
+        with self.lock:
+            event = self.events.pop(scope, None)
+        if event is not None:
+            event.set()
+
+
+inflight = InflightRequests()
+
+
+class IdempotencyStore:
+    """Idempotency keys with their first responses (IdempotencyKey rows with TTL)"""
+    @staticmethod
+    def lookup(user_id, key):
+        """Not expired record of the key"""
+        return IdempotencyKey.objects.filter(
+            user_id=user_id, key=key, expires_at__gt=timezone.now()
+        ).first()
+
+    @staticmethod
+    def begin(user_id, key, fingerprint):
+        """Claim the key, returns None if it is claimed already"""
+        now = timezone.now()
+        ttl = idempotency_settings().get('TTL', 60 * 60 * 24)
+        # Expired record of the key is evicted on reuse
+        IdempotencyKey.objects.filter(user_id=user_id, key=key, expires_at__lte=now).delete()
+        try:
+            with transaction.atomic():
+                record = IdempotencyKey.objects.create(
+                    user_id=user_id, key=key, fingerprint=fingerprint,
+                    expires_at=now + timedelta(seconds=ttl)
+                )
+        except IntegrityError:
+            return None
+        if random.random() < PURGE_PROBABILITY:
+            IdempotencyStore.purge_expired()
+        return record
+
+    @staticmethod
+    def complete(record, response):
+        """Save first response for replays"""
+        headers = {name: response[name] for name in REPLAYED_HEADERS if response.has_header(name)}
+        record.status_code = response.status_code
+        record.response = msgpack.packb({'data': response.data, 'headers': headers}, default=_default, datetime=False)
+        record.save(update_fields=['status_code', 'response', 'updated_at'])
+
+    @staticmethod
+    def release(record):
+        """Forget the key of failed request, so it can be retried"""
+        IdempotencyKey.objects.filter(pk=record.pk).delete()
+
+    @staticmethod
+    def replay(record):
+        payload = msgpack.unpackb(record.response, raw=False, strict_map_key=False)
+        headers = {**payload['headers'], 'Idempotent-Replayed': 'true'}
+        return Response(payload['data'], status=record.status_code, headers=headers)
+
+    @staticmethod
+    def wait(user_id, key, event):
+        """
+        Record of a duplicate request running now, once it is completed
+        Requests of this process are awaited on their event, others are polled
+        """
+        config = idempotency_settings()
+        deadline = time.monotonic() + config.get('WAIT_TIMEOUT', 10)
+        if event is not None:
+            event.wait(config.get('WAIT_TIMEOUT', 10))
+        while True:
+            record = IdempotencyStore.lookup(user_id, key)
+            if record is None or record.status_code is not None or time.monotonic() >= deadline:
+                return record
+            time.sleep(config.get('POLL_INTERVAL', 0.05))
+
+    @staticmethod
+    def purge_expired(batch_size=PURGE_BATCH_SIZE):
+        ids = list(IdempotencyKey.objects.filter(
+            expires_at__lte=timezone.now()
+        ).values_list('pk', flat=True)[:batch_size])
+        if ids:
+            IdempotencyKey.objects.filter(pk__in=ids).delete()
+        return len(ids)
+
+
+def idempotent(view_func):
+    """
+    Idempotency-Key header support for unsafe API views
+    First response (except 5xx and exceptions) is stored and replayed for retries
+    with the same key, concurrent duplicates wait for the first request to finish
+    Without the header the view runs as usual
+    Use under @api_view or with method_decorator(idempotent, name='post')
+    """
+    @wraps(view_func)
+    def wrapper(request, *args, **kwargs):
+        key = request.META.get(HEADER)
+        if not key or not request.user.is_authenticated:
+            return view_func(request, *args, **kwargs)
+        if len(key) > MAX_KEY_LENGTH:
+            raise IdempotencyKeyError(f'Idempotency-Key is longer than {MAX_KEY_LENGTH} characters')
+
+        user_id = request.user.id
+        fingerprint = request_fingerprint(request)
+        scope = (user_id, key)
+
+        # Retry of a completed request costs one lookup
+        record = IdempotencyStore.lookup(user_id, key)
+        event = None
+        if record is None:
+            event = inflight.start(scope)
+            if event is None:
+                record = IdempotencyStore.begin(user_id, key, fingerprint)
+                if record is not None:
+                    return run(request, record, scope, view_func, args, kwargs)
+                # Claimed by another process
+                inflight.finish(scope)
+        if record is not None and record.fingerprint != fingerprint:
+            raise IdempotencyKeyError()
+
+        if record is None or record.status_code is None:
+            record = IdempotencyStore.wait(user_id, key, event)
+            if record is None:
+                # First request failed and released the key
+                return wrapper(request, *args, **kwargs)
+            if record.fingerprint != fingerprint:
+                raise IdempotencyKeyError()
+            if record.status_code is None:
+                raise IdempotencyKeyInProgressError()
+        return IdempotencyStore.replay(record)
+
+    return wrapper
+
+
+def run(request, record, scope, view_func, args, kwargs):
+    """Execute the view for a claimed key and store its response"""
+    try:
+        response = view_func(request, *args, **kwargs)
+        if response.status_code >= 500 or not hasattr(response, 'data'):
+            IdempotencyStore.release(record)
+        else:
+            IdempotencyStore.complete(record, response)
+        return response
+    except Exception:
+        IdempotencyStore.release(record)
+        raise
+    finally:
+        inflight.finish(scope)
@@ -0,0 +1,322 @@
+import json
+import logging
+import os
+import random
+import signal
+import socket
+import threading
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction, DatabaseError, IntegrityError, close_old_connections, connection
+from django.db.models import F
+from django.utils import timezone
+from django.utils.module_loading import autodiscover_modules
+
+from .enums import JobStatus
+from .metrics import JOBS, JOB_DURATION, registry
+from .models import Job
+
+logger = logging.getLogger(__name__)
+
+PURGE_BATCH_SIZE = 1000
+
+# task name -> function, filled by tasks.py modules of installed apps
+tasks = {}
+
+
+def task(name):
+    """
+    Register function as background task: called with job kwargs,
+    JSON serializable return value is stored as job result
+    Tasks can run more than once (retries, expired leases), keep them idempotent
+    """
+    def decorator(func):
+        tasks[name] = func
+        return func
+    return decorator
+
+
+def load_tasks():
+    """Import tasks.py of every installed app"""
+    autodiscover_modules('tasks')
+
+
+class JobQueue:
+    """Jobs stored in database table, no broker needed"""
+    @staticmethod
+    def enqueue(name, kwargs=None, run_after=None, priority=0, max_attempts=None, user_id=None, unique_key=None,
+                coalesce=False):
+        """
+        Add job, call inside transaction.atomic() to enqueue it together with a change
+        With unique_key the existing job of that key is returned instead of a duplicate
+        With coalesce a pending job of the same task and kwargs is returned instead of a new one
+        (bursts of changes of one object run their refresh once)
+        """
+        if coalesce:
+            pending = Job.objects.filter(name=name, status=JobStatus.pending.name, kwargs=kwargs or {}).first()
+            if pending is not None:
+                return pending
+        fields = {
+            'name': name,
+            'kwargs': kwargs or {},
+            'run_after': run_after or timezone.now(),
+            'priority': priority,
+            'max_attempts': max_attempts or settings.JOB_QUEUE['MAX_ATTEMPTS'],
+            'user_id': user_id,
+            'unique_key': unique_key,
+        }
+        if unique_key is None:
+            return Job.objects.create(**fields)
+        try:
+            with transaction.atomic():
+                return Job.objects.create(**fields)
+        except IntegrityError:
+            return Job.objects.get(unique_key=unique_key)
+
+    @staticmethod
+    def claim(worker):
+        """
+        Lease next due job to worker, None if nothing is due
+        SKIP LOCKED lets concurrent workers pass rows locked by each other
+        """
+        now = timezone.now()
+        with transaction.atomic():
+            job = Job.objects.select_for_update(skip_locked=True).filter(
+                status=JobStatus.pending.name, run_after__lte=now
+            ).order_by('-priority', 'run_after', 'id').first()
+            if job is None:
+                return None
+            job.status = JobStatus.running.name
+            job.attempts += 1
+            job.worker = worker
+            job.started_at = now
+            job.locked_until = now + timedelta(seconds=settings.JOB_QUEUE['LEASE_SECONDS'])
+            job.save(update_fields=['status', 'attempts', 'worker', 'started_at', 'locked_until', 'updated_at'])
+        return job
+
+    @staticmethod
+    def execute(job):
+        """Run claimed job and store result or schedule retry, returns True on success"""
+        func = tasks.get(job.name)
+        started = timezone.now()
+        try:
+            if func is None:
+                raise LookupError(f'Unknown task {job.name}')
+            with LeaseHeartbeat(job):
+                result = func(**job.kwargs)
+            # Result that cannot be stored fails the attempt here, not in the update below
+            json.dumps(result, cls=DjangoJSONEncoder)
+        except Exception as e:
+            logger.exception(f'Job {job.id} {job.name} failed (attempt {job.attempts})')
+            JobQueue.retry_later(job, e)
+            return False
+        finally:
+            JOB_DURATION.observe((timezone.now() - started).total_seconds(), task=job.name)
+
+        now = timezone.now()
+        # Lease may have expired and job been claimed again meanwhile
+        Job.objects.filter(pk=job.pk, status=JobStatus.running.name, worker=job.worker).update(
+            status=JobStatus.done.name, result=result, error='',
+            finished_at=now, locked_until=None, updated_at=now
+        )
+        JOBS.inc(task=job.name, result='done')
+        return True
+
+    @staticmethod
+    def extend_lease(job):
+        """Extend lease of running job, False when the job is no longer owned by its worker"""
+        now = timezone.now()
+        return bool(Job.objects.filter(pk=job.pk, status=JobStatus.running.name, worker=job.worker).update(
+            locked_until=now + timedelta(seconds=settings.JOB_QUEUE['LEASE_SECONDS']), updated_at=now
+        ))
+
+    @staticmethod
+    def retry_later(job, error):
+        """Exponential backoff with jitter, failed after max_attempts"""
+        config = settings.JOB_QUEUE
+        now = timezone.now()
+        update = {'error': f'{type(error).__name__}: {error}', 'locked_until': None, 'updated_at': now}
+        if job.attempts >= job.max_attempts:
+            update.update(status=JobStatus.failed.name, finished_at=now)
+            JOBS.inc(task=job.name, result='failed')
+        else:
+            delay = min(config['RETRY_BACKOFF'] * 2 ** (job.attempts - 1), config['MAX_BACKOFF'])
+            update.update(
+                status=JobStatus.pending.name,
+                run_after=now + timedelta(seconds=delay * random.uniform(0.8, 1.2))
+            )
+            JOBS.inc(task=job.name, result='retried')
+        Job.objects.filter(pk=job.pk, status=JobStatus.running.name, worker=job.worker).update(**update)
+
+    @staticmethod
+    def requeue_expired():
+        """Return jobs with expired lease (crashed or stuck worker) to the queue"""
+        now = timezone.now()
+        expired = Job.objects.filter(status=JobStatus.running.name, locked_until__lt=now)
+        failed = expired.filter(attempts__gte=F('max_attempts')).update(
+            status=JobStatus.failed.name, error='Lease expired', finished_at=now, locked_until=None, updated_at=now
+        )
+        requeued = expired.update(
+            status=JobStatus.pending.name, error='Lease expired', run_after=now, locked_until=None, updated_at=now
+        )
+        if failed or requeued:
+            logger.warning(f'Expired job leases: {requeued} requeued, {failed} failed')
+        return requeued + failed
+
+    @staticmethod
+    def schedule_periodic(last_slots):
+        """
+        Enqueue due runs of JOB_QUEUE['PERIODIC'] jobs
+        Every interval slot has its unique_key, so many workers enqueue it once
+        last_slots ({name: slot}) skips slots this process enqueued already
+        """
+        now = timezone.now().timestamp()
+        for name, spec in settings.JOB_QUEUE['PERIODIC'].items():
+            slot = int(now // spec['interval'])
+            if last_slots.get(name) == slot:
+                continue
+            JobQueue.enqueue(
+                spec['task'], spec.get('kwargs'),
+                run_after=datetime.fromtimestamp(slot * spec['interval'], tz=dt_timezone.utc),
+                priority=spec.get('priority', 0),
+                unique_key=f'periodic:{name}:{slot}'
+            )
+            last_slots[name] = slot
+
+    @staticmethod
+    def cancel(job):
+        """Cancel job that has not started yet, returns False if it is running or finished"""
+        now = timezone.now()
+        cancelled = Job.objects.filter(pk=job.pk, status=JobStatus.pending.name).update(
+            status=JobStatus.cancelled.name, finished_at=now, updated_at=now
+        )
+        return bool(cancelled)
+
+    @staticmethod
+    def purge_finished(retention_days=None, batch_size=PURGE_BATCH_SIZE):
+        """Delete finished jobs older than retention period in batches"""
+        retention_days = retention_days or settings.JOB_QUEUE['RETENTION_DAYS']
+        finished_before = timezone.now() - timedelta(days=retention_days)
+        total = 0
+        for status in (JobStatus.done, JobStatus.failed, JobStatus.cancelled):
+            while True:
+                ids = list(Job.objects.filter(
+                    status=status.name, finished_at__lt=finished_before
+                ).values_list('pk', flat=True)[:batch_size])
+                if not ids:
+                    break
+                Job.objects.filter(pk__in=ids).delete()
+                total += len(ids)
+        return total
+
+
+class LeaseHeartbeat:
+    """
+    Side thread extending lease of a running job every LEASE_SECONDS / 3,
+    so long tasks (full rebuilds) are not requeued while they still run
+    """
+    def __init__(self, job):
+        self.job = job
+        self.stop = threading.Event()
+        self.thread = threading.Thread(target=self.run, name=f'job-heartbeat-{job.pk}', daemon=True)
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *args):
+        self.stop.set()
+        self.thread.join()
+
+    def run(self):
+        interval = settings.JOB_QUEUE['LEASE_SECONDS'] / 3
+        try:
+            while not self.stop.wait(interval):
+                try:
+                    if not JobQueue.extend_lease(self.job):
+                        logger.warning(f'Job {self.job.id} {self.job.name} lost its lease to another worker')
+                        return
+                except DatabaseError as e:
+                    logger.warning(f'Lease heartbeat of job {self.job.id} failed: {e}')
+        finally:
+            connection.close()
+
+
+def worker_name(index):
+    return f'{socket.gethostname()}:{os.getpid()}:{index}'
+
+
+def work(index, stop, poll_interval):
+    """Worker thread: claim and run jobs until stop is set"""
+    worker = worker_name(index)
+    try:
+        while not stop.is_set():
+            close_old_connections()
+            try:
+                job = JobQueue.claim(worker)
+            except DatabaseError as e:
+                # Lost connection or lock timeout, thread keeps serving
+                logger.warning(f'Job claim of {worker} failed: {e}')
+                stop.wait(poll_interval)
+                continue
+            if job is None:
+                stop.wait(poll_interval)
+                continue
+            try:
+                JobQueue.execute(job)
+            except Exception:
+                # Job stays running until its lease expires and requeue_expired returns it
+                logger.exception(f'Job {job.id} {job.name} could not be finished by {worker}')
+    finally:
+        connection.close()
+
+
+def drain():
+    """Run due jobs in the calling thread until queue is empty, returns number of jobs run"""
+    count = 0
+    worker = worker_name(0)
+    while True:
+        job = JobQueue.claim(worker)
+        if job is None:
+            return count
+        JobQueue.execute(job)
+        count += 1
+
+
+def serve(threads, poll_interval):
+    """
+    Worker process: thread pool running jobs, main thread schedules periodic jobs
+    and requeues expired leases, SIGTERM/SIGINT stop it after current jobs
+    """
+    import django
+    django.setup()
+    load_tasks()
+    stop = threading.Event()
+    for signum in (signal.SIGTERM, signal.SIGINT):
+        signal.signal(signum, lambda *args: stop.set())
+
+    pool = [
+        threading.Thread(target=work, args=(index, stop, poll_interval), name=f'job-worker-{index}')
+        for index in range(threads)
+    ]
+    for thread in pool:
+        thread.start()
+    logger.info(f'Job worker {os.getpid()} started with {threads} threads')
+
+    last_slots = {}
+    while not stop.is_set():
+        try:
+            close_old_connections()
+            JobQueue.schedule_periodic(last_slots)
+            JobQueue.requeue_expired()
+            registry.flush()
+        except Exception:
+            logger.exception('Job queue housekeeping failed')
+        stop.wait(settings.JOB_QUEUE['HOUSEKEEPING_INTERVAL'])
+
+    for thread in pool:
+        thread.join()
+    connection.close()
+    logger.info(f'Job worker {os.getpid()} stopped')
@@ -0,0 +1,270 @@
+import io
+from datetime import timedelta
+from itertools import count
+from urllib.parse import urlsplit, parse_qs
+
+from django.conf import settings
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from PIL import Image
+
+from bookings import urls as booking_urls
+from bookings.models import Booking, BookingHold
+from core.benchmark import measure, write_results, compare
+from core.enums import BookingStatus
+from listings import urls as listing_urls
+from listings.models import Listing, Amenity, ListingDeletionJob
+from users import urls as user_urls
+from users.models import User, Favorite
+from users.tokens import TokenService
+from .generate_synthetic_data import SYNTHETIC_PASSWORD
+
+IN_MEMORY_STORAGES = {
+    'default': {'BACKEND': 'django.core.files.storage.InMemoryStorage'},
+    'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'},
+}
+
+
+def png_file():
+    """Small PNG upload for image endpoint"""
+    buffer = io.BytesIO()
+    Image.new('RGB', (32, 32), 'white').save(buffer, 'PNG')
+    return SimpleUploadedFile('bench.png', buffer.getvalue(), content_type='image/png')
+
+
+class Command(BaseCommand):
+    """
+    Latency, throughput and query count of every endpoint of
+    listings/urls.py, bookings/urls.py and users/urls.py on the current database
+    Write endpoints run inside rolled back transactions.
+    python manage.py generate_synthetic_data --scale medium
+    python manage.py benchmark_api --output bench_api.json --compare bench_api_old.json
+    """
+    help = 'Benchmark API endpoints and save results as JSON'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=50)
+        parser.add_argument('--warmup', type=int, default=5)
+        parser.add_argument('--output', default='bench_api.json')
+        parser.add_argument('--compare', help='Baseline JSON file to compare with')
+        parser.add_argument('--only', action='append', help='Run only given URL names')
+
+    def handle(self, *args, **options):
+        fixtures = self.fixtures()
+        clients = {
+            role: self.client(user) for role, user in
+            [('anonymous', None), ('owner', fixtures['owner']), ('tenant', fixtures['tenant'])]
+        }
+
+        results = {}
+        covered = set()
+        for url_name, method, role, path, kwargs, rollback in self.scenarios(fixtures):
+            covered.add(url_name)
+            if options['only'] and url_name not in options['only']:
+                continue
+            request = getattr(clients[role], method.lower())
+            result = measure(
+                lambda: request(path, **kwargs() if callable(kwargs) else kwargs),
+                iterations=options['iterations'],
+                warmup=options['warmup'],
+                rollback=rollback
+            )
+            name = self.result_name(url_name, method, path)
+            results[name] = result
+            self.stdout.write(
+                f"{name:<48} {result['status']} "
+                f"p50={result['p50_ms']}ms p95={result['p95_ms']}ms "
+                f"rps={result['rps']} queries={result['queries']}"
+            )
+
+        uncovered = sorted(self.url_names() - covered)
+        if uncovered:
+            self.stdout.write(self.style.WARNING(f'Endpoints without scenario: {", ".join(uncovered)}'))
+
+        write_results(
+            options['output'], 'api', results,
+            iterations=options['iterations'],
+            dataset={
+                'users': User.objects.count(),
+                'listings': Listing.objects.count(),
+                'bookings': Booking.objects.count(),
+                'favorites': Favorite.objects.count(),
+            },
+            uncovered=uncovered,
+        )
+        self.stdout.write(self.style.SUCCESS(f'Results saved to {options["output"]}'))
+
+        if options['compare']:
+            for name, metric, old, new, change in compare(options['compare'], results):
+                self.stdout.write(f'{name:<48} {metric:<8} {old:>10} -> {new:>10} ({change:+}%)')
+
+    @staticmethod
+    def result_name(url_name, method, path):
+        """Stable result key: ids differ between datasets, so only query parameter names are kept"""
+        query = urlsplit(path).query
+        if not query:
+            return f'{url_name} {method}'
+        return f"{url_name} {method} ?{'&'.join(sorted(parse_qs(query)))}"
+
+    @staticmethod
+    def url_names():
+        """All named endpoints of benchmarked apps"""
+        return {
+            pattern.name
+            for module in (listing_urls, booking_urls, user_urls)
+            for pattern in module.urlpatterns
+            if pattern.name
+        }
+
+    @staticmethod
+    def client(user):
+        """Test client (optionally logged in)"""
+        client = Client(SERVER_NAME='localhost')
+        if user:
+            client.force_login(user)
+        return client
+
+    @staticmethod
+    def fixtures():
+        """Pick existing rows for endpoint parameters"""
+        today = timezone.now().date()
+        booking = Booking.objects.filter(
+            book_status=BookingStatus.pending.name,
+            check_in__gt=today,
+            listing__is_active=True
+        ).select_related('listing__owner', 'tenant').first()
+        if booking is None:
+            raise CommandError('No pending future bookings, run generate_synthetic_data first')
+
+        favorite = Favorite.objects.filter(user=booking.tenant).first()
+        if favorite is None:
+            favorite = Favorite.objects.create(user=booking.tenant, listing=booking.listing)
+
+        # Released by booking-hold-release scenario (rolled back), expires on its own
+        hold_from = today + timedelta(days=800)
+        hold = BookingHold.objects.create(
+            listing=booking.listing, tenant=booking.tenant,
+            check_in=hold_from, check_out=hold_from + timedelta(days=2),
+            expires_at=timezone.now() + timedelta(hours=1)
+        )
+
+        return {
+            'booking': booking,
+            'hold': hold,
+            'listing': booking.listing,
+            'owner': booking.listing.owner,
+            'tenant': booking.tenant,
+            'favorite': favorite,
+            'amenity_ids': list(Amenity.objects.values_list('id', flat=True)[:3]),
+            'listing_ids': list(Listing.objects.filter(is_active=True).values_list('id', flat=True)[:50]),
+            # Listing with deletion job of this owner (404 path without one)
+            'deleted_listing_id': ListingDeletionJob.objects.filter(
+                owner_id=booking.listing.owner_id
+            ).values_list('listing_id', flat=True).first() or booking.listing_id,
+            'today': today,
+        }
+
+    @staticmethod
+    def scenarios(fixtures):
+        """(url name, method, client role, path, request kwargs, rollback)"""
+        listing = fixtures['listing']
+        booking = fixtures['booking']
+        today = fixtures['today']
+        free_from = today + timedelta(days=700)
+        sequence = count()
+        listing_data = {
+            'title': 'Benchmark listing', 'description': 'Benchmark', 'house_type': 'apartment',
+            'max_stayers': 2, 'price_per_night': '80.00', 'bedrooms': 1, 'bathrooms': 1,
+            'amenity_ids': fixtures['amenity_ids'],
+            'address': {'country': 'Germany', 'city': 'Berlin', 'street': 'Benchstrasse 1', 'postal_code': '10115'},
+        }
+        json_kwargs = {'content_type': 'application/json'}
+        ids_csv = ','.join(map(str, fixtures['listing_ids']))
+
+        def path(name, **kwargs):
+            return reverse(name, kwargs=kwargs or None)
+
+        return [
+            # listings/urls.py
+            ('listing-list', 'GET', 'anonymous', path('listing-list'), {}, False),
+            ('listing-list', 'GET', 'anonymous', path('listing-list') + '?search=Berlin&min_price=50', {}, False),
+            ('listing-detail', 'GET', 'anonymous', path('listing-detail', pk=listing.id), {}, True),
+            ('listing-create', 'GET', 'owner', path('listing-create'), {}, False),
+            ('listing-create', 'POST', 'owner', path('listing-create'), {'data': listing_data, **json_kwargs}, True),
+            ('listing-manage', 'GET', 'owner', path('listing-manage', pk=listing.id), {}, False),
+            ('listing-manage', 'PUT', 'owner', path('listing-manage', pk=listing.id), {'data': listing_data, **json_kwargs}, True),
+            ('listing-manage', 'DELETE', 'owner', path('listing-manage', pk=listing.id), {}, True),
+            ('listing-toggle', 'POST', 'owner', path('listing-toggle', pk=listing.id), {}, True),
+            ('listing-add-image', 'POST', 'owner', path('listing-add-image', pk=listing.id),
+             lambda: {'data': {'image': png_file(), 'main': 'false'}}, True),
+            ('listing-similar', 'GET', 'anonymous', path('listing-similar', pk=listing.id), {}, False),
+            ('listing-deletion', 'GET', 'owner', path('listing-deletion', pk=fixtures['deleted_listing_id']), {}, False),
+            ('listing-sync', 'GET', 'anonymous', path('listing-sync') + '?limit=100', {}, False),
+            ('amenity-list', 'GET', 'anonymous', path('amenity-list'), {}, False),
+            # bookings/urls.py
+            ('booking-list-create', 'GET', 'tenant', path('booking-list-create'), {}, False),
+            ('booking-list-create', 'POST', 'tenant', path('booking-list-create'), {'data': {
+                'listing_id': listing.id, 'stayers': 1,
+                'check_in': str(free_from), 'check_out': str(free_from + timedelta(days=3)),
+            }, **json_kwargs}, True),
+            ('booking-availability', 'GET', 'anonymous', path('booking-availability') +
+             f'?listing_ids={ids_csv}&check_in={free_from}&check_out={free_from + timedelta(days=3)}', {}, False),
+            ('booking-calendar', 'GET', 'anonymous', path('booking-calendar', listing_id=listing.id), {}, False),
+            # Streams for authenticated users, only the rejected handshake is measured
+            ('booking-events', 'GET', 'anonymous', path('booking-events'), {}, False),
+            ('booking-hold-create', 'POST', 'tenant', path('booking-hold-create'), {'data': {
+                'listing_id': listing.id,
+                'check_in': str(free_from), 'check_out': str(free_from + timedelta(days=3)),
+            }, **json_kwargs}, True),
+            ('booking-hold-release', 'DELETE', 'tenant', path('booking-hold-release', pk=fixtures['hold'].id), {}, True),
+            ('owner-bookings', 'GET', 'owner', path('owner-bookings'), {}, False),
+            ('booking-detail', 'GET', 'tenant', path('booking-detail', pk=booking.id), {}, False),
+            ('booking-confirm', 'POST', 'owner', path('booking-confirm', pk=booking.id), {}, True),
+            ('booking-reject', 'POST', 'owner', path('booking-reject', pk=booking.id), {}, True),
+            ('booking-cancel', 'POST', 'tenant', path('booking-cancel', pk=booking.id), {}, True),
+            # users/urls.py
+            ('user-register', 'POST', 'anonymous', path('user-register'), lambda: {'data': {
+                'username': f'bench{next(sequence)}', 'email': f'bench{next(sequence)}@example.com',
+                'password': 'BenchPassword123', 'password_confirmation': 'BenchPassword123',
+            }, **json_kwargs}, True),
+            ('user-login', 'POST', 'anonymous', path('user-login'), {'data': {
+                'email': fixtures['tenant'].email, 'password': SYNTHETIC_PASSWORD,
+            }, **json_kwargs}, False),
+            ('user-token-refresh', 'POST', 'anonymous', path('user-token-refresh'), lambda: {'data': {
+                'refresh': TokenService.issue_pair(fixtures['tenant'])['refresh'],
+            }, **json_kwargs}, False),
+            ('user-logout', 'POST', 'anonymous', path('user-logout'), lambda: {
+                'HTTP_AUTHORIZATION': f"Bearer {TokenService.issue_pair(fixtures['tenant'])['access']}",
+            }, False),
+            ('user-list', 'GET', 'tenant', path('user-list'), {}, False),
+            ('user-detail', 'GET', 'tenant', path('user-detail', pk=fixtures['owner'].id), {}, False),
+            ('user-me', 'GET', 'tenant', path('user-me'), {}, False),
+            ('user-update-profile', 'PATCH', 'tenant', path('user-update-profile'),
+             {'data': {'first_name': 'Bench'}, **json_kwargs}, True),
+            ('user-statistics', 'GET', 'owner', path('user-statistics'), {}, False),
+            ('user-analytics', 'GET', 'owner', path('user-analytics') +
+             f'?date_from={today}&date_to={today + timedelta(days=365)}', {}, False),
+            ('favorite-list-create', 'GET', 'tenant', path('favorite-list-create'), {}, False),
+            ('favorite-list-create', 'POST', 'tenant', path('favorite-list-create'),
+             {'data': {'listing_id': fixtures['listing_ids'][-1]}, **json_kwargs}, True),
+            ('favorite-detail', 'GET', 'tenant', path('favorite-detail', pk=fixtures['favorite'].id), {}, False),
+            ('favorite-detail', 'DELETE', 'tenant', path('favorite-detail', pk=fixtures['favorite'].id), {}, True),
+            ('favorite-membership', 'GET', 'tenant', path('favorite-membership') + f'?listing_ids={ids_csv}', {}, False),
+            ('favorite-bulk', 'POST', 'tenant', path('favorite-bulk'),
+             {'data': {'listing_ids': fixtures['listing_ids']}, **json_kwargs}, True),
+            ('favorite-bulk', 'DELETE', 'tenant', path('favorite-bulk'),
+             {'data': {'listing_ids': fixtures['listing_ids']}, **json_kwargs}, True),
+            ('favorite-also-saved', 'GET', 'anonymous', path('favorite-also-saved', listing_id=listing.id), {}, False),
+        ]
+
+    def execute(self, *args, **options):
+        """
+        Uploaded images are kept in memory, benchmark never writes to MEDIA_ROOT
+        Rate limits are off, the benchmark client would exhaust its buckets
+        """
+        rate_limit = {**settings.RATE_LIMIT, 'ENABLED': False}
+        with override_settings(STORAGES=IN_MEMORY_STORAGES, RATE_LIMIT=rate_limit):
+            return super().execute(*args, **options)
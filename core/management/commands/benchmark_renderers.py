@@ -0,0 +1,89 @@
+import gzip
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client, override_settings
+from django.urls import reverse
+from rest_framework.renderers import JSONRenderer
+
+from bookings.models import Booking
+from core.benchmark import measure, write_results, compare
+from core.renderers import FastJSONRenderer, MessagePackRenderer, orjson
+from listings.models import Listing
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+class Command(BaseCommand):
+    """
+    Renderer and compression cost of real API payloads
+    (GET /api/listings/ page and GET /api/bookings/{id}/):
+    encode time and body size per format and content encoding
+    python manage.py benchmark_renderers --output bench_renderers.json
+    """
+    help = 'Benchmark response renderers and compression and save results as JSON'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=500)
+        parser.add_argument('--warmup', type=int, default=20)
+        parser.add_argument('--output', default='bench_renderers.json')
+        parser.add_argument('--compare', help='Baseline JSON file to compare with')
+
+    def handle(self, *args, **options):
+        booking = Booking.objects.select_related('tenant').first()
+        if booking is None or not Listing.objects.exists():
+            raise CommandError('No bookings, run generate_synthetic_data first')
+
+        payloads = {
+            'listings': self.payload(None, reverse('listing-list')),
+            'booking-detail': self.payload(booking.tenant, reverse('booking-detail', kwargs={'pk': booking.id})),
+        }
+        compression = settings.RESPONSE_COMPRESSION
+        renderers = {
+            'json': JSONRenderer(),
+            'fastjson' if orjson else 'fastjson (orjson missing)': FastJSONRenderer(),
+            'msgpack': MessagePackRenderer(),
+        }
+        encoders = {'identity': lambda body: body}
+        encoders['gzip'] = lambda body: gzip.compress(body, compresslevel=compression['GZIP_LEVEL'], mtime=0)
+        if brotli is not None:
+            encoders['br'] = lambda body: brotli.compress(body, quality=compression['BROTLI_QUALITY'])
+
+        results = {}
+        for payload_name, data in payloads.items():
+            for renderer_name, renderer in renderers.items():
+                body = renderer.render(data)
+                for encoding, encode in encoders.items():
+                    name = f'{payload_name} {renderer_name} {encoding}'
+                    result = measure(
+                        lambda: encode(renderer.render(data)),
+                        iterations=options['iterations'], warmup=options['warmup']
+                    )
+                    result['bytes'] = len(encode(body))
+                    results[name] = result
+                    self.stdout.write(
+                        f"{name:<40} {result['bytes']:>8} B  p50={result['p50_ms']}ms "
+                        f"p95={result['p95_ms']}ms ops={result['rps']}"
+                    )
+
+        write_results(options['output'], 'renderers', results, iterations=options['iterations'])
+        self.stdout.write(self.style.SUCCESS(f'Results saved to {options["output"]}'))
+
+        if options['compare']:
+            for name, metric, old, new, change in compare(options['compare'], results):
+                self.stdout.write(f'{name:<40} {metric:<8} {old:>10} -> {new:>10} ({change:+}%)')
+
+    @staticmethod
+    def payload(user, path):
+        """Response data of an endpoint (before rendering)"""
+        client = Client(SERVER_NAME='localhost')
+        if user:
+            client.force_login(user)
+        with override_settings(RATE_LIMIT={**settings.RATE_LIMIT, 'ENABLED': False}):
+            response = client.get(path)
+        if response.status_code != 200:
+            raise CommandError(f'GET {path} returned {response.status_code}')
+        return response.data
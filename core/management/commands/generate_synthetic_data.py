@@ -0,0 +1,284 @@
+import random
+from datetime import timedelta
+from decimal import Decimal
+from itertools import accumulate
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand
+from django.db.models import Max
+from django.utils import timezone
+
+from bookings.models import Booking, BookingStatusHistory
+from bookings.services import BookingRollupService
+from core.enums import AmenityCategory, BookingStatus, HouseType, UserRole
+from listings.models import Address, Amenity, Listing, ListingImg
+from reviews.models import Review
+from users.models import User, Favorite
+
+SCALES = {
+    'small': {'users': 200, 'listings': 100, 'bookings': 10, 'favorites': 5},
+    'medium': {'users': 20_000, 'listings': 10_000, 'bookings': 20, 'favorites': 10},
+    'large': {'users': 500_000, 'listings': 200_000, 'bookings': 30, 'favorites': 15},
+}
+
+CITIES = [
+    ('Berlin', 'Berlin', '10'), ('Hamburg', 'Hamburg', '20'), ('Munich', 'Bavaria', '80'),
+    ('Cologne', 'North Rhine-Westphalia', '50'), ('Frankfurt', 'Hesse', '60'),
+    ('Stuttgart', 'Baden-Wurttemberg', '70'), ('Dusseldorf', 'North Rhine-Westphalia', '40'),
+    ('Leipzig', 'Saxony', '04'), ('Dresden', 'Saxony', '01'), ('Hanover', 'Lower Saxony', '30'),
+]
+STREETS = ['Hauptstrasse', 'Bahnhofstrasse', 'Gartenweg', 'Schulstrasse', 'Lindenallee', 'Bergstrasse']
+AMENITIES = {
+    AmenityCategory.basic: ['Wi-Fi', 'Heating', 'Shared kitchen', 'Shared bathroom'],
+    AmenityCategory.comfort: ['Air conditioning', 'Full kitchen', 'Washing machine', 'TV', 'Elevator'],
+    AmenityCategory.premium: ['Dishwasher', 'Smart home', 'Parking spot', 'Balcony', 'Sauna', 'Pool'],
+}
+SYNTHETIC_PASSWORD = 'Synthetic123'
+# Base price per night by house type
+BASE_PRICES = {'room': 35, 'studio': 60, 'apartment': 90, 'house': 150}
+# Weights of booking statuses for past and future bookings
+PAST_STATUSES = [(BookingStatus.completed.name, 80), (BookingStatus.cancelled.name, 12), (BookingStatus.rejected.name, 8)]
+FUTURE_STATUSES = [(BookingStatus.confirmed.name, 55), (BookingStatus.pending.name, 30),
+                   (BookingStatus.cancelled.name, 10), (BookingStatus.rejected.name, 5)]
+
+
+class Command(BaseCommand):
+    """
+    Generates realistic synthetic dataset with bulk inserts
+    python manage.py generate_synthetic_data --scale medium
+    python manage.py generate_synthetic_data --users 1000000 --listings 300000 --bookings-per-listing 25
+    """
+    help = 'Generate users, listings, bookings, reviews and favorites for load tests'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--scale', choices=SCALES, default='small')
+        parser.add_argument('--users', type=int, help='Number of users (overrides scale)')
+        parser.add_argument('--listings', type=int, help='Number of listings (overrides scale)')
+        parser.add_argument('--bookings-per-listing', type=int, help='Average bookings per listing')
+        parser.add_argument('--favorites-per-user', type=int, help='Average favorites per user')
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        scale = SCALES[options['scale']]
+        self.users_count = options['users'] or scale['users']
+        self.listings_count = options['listings'] or scale['listings']
+        self.bookings_per_listing = options['bookings_per_listing'] or scale['bookings']
+        self.favorites_per_user = options['favorites_per_user'] or scale['favorites']
+        self.batch_size = options['batch_size']
+        self.random = random.Random(options['seed'])
+        self.today = timezone.now().date()
+
+        amenity_ids = self.create_amenities()
+        owner_ids, tenant_ids = self.create_users()
+        listings = self.create_listings(owner_ids, amenity_ids)
+        completed = self.create_bookings(listings, tenant_ids)
+        self.create_reviews(completed)
+        self.create_favorites(listings, tenant_ids)
+
+        self.stdout.write('Rebuilding booking rollups...')
+        BookingRollupService.rebuild()
+        self.stdout.write(self.style.SUCCESS('Synthetic dataset generated'))
+
+    def bulk_insert(self, model, objects, **kwargs):
+        """
+        bulk_create in batches and return ids of inserted rows
+        (MySQL does not return primary keys from bulk inserts)
+        """
+        last_id = model.objects.aggregate(last=Max('id'))['last'] or 0
+        model.objects.bulk_create(objects, batch_size=self.batch_size, **kwargs)
+        return list(
+            model.objects.filter(id__gt=last_id).order_by('id').values_list('id', flat=True)
+        )
+
+    def in_batches(self, total):
+        """Yield (start, size) of batches"""
+        for start in range(0, total, self.batch_size):
+            yield start, min(self.batch_size, total - start)
+
+    def create_amenities(self):
+        """Create fixed amenity dictionary"""
+        Amenity.objects.bulk_create([
+            Amenity(name=name, category=category.name)
+            for category, names in AMENITIES.items()
+            for name in names
+        ], ignore_conflicts=True)
+        return list(Amenity.objects.values_list('id', flat=True))
+
+    def create_users(self):
+        """Create owners (every 5th user) and tenants with one shared password hash"""
+        password = make_password(SYNTHETIC_PASSWORD)
+        run = self.random.randint(0, 10 ** 8)
+        owner_ids, tenant_ids = [], []
+
+        for start, size in self.in_batches(self.users_count):
+            roles = [
+                UserRole.owner.name if (start + offset) % 5 == 0 else UserRole.tenant.name
+                for offset in range(size)
+            ]
+            ids = self.bulk_insert(User, [
+                User(
+                    email=f'user{run}_{start + offset}@example.com',
+                    username=f'u{run}_{start + offset}',
+                    first_name=f'Name{start + offset}',
+                    last_name='Synthetic',
+                    role=role,
+                    password=password,
+                )
+                for offset, role in enumerate(roles)
+            ])
+            for user_id, role in zip(ids, roles):
+                (owner_ids if role == UserRole.owner.name else tenant_ids).append(user_id)
+
+        self.stdout.write(f'Users: {len(owner_ids)} owners, {len(tenant_ids)} tenants')
+        return owner_ids, tenant_ids
+
+    def create_listings(self, owner_ids, amenity_ids):
+        """Create addresses, listings, amenity links and images"""
+        house_types = [house_type.name for house_type in HouseType]
+        through = Listing.amenities.through
+        listings = []
+
+        for start, size in self.in_batches(self.listings_count):
+            cities = [self.random.choice(CITIES) for _ in range(size)]
+            address_ids = self.bulk_insert(Address, [
+                Address(
+                    city=city, land=land,
+                    street=f'{self.random.choice(STREETS)} {self.random.randint(1, 200)}',
+                    postal_code=f'{prefix}{self.random.randint(100, 999)}',
+                )
+                for city, land, prefix in cities
+            ])
+
+            rows = []
+            for address_id, (city, _, _) in zip(address_ids, cities):
+                house_type = self.random.choice(house_types)
+                bedrooms = 1 if house_type in ('room', 'studio') else self.random.randint(1, 5)
+                price = BASE_PRICES[house_type] * (1 + bedrooms * 0.25) * self.random.uniform(0.7, 1.6)
+                rows.append(Listing(
+                    title=f'{house_type.capitalize()} in {city} #{start + len(rows)}',
+                    description=f'Synthetic {house_type} listing in {city}',
+                    owner_id=self.random.choice(owner_ids),
+                    address_id=address_id,
+                    house_type=house_type,
+                    bedrooms=bedrooms,
+                    bathrooms=max(1, bedrooms // 2),
+                    max_stayers=bedrooms * 2,
+                    price_per_night=Decimal(price).quantize(Decimal('0.01')),
+                    is_active=self.random.random() > 0.05,
+                    views_count=self.random.randint(0, 5000),
+                ))
+            listing_ids = self.bulk_insert(Listing, rows)
+            listings.extend(
+                (listing_id, row.owner_id, row.price_per_night, row.max_stayers)
+                for listing_id, row in zip(listing_ids, rows)
+            )
+
+            through.objects.bulk_create([
+                through(listing_id=listing_id, amenity_id=amenity_id)
+                for listing_id in listing_ids
+                for amenity_id in self.random.sample(amenity_ids, self.random.randint(2, min(8, len(amenity_ids))))
+            ], batch_size=self.batch_size)
+            ListingImg.objects.bulk_create([
+                ListingImg(listing_id=listing_id, img=f'listings/synthetic/{listing_id}_{number}.jpg', main=number == 0)
+                for listing_id in listing_ids
+                for number in range(self.random.randint(1, 5))
+            ], batch_size=self.batch_size)
+
+        self.stdout.write(f'Listings: {len(listings)}')
+        return listings
+
+    def weighted_status(self, check_in):
+        """Realistic status for booking depending on its dates"""
+        statuses = PAST_STATUSES if check_in < self.today else FUTURE_STATUSES
+        return self.random.choices([status for status, _ in statuses], [weight for _, weight in statuses])[0]
+
+    def create_bookings(self, listings, tenant_ids):
+        """
+        Create non-overlapping bookings: every listing gets a sequence of stays
+        with gaps, about two thirds of them in the past
+        Returns (listing_id, tenant_id) pairs of completed stays
+        """
+        completed = []
+        buffer = []
+        total = 0
+        for listing_id, owner_id, price, max_stayers in listings:
+            day = self.today - timedelta(days=self.bookings_per_listing * 12 + self.random.randint(0, 60))
+            for _ in range(self.random.randint(0, self.bookings_per_listing * 2)):
+                day += timedelta(days=self.random.randint(0, 20))
+                nights = self.random.randint(1, 14)
+                check_in, check_out = day, day + timedelta(days=nights)
+                day = check_out
+                status = self.weighted_status(check_in)
+                tenant_id = self.random.choice(tenant_ids)
+                buffer.append(Booking(
+                    listing_id=listing_id, tenant_id=tenant_id,
+                    stayers=self.random.randint(1, max_stayers),
+                    check_in=check_in, check_out=check_out,
+                    total_price=price * nights, book_status=status,
+                ))
+                if status == BookingStatus.completed.name:
+                    completed.append((listing_id, tenant_id))
+
+            if len(buffer) >= self.batch_size:
+                total += self.flush_bookings(buffer)
+                buffer = []
+        total += self.flush_bookings(buffer)
+
+        self.stdout.write(f'Bookings: {total}')
+        return completed
+
+    def flush_bookings(self, bookings):
+        """Insert bookings with their status history"""
+        if not bookings:
+            return 0
+        booking_ids = self.bulk_insert(Booking, bookings)
+        history = []
+        for booking_id, booking in zip(booking_ids, bookings):
+            history.append(BookingStatusHistory(
+                booking_id=booking_id, history_status=BookingStatus.pending.name,
+                comment='Booking created', changed_by_id=booking.tenant_id
+            ))
+            if booking.book_status != BookingStatus.pending.name:
+                history.append(BookingStatusHistory(
+                    booking_id=booking_id, history_status=booking.book_status
+                ))
+        BookingStatusHistory.objects.bulk_create(history, batch_size=self.batch_size)
+        return len(booking_ids)
+
+    def create_reviews(self, completed):
+        """Reviews for 60% of completed stays, listing rating aggregates included"""
+        reviewed = set()
+        aggregates = {}
+        reviews = []
+        for listing_id, tenant_id in completed:
+            if (listing_id, tenant_id) in reviewed or self.random.random() > 0.6:
+                continue
+            reviewed.add((listing_id, tenant_id))
+            rating = self.random.choices([1, 2, 3, 4, 5], [3, 5, 12, 35, 45])[0]
+            reviews.append(Review(listing_id=listing_id, author_id=tenant_id, rating=rating,
+                                  comment='Synthetic review'))
+            count, total = aggregates.get(listing_id, (0, 0))
+            aggregates[listing_id] = (count + 1, total + rating)
+        Review.objects.bulk_create(reviews, batch_size=self.batch_size, ignore_conflicts=True)
+
+        updates = []
+        for listing_id, (count, total) in aggregates.items():
+            updates.append(Listing(id=listing_id, reviews_count=count, rating_sum=total))
+        Listing.objects.bulk_update(updates, ['reviews_count', 'rating_sum'], batch_size=self.batch_size)
+        self.stdout.write(f'Reviews: {len(reviews)}')
+
+    def create_favorites(self, listings, tenant_ids):
+        """Favorites with popularity skew (popular listings are saved more often)"""
+        listing_ids = [listing[0] for listing in listings]
+        cum_weights = list(accumulate(1 / (rank + 1) ** 0.8 for rank in range(len(listing_ids))))
+        total = 0
+        for start in range(0, len(tenant_ids), self.batch_size):
+            favorites = []
+            for user_id in tenant_ids[start:start + self.batch_size]:
+                count = self.random.randint(0, self.favorites_per_user * 2)
+                for listing_id in set(self.random.choices(listing_ids, cum_weights=cum_weights, k=count)):
+                    favorites.append(Favorite(user_id=user_id, listing_id=listing_id))
+            Favorite.objects.bulk_create(favorites, batch_size=self.batch_size, ignore_conflicts=True)
+            total += len(favorites)
+        self.stdout.write(f'Favorites: {total}')
@@ -0,0 +1,44 @@
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from bookings.models import Booking
+from listings.deletion import ListingDeletionService
+from reviews.models import Review
+
+# Listings are purged by their deletion jobs (with all dependents and image files)
+SOFT_DELETE_MODELS = [Review, Booking]
+
+
+class Command(BaseCommand):
+    """
+    Hard delete soft deleted listings, bookings and reviews after retention period
+    Runs in bounded batches, schedule it with cron
+    Listings are removed by due ListingDeletionJob rows, progress is kept per job
+    python manage.py purge_deleted --retention-days 30 --batch-size 500
+    """
+    help = 'Purge soft deleted records older than retention period'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--retention-days', type=int, default=settings.SOFT_DELETE['RETENTION_DAYS'])
+        parser.add_argument('--batch-size', type=int, default=settings.SOFT_DELETE['PURGE_BATCH_SIZE'])
+        parser.add_argument('--pause', type=float, default=0.0, help='Seconds to sleep between batches')
+
+    def handle(self, *args, **options):
+        deleted_before = timezone.now() - timedelta(days=options['retention_days'])
+
+        def on_batch(total):
+            if options['pause']:
+                time.sleep(options['pause'])
+
+        for model in SOFT_DELETE_MODELS:
+            count = model.objects.purge(deleted_before, options['batch_size'], on_batch)
+            self.stdout.write(f'{model.__name__}: {count} purged')
+
+        enqueued = ListingDeletionService.enqueue_missing()
+        processed = ListingDeletionService.run_due(options['batch_size'])
+        self.stdout.write(f'Listing: {processed} deletion jobs processed ({enqueued} enqueued)')
+        self.stdout.write(self.style.SUCCESS(f'Purged records deleted before {deleted_before:%Y-%m-%d %H:%M}'))
@@ -0,0 +1,44 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core.outbox import OutboxRelay
+
+
+class Command(BaseCommand):
+    """
+    Relay of transactional outbox: delivers committed domain events to in-process
+    handlers and OUTBOX_WEBHOOK_URLS in batches
+    Run a single relay per database, so events of one aggregate are delivered in order
+    Full batches are followed immediately, an idle queue is polled every --poll-interval
+    and a failing downstream (whole batch failed) is backed off up to MAX_BACKOFF
+    python manage.py relay_outbox
+    python manage.py relay_outbox --once --batch-size 500
+    """
+    help = 'Deliver outbox events to handlers and webhooks'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=settings.OUTBOX['BATCH_SIZE'])
+        parser.add_argument('--poll-interval', type=float, default=settings.OUTBOX['POLL_INTERVAL'])
+        parser.add_argument('--once', action='store_true', help='Deliver one batch and exit')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        poll_interval = options['poll_interval']
+        backoff = 0
+        try:
+            while True:
+                dispatched, failed = OutboxRelay.run_batch(batch_size)
+                if options['once']:
+                    self.stdout.write(self.style.SUCCESS(f'{dispatched} events dispatched, {failed} failed'))
+                    return
+                if failed and not dispatched:
+                    backoff = min(max(backoff * 2, poll_interval), settings.OUTBOX['MAX_BACKOFF'])
+                    time.sleep(backoff)
+                    continue
+                backoff = 0
+                if dispatched + failed < batch_size:
+                    time.sleep(poll_interval)
+        except KeyboardInterrupt:
+            self.stdout.write('Relay stopped')
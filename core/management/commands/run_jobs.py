@@ -0,0 +1,64 @@
+import multiprocessing
+import signal
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from core.jobs import JobQueue, serve, drain, load_tasks
+
+
+class Command(BaseCommand):
+    """
+    Worker pool of the database job queue: --processes worker processes
+    with --threads threads each, SIGTERM stops them after current jobs
+    Periodic jobs of JOB_QUEUE['PERIODIC'] are enqueued by the workers
+    python manage.py run_jobs --processes 2 --threads 4
+    python manage.py run_jobs --burst  (run due jobs in this process and exit)
+    """
+    help = 'Run background jobs from the database queue'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--processes', type=int, default=settings.JOB_QUEUE['PROCESSES'])
+        parser.add_argument('--threads', type=int, default=settings.JOB_QUEUE['THREADS'])
+        parser.add_argument('--poll-interval', type=float, default=settings.JOB_QUEUE['POLL_INTERVAL'])
+        parser.add_argument('--burst', action='store_true', help='Run due jobs until queue is empty and exit')
+
+    def handle(self, *args, **options):
+        if options['burst']:
+            load_tasks()
+            JobQueue.schedule_periodic({})
+            JobQueue.requeue_expired()
+            count = drain()
+            self.stdout.write(self.style.SUCCESS(f'{count} jobs run'))
+            return
+
+        if options['processes'] <= 1:
+            serve(options['threads'], options['poll_interval'])
+            return
+
+        # Children must not share connections of this process
+        connections.close_all()
+        processes = [
+            multiprocessing.Process(
+                target=serve, args=(options['threads'], options['poll_interval']), name=f'job-worker-{index}'
+            )
+            for index in range(options['processes'])
+        ]
+        for process in processes:
+            process.start()
+
+        def stop(*args):
+            # Forwarded SIGTERM, children finish their current jobs
+            for process in processes:
+                process.terminate()
+
+        signal.signal(signal.SIGTERM, stop)
+        try:
+            for process in processes:
+                process.join()
+        except KeyboardInterrupt:
+            # Children got SIGINT too and finish their current jobs
+            for process in processes:
+                process.join()
+        self.stdout.write('Job workers stopped')
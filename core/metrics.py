@@ -0,0 +1,311 @@
+import fcntl
+import glob
+import json
+import logging
+import os
+import threading
+import time
+import weakref
+from bisect import bisect_left
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class ShardOwner:
+    """Reference object of a thread shard"""
+
+
+class Metric:
+    """
+    Base in-process metric
+    Every thread writes to its own shard, so increments never take a lock;
+    the lock is taken once per thread to register the shard and on collection
+    Shard of a finished thread is merged into retired values and dropped
+    """
+    metric_type = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._local = threading.local()
+        self._shards = []
+        self._retired = {}
+        self._lock = threading.RLock()
+        registry.register(self)
+
+    def _shard(self):
+        """Values dict of the current thread"""
+        shard = getattr(self._local, 'values', None)
+        if shard is None:
+            shard = {}
+            self._local.values = shard
+            # Owner lives only in the thread local, it is freed when the thread exits
+            self._local.owner = owner = ShardOwner()
+            with self._lock:
+                self._shards.append(shard)
+            weakref.finalize(owner, self._retire, shard)
+        return shard
+
+    def _retire(self, shard):
+        """Merge shard of a finished thread into retired values"""
+        with self._lock:
+            for key, value in shard.items():
+                self._retired[key] = self.merge(self._retired.get(key), value)
+            self._shards = [other for other in self._shards if other is not shard]
+
+    def _key(self, labels):
+        """Label values tuple in labelnames order"""
+        return tuple(str(labels.get(name, '')) for name in self.labelnames)
+
+    def samples(self):
+        """Merged values of all thread shards: {label values: value}"""
+        with self._lock:
+            shards = list(self._shards)
+            merged = {key: self.merge(None, value) for key, value in self._retired.items()}
+        for shard in shards:
+            for key, value in list(shard.items()):
+                merged[key] = self.merge(merged.get(key), value)
+        return merged
+
+
+class Counter(Metric):
+    """Monotonic counter"""
+    metric_type = 'counter'
+
+    def inc(self, amount=1, **labels):
+        shard = self._shard()
+        key = self._key(labels)
+        shard[key] = shard.get(key, 0) + amount
+
+    @staticmethod
+    def merge(current, value):
+        return (current or 0) + value
+
+
+class Histogram(Metric):
+    """Histogram with fixed buckets, stores [bucket counts..., sum, count]"""
+    metric_type = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, documentation, labelnames)
+
+    def observe(self, value, **labels):
+        shard = self._shard()
+        key = self._key(labels)
+        values = shard.get(key)
+        if values is None:
+            values = [0] * (len(self.buckets) + 3)
+            shard[key] = values
+        values[bisect_left(self.buckets, value)] += 1
+        values[-2] += value
+        values[-1] += 1
+
+    @staticmethod
+    def merge(current, value):
+        if current is None:
+            return list(value)
+        return [left + right for left, right in zip(current, value)]
+
+
+class Registry:
+    """
+    Collection of all process metrics
+    In multiprocess mode every worker dumps its values to METRICS_MULTIPROC_DIR
+    and exposition sums files of all workers
+    Files of exited workers are merged into a retired file and removed
+    """
+    def __init__(self):
+        self.metrics = {}
+        self._last_flush = 0.0
+
+    def register(self, metric):
+        self.metrics[metric.name] = metric
+
+    @staticmethod
+    def multiprocess_dir():
+        return getattr(settings, 'METRICS', {}).get('MULTIPROC_DIR')
+
+    def snapshot(self):
+        """Serializable values of this process"""
+        return {
+            name: [[list(key), value] for key, value in metric.samples().items()]
+            for name, metric in self.metrics.items()
+        }
+
+    def flush(self, force=False):
+        """Dump process snapshot to multiprocess dir (at most once per FLUSH_INTERVAL)"""
+        directory = self.multiprocess_dir()
+        if not directory:
+            return
+        now = time.monotonic()
+        interval = getattr(settings, 'METRICS', {}).get('FLUSH_INTERVAL', 5)
+        if not force and now - self._last_flush < interval:
+            return
+        self._last_flush = now
+
+        path = os.path.join(directory, f'metrics_{os.getpid()}.json')
+        tmp_path = f'{path}.tmp'
+        try:
+            with open(tmp_path, 'w') as file:
+                json.dump(self.snapshot(), file)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f'Metrics flush failed: {e}')
+
+    def _merge(self, collected, snapshot):
+        """Add process snapshot to collected values"""
+        for name, samples in snapshot.items():
+            metric = self.metrics.get(name)
+            if metric is None:
+                continue
+            values = collected.setdefault(name, {})
+            for key, value in samples:
+                key = tuple(key)
+                values[key] = metric.merge(values.get(key), value)
+
+    @staticmethod
+    def _load(path):
+        try:
+            with open(path) as file:
+                return json.load(file)
+        except (OSError, ValueError):
+            return None
+
+    @staticmethod
+    def _pid_alive(pid):
+        try:
+            os.kill(pid, 0)
+        except ProcessLookupError:
+            return False
+        except PermissionError:
+            pass
+        return True
+
+    def retire_dead(self, directory):
+        """Merge dump files of exited workers into metrics_retired.json and remove them"""
+        with open(os.path.join(directory, 'metrics.lock'), 'w') as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            dead = []
+            for path in glob.glob(os.path.join(directory, 'metrics_*.json')):
+                pid = os.path.basename(path)[len('metrics_'):-len('.json')]
+                if pid.isdigit() and not self._pid_alive(int(pid)):
+                    dead.append(path)
+            if not dead:
+                return 0
+
+            retired_path = os.path.join(directory, 'metrics_retired.json')
+            retired = {}
+            self._merge(retired, self._load(retired_path) or {})
+            for path in dead:
+                self._merge(retired, self._load(path) or {})
+            tmp_path = f'{retired_path}.tmp'
+            with open(tmp_path, 'w') as file:
+                json.dump({
+                    name: [[list(key), value] for key, value in samples.items()]
+                    for name, samples in retired.items()
+                }, file)
+            os.replace(tmp_path, retired_path)
+            for path in dead:
+                os.remove(path)
+        return len(dead)
+
+    def collect(self):
+        """Values of all workers: {metric name: {label values: value}}"""
+        collected = {name: metric.samples() for name, metric in self.metrics.items()}
+        directory = self.multiprocess_dir()
+        if not directory:
+            return collected
+
+        self.flush(force=True)
+        try:
+            self.retire_dead(directory)
+        except OSError as e:
+            logger.warning(f'Metrics retirement failed: {e}')
+        collected = {name: {} for name in self.metrics}
+        for path in glob.glob(os.path.join(directory, 'metrics_*.json')):
+            snapshot = self._load(path)
+            if snapshot is not None:
+                self._merge(collected, snapshot)
+        return collected
+
+    def exposition(self):
+        """Prometheus text exposition format"""
+        lines = []
+        for name, samples in self.collect().items():
+            metric = self.metrics[name]
+            lines.append(f'# HELP {name} {metric.documentation}')
+            lines.append(f'# TYPE {name} {metric.metric_type}')
+            for key, value in sorted(samples.items()):
+                labels = list(zip(metric.labelnames, key))
+                if metric.metric_type == 'histogram':
+                    cumulative = 0
+                    for bound, count in zip(metric.buckets + (float('inf'),), value[:-2]):
+                        cumulative += count
+                        le = '+Inf' if bound == float('inf') else repr(bound)
+                        lines.append(f'{name}_bucket{_labels(labels + [("le", le)])} {cumulative}')
+                    lines.append(f'{name}_sum{_labels(labels)} {value[-2]}')
+                    lines.append(f'{name}_count{_labels(labels)} {value[-1]}')
+                else:
+                    lines.append(f'{name}{_labels(labels)} {value}')
+        return '\n'.join(lines) + '\n'
+
+
+def _escape(value):
+    """Escape label value for exposition format"""
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(labels):
+    """Render label set"""
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in labels) + '}'
+
+
+registry = Registry()
+
+# API metrics
+REQUEST_LATENCY = Histogram(
+    'http_request_duration_seconds', 'Request latency per URL name', ['view', 'method']
+)
+REQUESTS = Counter(
+    'http_requests_total', 'Requests per URL name and status code', ['view', 'method', 'status']
+)
+REJECTED_REQUESTS = Counter(
+    'http_requests_rejected_total', 'Requests shed by rate limiting and admission control', ['reason', 'scope']
+)
+
+# Booking domain metrics
+BOOKING_TRANSITIONS = Counter(
+    'booking_status_transitions_total', 'Booking status changes', ['from_status', 'to_status']
+)
+AVAILABILITY_CONFLICTS = Counter(
+    'booking_availability_conflicts_total', 'Booking attempts rejected because of date conflicts'
+)
+CACHE_REQUESTS = Counter(
+    'cache_requests_total', 'Cache lookups', ['cache', 'result']
+)
+
+# Transactional outbox relay (core/outbox.py)
+OUTBOX_EVENTS = Counter(
+    'outbox_events_total', 'Outbox delivery attempts per event type', ['event_type', 'result']
+)
+OUTBOX_DELIVERY_LAG = Histogram(
+    'outbox_delivery_lag_seconds', 'Time from event commit to delivery',
+    buckets=(0.1, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0, 900.0, 3600.0)
+)
+
+# Background job queue (core/jobs.py)
+JOBS = Counter(
+    'jobs_total', 'Finished job attempts per task', ['task', 'result']
+)
+JOB_DURATION = Histogram(
+    'job_duration_seconds', 'Job run time per task', ['task'],
+    buckets=(0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0, 30.0, 60.0, 300.0, 900.0)
+)
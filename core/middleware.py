@@ -0,0 +1,298 @@
+import gzip
+import json
+import logging
+import random
+import re
+import time
+from collections import Counter
+from contextlib import ExitStack
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import connections
+from django.http import JsonResponse
+from django.utils.cache import patch_vary_headers
+from rest_framework import serializers
+
+from .metrics import registry, REQUEST_LATENCY, REQUESTS, REJECTED_REQUESTS
+from .throttling import concurrency_limiter, admission_cost, rate_limit_settings
+
+logger = logging.getLogger('core.instrumentation')
+slow_query_logger = logging.getLogger('core.instrumentation.slow')
+
+DEFAULT_INSTRUMENTATION = {
+    'ENABLED': False,
+    'SAMPLE_RATE': 0.05,
+    'SLOW_QUERY_MS': 100,
+    'DUPLICATE_THRESHOLD': 3,
+}
+
+STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+NUMBER_LITERAL = re.compile(r'\b\d+(?:\.\d+)?\b')
+IN_LIST = re.compile(r'\(\s*(?:%s|\?)(?:\s*,\s*(?:%s|\?))*\s*\)')
+WHITESPACE = re.compile(r'\s+')
+
+try:
+    import brotli
+except ImportError:  # optional, responses fall back to gzip
+    brotli = None
+
+DEFAULT_COMPRESSION = {
+    'MIN_SIZE': 1024,
+    'GZIP_LEVEL': 6,
+    'BROTLI_QUALITY': 4,
+    # HTML pages (admin forms with CSRF tokens) are never compressed (BREACH)
+    'CONTENT_TYPES': ('application/json', 'application/msgpack', 'text/calendar'),
+}
+ACCEPT_ENCODING_TOKEN = re.compile(r'\s*([a-z*]+)\s*(?:;\s*q=([0-9.]+))?', re.IGNORECASE)
+
+current_metrics = ContextVar('current_metrics', default=None)
+
+
+def normalize_sql(sql):
+    """
+    SQL signature without literals and with collapsed IN lists
+    (e.g. queries of N+1 loops get the same signature)
+    """
+    sql = STRING_LITERAL.sub('?', sql)
+    sql = NUMBER_LITERAL.sub('?', sql)
+    sql = sql.replace('%s', '?')
+    sql = IN_LIST.sub('(...)', sql)
+    return WHITESPACE.sub(' ', sql).strip()
+
+
+class RequestMetrics:
+    """Collected metrics of a single request"""
+    def __init__(self, slow_query_ms):
+        self.slow_query_ms = slow_query_ms
+        self.queries = 0
+        self.sql_time = 0.0
+        self.serializer_time = 0.0
+        self.signatures = Counter()
+        self.slow_queries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        """Execute wrapper for database connections"""
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = time.perf_counter() - start
+            signature = normalize_sql(sql)
+            self.queries += 1
+            self.sql_time += duration
+            self.signatures[signature] += 1
+            if duration * 1000 >= self.slow_query_ms:
+                self.slow_queries.append((signature, duration))
+
+    def duplicates(self, threshold):
+        """Signatures executed at least threshold times (N+1 candidates)"""
+        return {sql: count for sql, count in self.signatures.items() if count >= threshold}
+
+
+def instrumentation_settings():
+    """Instrumentation settings merged with defaults"""
+    return {**DEFAULT_INSTRUMENTATION, **getattr(settings, 'SQL_INSTRUMENTATION', {})}
+
+
+def _timed_data(data_property):
+    """Wrap serializer .data to add its time to current request metrics"""
+    def data(self):
+        metrics = current_metrics.get()
+        if metrics is None:
+            return data_property.fget(self)
+        start = time.perf_counter()
+        try:
+            return data_property.fget(self)
+        finally:
+            metrics.serializer_time += time.perf_counter() - start
+    return property(data)
+
+
+def install_serializer_timing():
+    """Measure top level serializer .data (nested serializers dont call it)"""
+    for serializer_class in (serializers.Serializer, serializers.ListSerializer):
+        data_property = serializer_class.__dict__['data']
+        if not getattr(data_property.fget, 'instrumented', False):
+            wrapped = _timed_data(data_property)
+            wrapped.fget.instrumented = True
+            serializer_class.data = wrapped
+
+
+class QueryInstrumentationMiddleware:
+    """
+    Per request SQL instrumentation:
+    query count, SQL time, duplicated queries (N+1 signatures) and serializer time
+    Exposed in Server-Timing header and structured log line, slow queries logged separately
+    """
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.config = instrumentation_settings()
+        if self.config['ENABLED']:
+            install_serializer_timing()
+
+    def __call__(self, request):
+        if not self.config['ENABLED'] or random.random() >= self.config['SAMPLE_RATE']:
+            return self.get_response(request)
+
+        metrics = RequestMetrics(self.config['SLOW_QUERY_MS'])
+        token = current_metrics.set(metrics)
+        start = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(metrics))
+                response = self.get_response(request)
+        finally:
+            current_metrics.reset(token)
+        total_time = time.perf_counter() - start
+
+        self.report(request, response, metrics, total_time)
+        return response
+
+    def report(self, request, response, metrics, total_time):
+        """Add Server-Timing header and write log lines"""
+        view_name = getattr(request.resolver_match, 'view_name', None) or request.path
+        duplicates = metrics.duplicates(self.config['DUPLICATE_THRESHOLD'])
+
+        response['Server-Timing'] = ', '.join([
+            f'db;dur={metrics.sql_time * 1000:.2f};desc="{metrics.queries} queries"',
+            f'dup;desc="{sum(duplicates.values())} duplicated queries"',
+            f'ser;dur={metrics.serializer_time * 1000:.2f}',
+            f'total;dur={total_time * 1000:.2f}',
+        ])
+
+        logger.info(json.dumps({
+            'event': 'request_sql',
+            'view': view_name,
+            'method': request.method,
+            'path': request.path,
+            'status': response.status_code,
+            'queries': metrics.queries,
+            'sql_ms': round(metrics.sql_time * 1000, 2),
+            'serializer_ms': round(metrics.serializer_time * 1000, 2),
+            'total_ms': round(total_time * 1000, 2),
+            'duplicates': duplicates,
+        }))
+
+        for sql, duration in metrics.slow_queries:
+            slow_query_logger.warning(json.dumps({
+                'event': 'slow_query',
+                'view': view_name,
+                'path': request.path,
+                'duration_ms': round(duration * 1000, 2),
+                'sql': sql,
+            }))
+
+
+class MetricsMiddleware:
+    """Request latency histogram and request counter per URL name"""
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        start = time.perf_counter()
+        response = self.get_response(request)
+        duration = time.perf_counter() - start
+
+        view_name = getattr(request.resolver_match, 'url_name', None) or 'unmatched'
+        REQUEST_LATENCY.observe(duration, view=view_name, method=request.method)
+        REQUESTS.inc(view=view_name, method=request.method, status=response.status_code)
+        registry.flush()
+        return response
+
+
+class AdmissionControlMiddleware:
+    """
+    Sheds expensive requests with 503 when in-flight cost of the worker
+    exceeds RATE_LIMIT['MAX_INFLIGHT_COST'] (cost weights are set on views)
+    """
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        try:
+            return self.get_response(request)
+        finally:
+            cost = getattr(request, '_admission_cost', 0)
+            if cost:
+                concurrency_limiter.release(cost)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        config = rate_limit_settings()
+        if not config.get('ENABLED', True):
+            return None
+
+        cost = admission_cost(view_func, request)
+        if not cost:
+            return None
+        if not concurrency_limiter.acquire(cost, config.get('MAX_INFLIGHT_COST', 20)):
+            view_name = getattr(request.resolver_match, 'url_name', None)
+            REJECTED_REQUESTS.inc(reason='overload', scope=view_name)
+            logger.warning(f'Shed {view_name} request, in-flight cost {concurrency_limiter.inflight}')
+            response = JsonResponse({'detail': 'Server is busy, try again later'}, status=503)
+            response['Retry-After'] = str(config.get('RETRY_AFTER', 1))
+            return response
+
+        request._admission_cost = cost
+        return None
+
+
+def accepted_encodings(header):
+    """Encodings of Accept-Encoding header with q > 0"""
+    encodings = set()
+    for part in header.split(','):
+        match = ACCEPT_ENCODING_TOKEN.match(part)
+        if not match:
+            continue
+        try:
+            quality = float(match.group(2) or 1)
+        except ValueError:
+            continue
+        if quality > 0:
+            encodings.add(match.group(1).lower())
+    return encodings
+
+
+class CompressionMiddleware:
+    """
+    Brotli (when installed) or gzip compression of API responses
+    Bodies under RESPONSE_COMPRESSION['MIN_SIZE'] bytes are sent as is,
+    compressing them costs more CPU than it saves bandwidth
+    """
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.config = {**DEFAULT_COMPRESSION, **getattr(settings, 'RESPONSE_COMPRESSION', {})}
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if response.streaming or response.has_header('Content-Encoding'):
+            return response
+
+        content_type = response.get('Content-Type', '')
+        if not content_type.startswith(self.config['CONTENT_TYPES']):
+            return response
+        patch_vary_headers(response, ('Accept-Encoding',))
+        if len(response.content) < self.config['MIN_SIZE']:
+            return response
+
+        encodings = accepted_encodings(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+        if brotli is not None and 'br' in encodings:
+            content = brotli.compress(response.content, quality=self.config['BROTLI_QUALITY'])
+            encoding = 'br'
+        elif 'gzip' in encodings:
+            content = gzip.compress(response.content, compresslevel=self.config['GZIP_LEVEL'], mtime=0)
+            encoding = 'gzip'
+        else:
+            return response
+
+        if len(content) >= len(response.content):
+            return response
+        response.content = content
+        response['Content-Length'] = str(len(content))
+        response['Content-Encoding'] = encoding
+        # Compressed representation is not byte-equal, strong ETag becomes weak (as GZipMiddleware does)
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response['ETag'] = f'W/{etag}'
+        return response
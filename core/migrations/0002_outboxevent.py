@@ -0,0 +1,37 @@
+# Generated by Django 6.0 on 2026-10-19 12:05
+
+import django.core.serializers.json
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OutboxEvent',
+            fields=[
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Creation date')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Update date')),
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('aggregate_type', models.CharField(max_length=50)),
+                ('aggregate_id', models.PositiveBigIntegerField()),
+                ('event_type', models.CharField(max_length=100)),
+                ('payload', models.JSONField(default=dict, encoder=django.core.serializers.json.DjangoJSONEncoder)),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('running', 'Running'), ('done', 'Done'), ('failed', 'Failed'), ('cancelled', 'Cancelled')], default='pending', max_length=20)),
+                ('available_at', models.DateTimeField()),
+                ('attempts', models.PositiveSmallIntegerField(default=0)),
+                ('error', models.TextField(blank=True)),
+                ('dispatched_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'verbose_name': 'Outbox event',
+                'verbose_name_plural': 'Outbox events',
+                'db_table': 'outbox_events',
+                'indexes': [models.Index(fields=['status', 'id'], name='outbox_even_status_4c8c07_idx'), models.Index(fields=['aggregate_type', 'aggregate_id', 'status'], name='outbox_even_aggrega_4e1351_idx'), models.Index(fields=['status', 'dispatched_at'], name='outbox_even_status_84c1b1_idx')],
+            },
+        ),
+    ]
@@ -1,6 +1,8 @@
-from django.db import models
+from django.db import models, transaction
 from django.utils import timezone
 
+from .signals import bulk_soft_deleted
+
 
 class TimestampMixin(models.Model):
     """Custom mixin to add created_at and updated_at fields"""
@@ -17,11 +19,33 @@ class TimestampMixin(models.Model):
         abstract = True
 
 
+def soft_delete_fields(model):
+    """
+    Fields written by soft delete/restore, updated_at is bumped too,
+    so changes feeds (e.g. listings delta sync) see them
+    """
+    if hasattr(model, 'updated_at'):
+        return ['deleted_at', 'updated_at']
+    return ['deleted_at']
+
+
 class SoftDeleteQuerySet(models.QuerySet):
     """Custom Queryset for filtering of deleted records"""
     def delete(self):
-        """Soft delete for all Queryset"""
-        return self.update(deleted_at=timezone.now())
+        """
+        Soft delete for all Queryset, records deleted already are left as is
+        Sends bulk_soft_deleted with ids of deleted records (no post_save for querysets)
+        """
+        now = timezone.now()
+        with transaction.atomic(using=self.db):
+            pks = list(self.filter(deleted_at__isnull=True).select_for_update().values_list('pk', flat=True))
+            if not pks:
+                return 0
+            count = self.model._base_manager.using(self.db).filter(pk__in=pks).update(
+                **{field: now for field in soft_delete_fields(self.model)}
+            )
+            bulk_soft_deleted.send(sender=self.model, pks=pks, using=self.db)
+        return count
 
     def hard_delete(self):
         """Hard delete for all Queryset"""
@@ -52,6 +76,25 @@ class SoftDeleteManager(models.Manager):
         """Only deleted records"""
         return SoftDeleteQuerySet(self.model, using=self._db).show_deleted()
 
+    def purge(self, deleted_before, batch_size=500, on_batch=None):
+        """
+        Hard deletion of records soft deleted before given time
+        Every batch is a separate short transaction, so locks are never held for long
+        """
+        total = 0
+        while True:
+            ids = list(
+                self.deleted_only().filter(deleted_at__lt=deleted_before)
+                .order_by('pk').values_list('pk', flat=True)[:batch_size]
+            )
+            if not ids:
+                return total
+            with transaction.atomic(using=self.db):
+                self.all_records().filter(pk__in=ids).hard_delete()
+            total += len(ids)
+            if on_batch:
+                on_batch(total)
+
 
 class SoftDeleteMixin(models.Model):
     """
@@ -70,15 +113,33 @@ class SoftDeleteMixin(models.Model):
     class Meta:
         abstract = True
 
+    def _stored_deleted_at(self):
+        """Locked deletion date of the record row (instance can be stale)"""
+        return type(self)._base_manager.select_for_update().filter(
+            pk=self.pk
+        ).values_list('deleted_at', flat=True).first()
+
     def delete(self, using=None, keep_parents=False):
-        """Soft deletion of record(simply mark record as deleted)"""
-        self.deleted_at = timezone.now()
-        self.save(update_fields=['deleted_at'])
+        """
+        Soft deletion of record(simply mark record as deleted)
+        Record deleted already is left as is, so post_save receivers run once
+        """
+        with transaction.atomic():
+            deleted_at = self._stored_deleted_at()
+            if deleted_at is not None:
+                self.deleted_at = deleted_at
+                return
+            self.deleted_at = timezone.now()
+            self.save(update_fields=soft_delete_fields(type(self)))
 
     def restore(self):
         """Restoration of deleted record"""
-        self.deleted_at = None
-        self.save(update_fields=['deleted_at'])
+        with transaction.atomic():
+            if self._stored_deleted_at() is None:
+                self.deleted_at = None
+                return
+            self.deleted_at = None
+            self.save(update_fields=soft_delete_fields(type(self)))
 
     def hard_delete(self):
         """Hard deletion of record(from database)"""
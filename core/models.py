@@ -0,0 +1,103 @@
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models
+from .enums import JobStatus
+from .mixins import TimestampMixin
+
+
+class IdempotencyKey(TimestampMixin):
+    """
+    First response of a request sent with Idempotency-Key header
+    Replayed for retries with the same key until expires_at (core/idempotency.py)
+    """
+    user_id = models.PositiveBigIntegerField()
+    key = models.CharField(max_length=255)
+    # sha256 of method, path and body, same key with another request is rejected
+    fingerprint = models.CharField(max_length=64)
+    # Empty while the first request is in progress
+    status_code = models.PositiveSmallIntegerField(null=True, blank=True)
+    # MessagePack of response data and headers
+    response = models.BinaryField(blank=True, default=b'')
+    expires_at = models.DateTimeField()
+
+    class Meta:
+        db_table = 'idempotency_keys'
+        verbose_name = 'Idempotency key'
+        verbose_name_plural = 'Idempotency keys'
+        unique_together = ('user_id', 'key')
+        indexes = [models.Index(fields=['expires_at'])]
+
+    def __str__(self):
+        return f'{self.user_id}:{self.key} ({self.status_code or "in progress"})'
+
+
+class OutboxEvent(TimestampMixin):
+    """
+    Domain event written in the transaction of the change it describes
+    Delivered after commit by relay_outbox command (core/outbox.py), at least once
+    and in id order per aggregate
+    """
+    id = models.BigAutoField(primary_key=True)
+    aggregate_type = models.CharField(max_length=50)
+    aggregate_id = models.PositiveBigIntegerField()
+    event_type = models.CharField(max_length=100)
+    payload = models.JSONField(default=dict, encoder=DjangoJSONEncoder)
+    status = models.CharField(max_length=20, choices=JobStatus.choices(), default=JobStatus.pending.name)
+    # Next delivery attempt, moved forward by retry backoff
+    available_at = models.DateTimeField()
+    attempts = models.PositiveSmallIntegerField(default=0)
+    error = models.TextField(blank=True)
+    dispatched_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        db_table = 'outbox_events'
+        verbose_name = 'Outbox event'
+        verbose_name_plural = 'Outbox events'
+        indexes = [
+            models.Index(fields=['status', 'id']),
+            models.Index(fields=['aggregate_type', 'aggregate_id', 'status']),
+            models.Index(fields=['status', 'dispatched_at']),
+        ]
+
+    def __str__(self):
+        return f'{self.event_type} {self.aggregate_type}:{self.aggregate_id} ({self.status})'
+
+
+class Job(TimestampMixin):
+    """
+    Background job of the database queue (core/jobs.py)
+    Claimed by run_jobs workers with SELECT ... FOR UPDATE SKIP LOCKED
+    and leased until locked_until, so jobs of crashed workers are run again
+    """
+    id = models.BigAutoField(primary_key=True)
+    # Registered task name, e.g. "bookings.reap_expired_holds"
+    name = models.CharField(max_length=100)
+    kwargs = models.JSONField(default=dict, encoder=DjangoJSONEncoder)
+    status = models.CharField(max_length=20, choices=JobStatus.choices(), default=JobStatus.pending.name)
+    # Higher runs first
+    priority = models.SmallIntegerField(default=0)
+    run_after = models.DateTimeField()
+    attempts = models.PositiveSmallIntegerField(default=0)
+    max_attempts = models.PositiveSmallIntegerField(default=5)
+    # User who enqueued the job, may read its status
+    user_id = models.PositiveBigIntegerField(null=True, blank=True)
+    # Deduplication key, e.g. slot of periodic job
+    unique_key = models.CharField(max_length=255, null=True, blank=True, unique=True)
+    worker = models.CharField(max_length=255, blank=True)
+    locked_until = models.DateTimeField(null=True, blank=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    result = models.JSONField(null=True, blank=True, encoder=DjangoJSONEncoder)
+    error = models.TextField(blank=True)
+
+    class Meta:
+        db_table = 'jobs'
+        verbose_name = 'Job'
+        verbose_name_plural = 'Jobs'
+        indexes = [
+            models.Index(fields=['status', 'priority', 'run_after']),
+            models.Index(fields=['status', 'locked_until']),
+            models.Index(fields=['status', 'finished_at']),
+        ]
+
+    def __str__(self):
+        return f'{self.name} #{self.id} ({self.status})'
@@ -0,0 +1,211 @@
+import hashlib
+import hmac
+import json
+import logging
+import random
+import urllib.error
+import urllib.request
+from collections import defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
+
+from .enums import JobStatus
+from .metrics import OUTBOX_EVENTS, OUTBOX_DELIVERY_LAG, registry
+from .models import OutboxEvent
+
+logger = logging.getLogger(__name__)
+
+# Share of relay batches that also delete a batch of old dispatched events
+PURGE_PROBABILITY = 0.05
+PURGE_BATCH_SIZE = 1000
+# Webhook answers asking to slow down, their Retry-After (seconds) replaces backoff
+THROTTLED_STATUSES = (429, 503)
+
+# event type -> in-process handlers, '*' receives every event
+handlers = defaultdict(list)
+
+
+def subscribe(*event_types):
+    """
+    Register in-process handler of outbox events: handler(event)
+    Handlers run in relay_outbox process (import them from AppConfig.ready)
+    and must be idempotent, a failed event is delivered again to all of them
+    """
+    def decorator(func):
+        for event_type in event_types:
+            handlers[event_type].append(func)
+        return func
+    return decorator
+
+
+def emit(aggregate_type, aggregate_id, event_type, payload):
+    """
+    Record domain event, call it inside transaction.atomic() of the change
+    Request pays one INSERT, delivery is done by relay after commit
+    """
+    return OutboxEvent.objects.create(
+        aggregate_type=aggregate_type,
+        aggregate_id=aggregate_id,
+        event_type=event_type,
+        payload=payload,
+        available_at=timezone.now()
+    )
+
+
+class DeliveryError(Exception):
+    """Failed delivery of outbox event, retry_after (seconds) overrides backoff"""
+    def __init__(self, message, retry_after=None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def event_body(event):
+    """JSON body of webhook request"""
+    return json.dumps({
+        'id': event.id,
+        'type': event.event_type,
+        'aggregate_type': event.aggregate_type,
+        'aggregate_id': event.aggregate_id,
+        'payload': event.payload,
+        'created_at': event.created_at,
+    }, cls=DjangoJSONEncoder).encode()
+
+
+def post_webhook(url, event, body):
+    """
+    POST event to webhook, any non 2xx answer is a failure
+    X-Event-Id lets receivers drop duplicates, X-Signature is HMAC-SHA256 of body
+    """
+    config = settings.OUTBOX
+    headers = {
+        'Content-Type': 'application/json',
+        'X-Event-Id': str(event.id),
+        'X-Event-Type': event.event_type,
+    }
+    if config['WEBHOOK_SECRET']:
+        signature = hmac.new(config['WEBHOOK_SECRET'].encode(), body, hashlib.sha256).hexdigest()
+        headers['X-Signature'] = f'sha256={signature}'
+    request = urllib.request.Request(url, data=body, headers=headers, method='POST')
+    try:
+        with urllib.request.urlopen(request, timeout=config['WEBHOOK_TIMEOUT']) as response:
+            response.read()
+    except urllib.error.HTTPError as e:
+        retry_after = None
+        if e.code in THROTTLED_STATUSES:
+            try:
+                retry_after = float(e.headers.get('Retry-After', ''))
+            except ValueError:
+                pass
+        raise DeliveryError(f'{url} answered {e.code}', retry_after)
+    except OSError as e:
+        raise DeliveryError(f'{url}: {e}')
+
+
+class OutboxRelay:
+    """
+    Batched delivery of outbox events to handlers and OUTBOX['WEBHOOK_URLS']
+    At least once: events are marked done after delivery, a crash in between delivers them again
+    Ordered per aggregate: failed event holds back later events of its aggregate
+    until it is delivered or given up after MAX_ATTEMPTS
+    """
+    @staticmethod
+    def due_events(batch_size):
+        """Pending events ready for delivery in id order, except those behind a retried event"""
+        now = timezone.now()
+        pending = OutboxEvent.objects.filter(status=JobStatus.pending.name)
+        retried_before = pending.filter(
+            aggregate_type=OuterRef('aggregate_type'),
+            aggregate_id=OuterRef('aggregate_id'),
+            id__lt=OuterRef('id'),
+            available_at__gt=now
+        )
+        return list(
+            pending.filter(available_at__lte=now)
+            .exclude(Exists(retried_before))
+            .order_by('id')[:batch_size]
+        )
+
+    @staticmethod
+    def deliver(event):
+        """Run handlers and webhooks of event, raises DeliveryError on first failure"""
+        for handler in handlers[event.event_type] + handlers['*']:
+            try:
+                handler(event)
+            except DeliveryError:
+                raise
+            except Exception as e:
+                raise DeliveryError(f'{handler.__module__}.{handler.__qualname__}: {e!r}')
+        urls = settings.OUTBOX['WEBHOOK_URLS']
+        if urls:
+            body = event_body(event)
+            for url in urls:
+                post_webhook(url, event, body)
+
+    @staticmethod
+    def run_batch(batch_size=None):
+        """
+        Deliver one batch of due events, returns (dispatched, failed) counts
+        Delivered events are marked done with one UPDATE
+        """
+        events = OutboxRelay.due_events(batch_size or settings.OUTBOX['BATCH_SIZE'])
+        dispatched, failed = [], 0
+        failed_aggregates = set()
+        for event in events:
+            aggregate = (event.aggregate_type, event.aggregate_id)
+            if aggregate in failed_aggregates:
+                continue
+            try:
+                OutboxRelay.deliver(event)
+            except DeliveryError as e:
+                failed_aggregates.add(aggregate)
+                failed += 1
+                OutboxRelay.retry_later(event, e)
+                continue
+            dispatched.append(event)
+
+        if dispatched:
+            now = timezone.now()
+            OutboxEvent.objects.filter(pk__in=[event.pk for event in dispatched]).update(
+                status=JobStatus.done.name, dispatched_at=now, updated_at=now
+            )
+            for event in dispatched:
+                OUTBOX_EVENTS.inc(event_type=event.event_type, result='dispatched')
+                OUTBOX_DELIVERY_LAG.observe((now - event.created_at).total_seconds())
+        if random.random() < PURGE_PROBABILITY:
+            OutboxRelay.purge_dispatched()
+        registry.flush()
+        return len(dispatched), failed
+
+    @staticmethod
+    def retry_later(event, error):
+        """Exponential backoff of failed event, marked failed after MAX_ATTEMPTS"""
+        config = settings.OUTBOX
+        event.attempts += 1
+        event.error = str(error)
+        if event.attempts >= config['MAX_ATTEMPTS']:
+            event.status = JobStatus.failed.name
+            OUTBOX_EVENTS.inc(event_type=event.event_type, result='failed')
+            logger.error(f'Outbox event {event.id} {event.event_type} failed after {event.attempts} attempts: {error}')
+        else:
+            delay = error.retry_after
+            if delay is None:
+                delay = min(config['RETRY_BACKOFF'] * 2 ** (event.attempts - 1), config['MAX_BACKOFF'])
+            event.available_at = timezone.now() + timedelta(seconds=delay)
+            OUTBOX_EVENTS.inc(event_type=event.event_type, result='retried')
+            logger.warning(f'Outbox event {event.id} {event.event_type} retry in {delay}s: {error}')
+        event.save(update_fields=['status', 'attempts', 'error', 'available_at', 'updated_at'])
+
+    @staticmethod
+    def purge_dispatched(batch_size=PURGE_BATCH_SIZE):
+        """Delete a batch of events dispatched before retention period"""
+        dispatched_before = timezone.now() - timedelta(hours=settings.OUTBOX['RETENTION_HOURS'])
+        ids = list(OutboxEvent.objects.filter(
+            status=JobStatus.done.name, dispatched_at__lt=dispatched_before
+        ).values_list('pk', flat=True)[:batch_size])
+        if ids:
+            OutboxEvent.objects.filter(pk__in=ids).delete()
+        return len(ids)
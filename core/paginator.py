@@ -0,0 +1,57 @@
+import logging
+
+from django.conf import settings
+from django.core.paginator import Paginator
+from django.db import connections, DatabaseError
+from django.db.models import QuerySet
+from django.utils.functional import cached_property
+
+logger = logging.getLogger(__name__)
+
+
+def estimated_row_count(model, using='default'):
+    """
+    Row count of model table from database statistics (no table scan)
+    None when backend has no statistics (sqlite) or they are not collected yet
+    """
+    connection = connections[using]
+    table = model._meta.db_table
+    if connection.vendor == 'mysql':
+        sql = 'SELECT TABLE_ROWS FROM information_schema.TABLES WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s'
+    elif connection.vendor == 'postgresql':
+        sql = 'SELECT reltuples::bigint FROM pg_class WHERE oid = to_regclass(%s)'
+    else:
+        return None
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(sql, [table])
+            row = cursor.fetchone()
+    except DatabaseError as e:
+        logger.warning(f'Row estimate of {table} failed: {e}')
+        return None
+    if not row or row[0] is None or row[0] < 0:
+        return None
+    return int(row[0])
+
+
+class ApproximateCountPaginator(Paginator):
+    """
+    Paginator for admin changelists of large tables
+    Unfiltered lists are counted from table statistics instead of COUNT(*)
+    once the table is bigger than ADMIN_PAGINATION['APPROXIMATE_COUNT_THRESHOLD'],
+    filtered lists (and small tables) keep exact count
+    """
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        if isinstance(queryset, QuerySet) and self.is_unfiltered(queryset):
+            estimate = estimated_row_count(queryset.model, queryset.db)
+            if estimate is not None and estimate >= settings.ADMIN_PAGINATION['APPROXIMATE_COUNT_THRESHOLD']:
+                return estimate
+        return super().count
+
+    @staticmethod
+    def is_unfiltered(queryset):
+        """No conditions besides those of default manager (e.g. soft delete)"""
+        base = queryset.model._default_manager.all()
+        return queryset.query.where == base.query.where
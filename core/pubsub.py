@@ -0,0 +1,77 @@
+import asyncio
+import threading
+from collections import defaultdict, deque
+
+
+class Subscription:
+    """
+    Pending messages of one connection, bounded by max_pending
+    On overflow pending messages are dropped and the subscriber is flagged,
+    so it can tell its client to resync instead of growing without limit
+    """
+    def __init__(self, channels, max_pending):
+        self.channels = tuple(channels)
+        self.max_pending = max_pending
+        self.pending = deque()
+        self.overflowed = False
+        self.ready = asyncio.Event()
+        self.loop = asyncio.get_running_loop()
+
+    def push(self, message):
+        """Add message (runs in the loop of the subscriber)"""
+        if len(self.pending) >= self.max_pending:
+            self.pending.clear()
+            self.overflowed = True
+        else:
+            self.pending.append(message)
+        self.ready.set()
+
+    async def receive(self, timeout):
+        """(messages, overflowed) once something is pending, ([], False) after timeout"""
+        if not self.pending and not self.overflowed:
+            self.ready.clear()
+            try:
+                await asyncio.wait_for(self.ready.wait(), timeout)
+            except asyncio.TimeoutError:
+                return [], False
+        messages = list(self.pending)
+        self.pending.clear()
+        overflowed, self.overflowed = self.overflowed, False
+        return messages, overflowed
+
+
+class Broker:
+    """
+    In-process pub/sub fan-out by channel name
+    Messages are shared between subscribers (encode them once), publish is thread safe
+    """
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.channels = defaultdict(set)
+        self.count = 0
+
+    def subscribe(self, channels, max_pending):
+        subscription = Subscription(channels, max_pending)
+        with self.lock:
+            for channel in subscription.channels:
+                self.channels[channel].add(subscription)
+            self.count += 1
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self.lock:
+            for channel in subscription.channels:
+                subscribers = self.channels.get(channel)
+                if subscribers is not None:
+                    subscribers.discard(subscription)
+                    if not subscribers:
+                        del self.channels[channel]
+            self.count -= 1
+
+    def publish(self, channel, message):
+        """Deliver message to subscribers of channel, returns number of subscribers"""
+        with self.lock:
+            subscribers = list(self.channels.get(channel, ()))
+        for subscription in subscribers:
+            subscription.loop.call_soon_threadsafe(subscription.push, message)
+        return len(subscribers)
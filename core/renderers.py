@@ -0,0 +1,78 @@
+import msgpack
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import BaseParser
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:  # optional, falls back to DRF JSON encoder
+    orjson = None
+
+_encoder = JSONEncoder()
+
+
+def _default(obj):
+    """Types without native msgpack/orjson support (Decimal, UUID, lazy strings ...)"""
+    return _encoder.default(obj)
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    JSON renderer with orjson backend when installed
+    Output matches compact JSONRenderer, indented output (browsable API, ?indent)
+    is delegated to DRF encoder
+    """
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None or data is None:
+            return super().render(data, accepted_media_type, renderer_context)
+        if self.get_indent(accepted_media_type, renderer_context or {}):
+            return super().render(data, accepted_media_type, renderer_context)
+        return orjson.dumps(
+            data, default=_default,
+            option=orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+        )
+
+
+class MessagePackRenderer(BaseRenderer):
+    """MessagePack responses for Accept: application/msgpack"""
+    media_type = 'application/msgpack'
+    format = 'msgpack'
+    charset = None
+    render_style = 'binary'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return msgpack.packb(data, default=_default, datetime=False)
+
+
+class ICalendarRenderer(BaseRenderer):
+    """
+    text/calendar responses, views pass rendered .ics bytes as data
+    Errors (dicts) are rendered as plain text
+    """
+    media_type = 'text/calendar'
+    format = 'ics'
+    charset = 'utf-8'
+    render_style = 'binary'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        if isinstance(data, bytes):
+            return data
+        if isinstance(data, dict) and 'detail' in data:
+            data = data['detail']
+        return str(data).encode()
+
+
+class MessagePackParser(BaseParser):
+    """MessagePack request bodies (Content-Type: application/msgpack)"""
+    media_type = 'application/msgpack'
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        try:
+            return msgpack.unpackb(stream.read(), raw=False, strict_map_key=False)
+        except ValueError as e:
+            raise ParseError(f'MessagePack parse error - {e}')
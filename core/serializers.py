@@ -0,0 +1,14 @@
+from rest_framework import serializers
+
+from .models import Job
+
+
+class JobSerializer(serializers.ModelSerializer):
+    """Status of background job"""
+    class Meta:
+        model = Job
+        fields = [
+            'id', 'name', 'status', 'priority', 'run_after', 'attempts', 'max_attempts',
+            'started_at', 'finished_at', 'result', 'error', 'created_at', 'updated_at'
+        ]
+        read_only_fields = fields
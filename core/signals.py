@@ -0,0 +1,4 @@
+from django.dispatch import Signal
+
+# Queryset soft delete (core/mixins.py), sent with sender=model, pks=deleted ids, using=db alias
+bulk_soft_deleted = Signal()
@@ -0,0 +1,7 @@
+from .jobs import task, JobQueue
+
+
+@task('core.purge_finished_jobs')
+def purge_finished_jobs(retention_days=None):
+    """Delete finished jobs older than JOB_QUEUE['RETENTION_DAYS']"""
+    return {'deleted': JobQueue.purge_finished(retention_days)}
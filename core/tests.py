@@ -0,0 +1,229 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.decorators import api_view
+from rest_framework.response import Response
+from rest_framework.test import APIClient, APIRequestFactory, force_authenticate
+
+from .enums import JobStatus
+from .idempotency import idempotent
+from .jobs import JobQueue
+from .models import IdempotencyKey, Job
+from .throttling import LocalBucketStore, TokenBucketThrottle
+from bookings.models import Booking, BookingStatusHistory
+from core.enums import BookingStatus, UserRole
+from listings.models import Address, Listing
+from users.models import User
+
+
+def create_booking_fixture(cls):
+    """Owner, tenant, listing and a pending booking of the tenant"""
+    cls.owner = User.objects.create_user(
+        email='owner@example.com', password='OwnerPassword123',
+        username='owner', role=UserRole.owner.name
+    )
+    cls.tenant = User.objects.create_user(
+        email='tenant@example.com', password='TenantPassword123',
+        username='tenant', role=UserRole.tenant.name
+    )
+    cls.listing = Listing.objects.create(
+        title='Flat', description='Flat', owner=cls.owner, house_type='apartment',
+        address=Address.objects.create(city='Berlin', street='Hauptstrasse 1', postal_code='10115'),
+        max_stayers=2, bedrooms=1, bathrooms=1, price_per_night=80
+    )
+    check_in = timezone.now().date() + timedelta(days=10)
+    cls.booking = Booking.objects.create(
+        listing=cls.listing, tenant=cls.tenant, stayers=2, total_price=240,
+        check_in=check_in, check_out=check_in + timedelta(days=3)
+    )
+
+
+class IdempotencyKeyTest(TestCase):
+    """Idempotency-Key: replay of the first response, reuse for other requests, release on failure"""
+    @classmethod
+    def setUpTestData(cls):
+        create_booking_fixture(cls)
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.tenant)
+        self.url = reverse('booking-cancel', args=[self.booking.id])
+
+    def cancel(self, key, data=None):
+        return self.client.post(self.url, data or {}, format='json', HTTP_IDEMPOTENCY_KEY=key)
+
+    def test_retry_replays_first_response(self):
+        first = self.cancel('cancel-1')
+        second = self.cancel('cancel-1')
+
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(second.status_code, 200)
+        self.assertEqual(second.data, first.data)
+        self.assertEqual(second['Idempotent-Replayed'], 'true')
+        self.assertEqual(BookingStatusHistory.objects.filter(booking=self.booking).count(), 1)
+
+    def test_key_reused_for_other_request(self):
+        self.cancel('cancel-1', {'reason': 'plans changed'})
+        response = self.cancel('cancel-1', {'reason': 'other'})
+        self.assertEqual(response.status_code, 422)
+
+    def test_form_post_with_session_and_csrf(self):
+        client = APIClient(enforce_csrf_checks=True)
+        client.force_login(self.tenant)
+        token = 'a' * 32
+        client.cookies['csrftoken'] = token
+
+        response = client.post(
+            self.url, {'csrfmiddlewaretoken': token, 'reason': 'plans changed'},
+            HTTP_IDEMPOTENCY_KEY='form-1'
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(IdempotencyKey.objects.filter(key='form-1').count(), 1)
+
+    def test_failed_request_releases_key(self):
+        calls = []
+
+        @api_view(['POST'])
+        @idempotent
+        def flaky(request):
+            calls.append(request.data)
+            if len(calls) == 1:
+                raise RuntimeError('downstream failed')
+            return Response({'calls': len(calls)}, status=201)
+
+        factory = APIRequestFactory()
+
+        def post():
+            request = factory.post('/flaky/', {'value': 1}, format='json', HTTP_IDEMPOTENCY_KEY='flaky-1')
+            force_authenticate(request, self.tenant)
+            return flaky(request)
+
+        with self.assertRaises(RuntimeError):
+            post()
+        self.assertFalse(IdempotencyKey.objects.filter(key='flaky-1').exists())
+        self.assertEqual(post().status_code, 201)
+        self.assertEqual(post()['Idempotent-Replayed'], 'true')
+        self.assertEqual(len(calls), 2)
+
+
+@override_settings(RATE_LIMIT={'ENABLED': True, 'RATES': {'read': '2/s', 'write': '2/s'}})
+class TokenBucketThrottleTest(TestCase):
+    """Buckets reject when empty, refill over time and are keyed by a trusted client address"""
+    def setUp(self):
+        self.now = 1000.0
+        monotonic = mock.patch('core.throttling.time.monotonic', lambda: self.now)
+        store = mock.patch('core.throttling._store', LocalBucketStore())
+        monotonic.start()
+        store.start()
+        self.addCleanup(monotonic.stop)
+        self.addCleanup(store.stop)
+        self.factory = APIRequestFactory()
+
+    def allow(self, throttle=None, **headers):
+        request = self.factory.get('/listings/', REMOTE_ADDR='10.0.0.1', **headers)
+        request.user = None
+        return (throttle or TokenBucketThrottle()).allow_request(request, None)
+
+    def test_reject_when_empty_and_refill(self):
+        self.assertEqual([self.allow(), self.allow()], [True, True])
+        throttle = TokenBucketThrottle()
+        self.assertFalse(self.allow(throttle))
+        self.assertEqual(throttle.wait(), 1)
+
+        self.now += 0.5
+        self.assertEqual([self.allow(), self.allow()], [True, False])
+        self.now += 10
+        self.assertEqual([self.allow() for _ in range(3)], [True, True, False])
+
+    def test_forwarded_for_does_not_give_new_bucket(self):
+        results = [self.allow(HTTP_X_FORWARDED_FOR=f'192.0.2.{i}') for i in range(3)]
+        self.assertEqual(results, [True, True, False])
+
+    @override_settings(REST_FRAMEWORK={'NUM_PROXIES': 1})
+    def test_forwarded_for_behind_proxy(self):
+        results = [self.allow(HTTP_X_FORWARDED_FOR=f'192.0.2.{i}') for i in range(3)]
+        self.assertEqual(results, [True, True, True])
+
+
+class JobQueueTest(TestCase):
+    """Claim order, retries with backoff, failing after max attempts and expired leases"""
+    def setUp(self):
+        calls = []
+
+        def flaky(fail=False):
+            calls.append(fail)
+            if fail:
+                raise ValueError('task failed')
+            return {'calls': len(calls)}
+
+        registry = mock.patch.dict('core.jobs.tasks', {'tests.flaky': flaky})
+        registry.start()
+        self.addCleanup(registry.stop)
+
+    def test_claim_order(self):
+        later = JobQueue.enqueue('tests.flaky', run_after=timezone.now() + timedelta(hours=1), priority=9)
+        low = JobQueue.enqueue('tests.flaky')
+        high = JobQueue.enqueue('tests.flaky', priority=5)
+
+        self.assertEqual(JobQueue.claim('w1').pk, high.pk)
+        job = JobQueue.claim('w2')
+        self.assertEqual(job.pk, low.pk)
+        self.assertEqual((job.status, job.attempts, job.worker), (JobStatus.running.name, 1, 'w2'))
+        self.assertIsNone(JobQueue.claim('w3'))
+        self.assertEqual(Job.objects.get(pk=later.pk).status, JobStatus.pending.name)
+
+    def test_execute_stores_result(self):
+        JobQueue.enqueue('tests.flaky')
+        self.assertTrue(JobQueue.execute(JobQueue.claim('w1')))
+        job = Job.objects.get()
+        self.assertEqual((job.status, job.result), (JobStatus.done.name, {'calls': 1}))
+        self.assertIsNone(job.locked_until)
+
+    def test_retry_with_backoff_then_fail(self):
+        JobQueue.enqueue('tests.flaky', {'fail': True}, max_attempts=2)
+        before = timezone.now()
+        with self.assertLogs('core.jobs', 'ERROR'):
+            self.assertFalse(JobQueue.execute(JobQueue.claim('w1')))
+
+        job = Job.objects.get()
+        self.assertEqual((job.status, job.attempts), (JobStatus.pending.name, 1))
+        self.assertEqual(job.error, 'ValueError: task failed')
+        self.assertGreaterEqual(job.run_after, before + timedelta(seconds=4))
+        self.assertIsNone(JobQueue.claim('w1'))
+
+        Job.objects.update(run_after=timezone.now())
+        with self.assertLogs('core.jobs', 'ERROR'):
+            self.assertFalse(JobQueue.execute(JobQueue.claim('w1')))
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), (JobStatus.failed.name, 2))
+        self.assertIsNotNone(job.finished_at)
+
+    def test_expired_lease_requeued(self):
+        JobQueue.enqueue('tests.flaky')
+        stale = JobQueue.claim('w1')
+        self.assertTrue(JobQueue.extend_lease(stale))
+        self.assertEqual(JobQueue.requeue_expired(), 0)
+
+        Job.objects.update(locked_until=timezone.now() - timedelta(seconds=1))
+        self.assertEqual(JobQueue.requeue_expired(), 1)
+        job = Job.objects.get()
+        self.assertEqual((job.status, job.error), (JobStatus.pending.name, 'Lease expired'))
+        self.assertFalse(JobQueue.extend_lease(stale))
+
+        # Old worker finishing late does not overwrite the new attempt
+        current = JobQueue.claim('w2')
+        JobQueue.execute(stale)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.worker, job.attempts), (JobStatus.running.name, 'w2', 2))
+        self.assertTrue(JobQueue.execute(current))
+        self.assertEqual(Job.objects.get().status, JobStatus.done.name)
+
+    def test_expired_lease_of_last_attempt_fails(self):
+        JobQueue.enqueue('tests.flaky', max_attempts=1)
+        JobQueue.claim('w1')
+        Job.objects.update(locked_until=timezone.now() - timedelta(seconds=1))
+        self.assertEqual(JobQueue.requeue_expired(), 1)
+        self.assertEqual(Job.objects.get().status, JobStatus.failed.name)
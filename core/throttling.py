@@ -0,0 +1,226 @@
+import logging
+import math
+import os
+import random
+import sqlite3
+import threading
+import time
+
+from django.conf import settings
+from rest_framework.throttling import BaseThrottle
+
+from .metrics import REJECTED_REQUESTS
+
+logger = logging.getLogger(__name__)
+
+# Share of new bucket inserts that also delete idle buckets of the shared store
+PURGE_PROBABILITY = 0.001
+PERIODS = {'s': 1, 'sec': 1, 'm': 60, 'min': 60, 'h': 3600, 'hour': 3600, 'd': 86400, 'day': 86400}
+
+
+def rate_limit_settings():
+    return getattr(settings, 'RATE_LIMIT', {})
+
+
+def parse_rate(rate):
+    """'60/min' -> (capacity 60, refill 1 token per second)"""
+    count, period = rate.split('/')
+    return int(count), int(count) / PERIODS[period]
+
+
+def refill(tokens, updated, now, capacity, refill_rate):
+    """Tokens of a bucket at given time"""
+    return min(capacity, tokens + (now - updated) * refill_rate)
+
+
+class LocalBucketStore:
+    """
+    In-process token buckets (one worker or per-worker limits)
+    Buckets idle for an hour are full again, equal to missing ones, and are dropped
+    """
+    def __init__(self):
+        self._buckets = {}
+        self._lock = threading.Lock()
+        self._next_purge = 0.0
+
+    def take(self, key, capacity, refill_rate, cost=1):
+        """Take cost tokens, return seconds to wait (0 when allowed)"""
+        now = time.monotonic()
+        with self._lock:
+            if now >= self._next_purge:
+                self._purge(now)
+            tokens, updated = self._buckets.get(key, (capacity, now))
+            tokens = refill(tokens, updated, now, capacity, refill_rate)
+            if tokens < cost:
+                self._buckets[key] = (tokens, now)
+                return (cost - tokens) / refill_rate
+            self._buckets[key] = (tokens - cost, now)
+            return 0
+
+    def _purge(self, now):
+        """Drop idle buckets (callers hold the lock)"""
+        self._next_purge = now + 60
+        self._buckets = {
+            key: (tokens, updated) for key, (tokens, updated) in self._buckets.items()
+            if now - updated < 3600
+        }
+
+
+class SharedBucketStore:
+    """
+    Token buckets in a local SQLite file shared by all workers of a host
+    BEGIN IMMEDIATE serializes read-modify-write of a bucket between processes
+    """
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+
+    def _connection(self):
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            connection = sqlite3.connect(self.path, timeout=1, isolation_level=None)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=OFF')
+            connection.execute(
+                'CREATE TABLE IF NOT EXISTS buckets '
+                '(key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL)'
+            )
+            self._local.connection = connection
+        return connection
+
+    def take(self, key, capacity, refill_rate, cost=1):
+        """Take cost tokens, return seconds to wait (0 when allowed)"""
+        now = time.time()
+        try:
+            connection = self._connection()
+            connection.execute('BEGIN IMMEDIATE')
+            try:
+                row = connection.execute(
+                    'SELECT tokens, updated FROM buckets WHERE key = ?', (key,)
+                ).fetchone()
+                tokens = refill(*row, now, capacity, refill_rate) if row else capacity
+                wait = 0 if tokens >= cost else (cost - tokens) / refill_rate
+                if not wait:
+                    tokens -= cost
+                connection.execute(
+                    'INSERT OR REPLACE INTO buckets (key, tokens, updated) VALUES (?, ?, ?)',
+                    (key, tokens, now)
+                )
+                if row is None and random.random() < PURGE_PROBABILITY:
+                    connection.execute('DELETE FROM buckets WHERE updated < ?', (now - 3600,))
+                connection.execute('COMMIT')
+            except Exception:
+                connection.execute('ROLLBACK')
+                raise
+            return wait
+        except sqlite3.Error as e:
+            # Limiter must never take the API down, fail open
+            logger.warning(f'Rate limit store error: {e}')
+            return 0
+
+
+_store = None
+
+
+def get_bucket_store():
+    """Store configured by RATE_LIMIT['STORE'] (local/shared)"""
+    global _store
+    if _store is None:
+        config = rate_limit_settings()
+        if config.get('STORE') == 'shared':
+            _store = SharedBucketStore(config['SHARED_PATH'])
+        else:
+            _store = LocalBucketStore()
+    return _store
+
+
+class TokenBucketThrottle(BaseThrottle):
+    """
+    Token bucket per client (user id or IP) and endpoint class
+    Endpoint class is the view throttle_scope, or read/write by request method;
+    rates are RATE_LIMIT['RATES'] ('capacity/period', refilled continuously)
+    """
+    scope = None
+
+    def __init__(self):
+        self.wait_seconds = 0
+
+    def get_scope(self, request, view):
+        scope = self.scope or getattr(view, 'throttle_scope', None)
+        if scope:
+            return scope
+        return 'read' if request.method in ('GET', 'HEAD', 'OPTIONS') else 'write'
+
+    def get_client(self, request):
+        if request.user and request.user.is_authenticated:
+            return f'user:{request.user.id}'
+        # X-Forwarded-For is only trusted for REST_FRAMEWORK['NUM_PROXIES'] hops,
+        # a client can not get fresh buckets by sending its own header
+        return f'ip:{self.get_ident(request)}'
+
+    def allow_request(self, request, view):
+        config = rate_limit_settings()
+        if not config.get('ENABLED', True):
+            return True
+
+        scope = self.get_scope(request, view)
+        rate = config.get('RATES', {}).get(scope)
+        if rate is None:
+            return True
+
+        capacity, refill_rate = parse_rate(rate)
+        key = f'{scope}:{self.get_client(request)}'
+        self.wait_seconds = get_bucket_store().take(key, capacity, refill_rate)
+        if self.wait_seconds:
+            REJECTED_REQUESTS.inc(reason='rate_limit', scope=scope)
+            logger.info(f'Rate limited {key}')
+            return False
+        return True
+
+    def wait(self):
+        return math.ceil(self.wait_seconds)
+
+
+class AuthRateThrottle(TokenBucketThrottle):
+    """Strict bucket of login/register/token endpoints (function views have no throttle_scope)"""
+    scope = 'auth'
+
+
+class ConcurrencyLimiter:
+    """
+    Admission control: sum of cost weights of in-flight requests of the worker
+    is kept under RATE_LIMIT['MAX_INFLIGHT_COST'], requests over it are shed
+    """
+    def __init__(self):
+        self.inflight = 0
+        self._lock = threading.Lock()
+
+    def acquire(self, cost, limit):
+        with self._lock:
+            if self.inflight and self.inflight + cost > limit:
+                return False
+            self.inflight += cost
+            return True
+
+    def release(self, cost):
+        with self._lock:
+            self.inflight -= cost
+
+
+concurrency_limiter = ConcurrencyLimiter()
+
+
+def admission_cost(view_func, request):
+    """
+    Cost weight of a request: view get_admission_cost(request) classmethod
+    or admission_cost attribute
+    Views without weights are not admission controlled
+    """
+    view_class = getattr(view_func, 'cls', None) or getattr(view_func, 'view_class', None)
+    if view_class is None:
+        return 0
+    get_cost = getattr(view_class, 'get_admission_cost', None)
+    if get_cost is not None:
+        return get_cost(request)
+    return getattr(view_class, 'admission_cost', 0)
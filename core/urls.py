@@ -0,0 +1,6 @@
+from django.urls import path
+from . import views
+
+urlpatterns = [
+    path('jobs/<int:pk>/', views.job_status, name='job-status'),
+]
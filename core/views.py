@@ -0,0 +1,55 @@
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseForbidden
+from django.views.decorators.http import require_GET
+from rest_framework import status
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+
+from .jobs import JobQueue
+from .metrics import registry
+from .models import Job
+from .serializers import JobSerializer
+
+
+@require_GET
+def metrics(request):
+    """
+    Prometheus exposition of API and booking metrics
+    Only for METRICS['ALLOWED_IPS'] (scraper) and staff users
+    GET /metrics
+    """
+    allowed_ip = request.META.get('REMOTE_ADDR') in settings.METRICS['ALLOWED_IPS']
+    if not allowed_ip and not (request.user.is_authenticated and request.user.is_staff):
+        return HttpResponseForbidden()
+    return HttpResponse(
+        registry.exposition(),
+        content_type='text/plain; version=0.0.4; charset=utf-8'
+    )
+
+
+@api_view(['GET', 'DELETE'])
+@permission_classes([IsAuthenticated])
+def job_status(request, pk):
+    """
+    Return status of background job (only for admin/user who enqueued it)
+    GET /api/jobs/{id}/
+    DELETE /api/jobs/{id}/  - cancel job that has not started yet
+    """
+    jobs = Job.objects.filter(pk=pk)
+    if not request.user.is_admin:
+        jobs = jobs.filter(user_id=request.user.id)
+    job = jobs.first()
+    if job is None:
+        return Response(
+            {'error': 'Job not found'},
+            status=status.HTTP_404_NOT_FOUND
+        )
+    if request.method == 'DELETE':
+        if not JobQueue.cancel(job):
+            return Response(
+                {'error': f'Job is {job.status.lower()}, only pending jobs can be cancelled'},
+                status=status.HTTP_409_CONFLICT
+            )
+        job.refresh_from_db()
+    return Response(JobSerializer(job).data)
@@ -1,5 +1,7 @@
 from django.contrib import admin
-from .models import Address, Amenity, Listing, ListingImg
+from .deletion import ListingDeletionService
+from .models import Address, Amenity, Listing, ListingImg, ListingDeletionJob
+from core.paginator import ApproximateCountPaginator
 
 
 @admin.register(Address)
@@ -27,3 +29,38 @@ class ListingAdmin(admin.ModelAdmin):
     search_fields = ['title', 'description', 'address__city']
     inlines = [ListingImageInline]
     filter_horizontal = ['amenities']
+    raw_id_fields = ['owner', 'address']
+    paginator = ApproximateCountPaginator
+    show_full_result_count = False
+
+    def get_queryset(self, request):
+        """
+        Owner for changelist, address for Listing.__str__
+        (also used by autocomplete and delete confirmation)
+        """
+        return super().get_queryset(request).select_related('owner', 'address')
+
+    def get_deleted_objects(self, objs, request):
+        """
+        Confirmation page lists only the listings,
+        related rows are removed later by the deletion job, not collected here
+        """
+        perms_needed = set()
+        if not self.has_delete_permission(request):
+            perms_needed.add(self.opts.verbose_name)
+        return [str(obj) for obj in objs], {self.opts.verbose_name_plural: len(objs)}, perms_needed, []
+
+    def delete_model(self, request, obj):
+        ListingDeletionService.delete_listing(obj)
+
+    def delete_queryset(self, request, queryset):
+        for listing in queryset:
+            ListingDeletionService.delete_listing(listing)
+
+@admin.register(ListingDeletionJob)
+class ListingDeletionJobAdmin(admin.ModelAdmin):
+    """Admin view for listing deletion progress"""
+    list_display = ['listing_id', 'status', 'step', 'files_removed', 'attempts', 'run_after', 'finished_at']
+    list_filter = ['status']
+    search_fields = ['listing_id']
+    readonly_fields = ['progress', 'error']
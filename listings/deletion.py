@@ -0,0 +1,172 @@
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import Address, Listing, ListingImg, ListingSimilarity, ListingDeletionJob
+from bookings.models import Booking, BookingStatusHistory, ListingDailyStat, BookingHold, BlockedDateRange
+from core.enums import JobStatus
+from reviews.models import Review
+from users.models import Favorite, CoFavorite
+
+logger = logging.getLogger(__name__)
+
+MAX_ATTEMPTS = 5
+
+
+def _raw_delete(queryset):
+    """
+    DELETE by primary keys without Django cascade collector:
+    dependents are removed by earlier steps, so nothing is loaded into memory
+    """
+    return queryset._raw_delete(queryset.db)
+
+
+def dependent_steps(listing_id):
+    """(step name, queryset) in deletion order, children before parents"""
+    return [
+        ('booking_status_history', BookingStatusHistory.objects.filter(booking__listing_id=listing_id)),
+        ('bookings', Booking.objects.all_records().filter(listing_id=listing_id)),
+        ('booking_holds', BookingHold.objects.filter(listing_id=listing_id)),
+        ('blocked_date_ranges', BlockedDateRange.objects.filter(listing_id=listing_id)),
+        ('listing_daily_stats', ListingDailyStat.objects.filter(listing_id=listing_id)),
+        ('reviews', Review.objects.all_records().filter(listing_id=listing_id)),
+        ('favorites', Favorite.objects.filter(listing_id=listing_id)),
+        ('co_favorites', CoFavorite.objects.filter(Q(listing_id=listing_id) | Q(recommended_id=listing_id))),
+        ('listing_similarities', ListingSimilarity.objects.filter(Q(listing_id=listing_id) | Q(similar_id=listing_id))),
+        ('listing_amenities', Listing.amenities.through.objects.filter(listing_id=listing_id)),
+    ]
+
+
+class ListingDeletionService:
+    """Soft delete of listings and chunked background removal of their data"""
+    @staticmethod
+    def delete_listing(listing):
+        """Mark listing as deleted and enqueue its hard deletion after retention period"""
+        with transaction.atomic():
+            listing.delete()
+            job = ListingDeletionService.schedule(listing.id, listing.owner_id, listing.deleted_at)
+        logger.info(f'Listing {listing.id} deleted, hard deletion scheduled for {job.run_after}')
+        return job
+
+    @staticmethod
+    def schedule(listing_id, owner_id, deleted_at):
+        """Create (or re-arm) deletion job of a soft deleted listing"""
+        run_after = deleted_at + timedelta(days=settings.SOFT_DELETE['RETENTION_DAYS'])
+        job, _ = ListingDeletionJob.objects.update_or_create(
+            listing_id=listing_id,
+            defaults={
+                'owner_id': owner_id, 'status': JobStatus.pending.name,
+                'run_after': run_after, 'attempts': 0, 'error': '', 'finished_at': None
+            }
+        )
+        return job
+
+    @staticmethod
+    def enqueue_missing():
+        """
+        Jobs for listings soft deleted without the service (queryset/bulk deletes)
+        or deleted again after a restore cancelled their job
+        """
+        listings = Listing.objects.deleted_only().exclude(
+            id__in=ListingDeletionJob.objects.exclude(status=JobStatus.cancelled.name).values('listing_id')
+        ).values_list('id', 'owner_id', 'deleted_at')
+        count = 0
+        for listing_id, owner_id, deleted_at in listings:
+            ListingDeletionService.schedule(listing_id, owner_id, deleted_at)
+            count += 1
+        return count
+
+    @staticmethod
+    def run_due(batch_size=None, limit=None):
+        """Run due jobs one by one, returns number of processed jobs"""
+        batch_size = batch_size or settings.SOFT_DELETE['PURGE_BATCH_SIZE']
+        jobs = ListingDeletionJob.objects.filter(
+            status__in=[JobStatus.pending.name, JobStatus.running.name],
+            run_after__lte=timezone.now()
+        ).order_by('run_after')
+        processed = 0
+        for job in jobs[:limit] if limit else jobs:
+            ListingDeletionService.run(job, batch_size)
+            processed += 1
+        return processed
+
+    @staticmethod
+    def run(job, batch_size):
+        """
+        Delete listing data in bounded batches, progress is saved after every batch,
+        so an interrupted job resumes where it stopped
+        """
+        listing = Listing.objects.all_records().filter(pk=job.listing_id).first()
+        if listing is not None and listing.deleted_at is None:
+            job.status = JobStatus.cancelled.name
+            job.finished_at = timezone.now()
+            job.save(update_fields=['status', 'finished_at', 'updated_at'])
+            logger.info(f'Listing {job.listing_id} was restored, deletion cancelled')
+            return job
+
+        job.status = JobStatus.running.name
+        job.attempts += 1
+        job.save(update_fields=['status', 'attempts', 'updated_at'])
+        try:
+            for step, queryset in dependent_steps(job.listing_id):
+                ListingDeletionService._delete_batches(job, step, queryset, batch_size)
+            ListingDeletionService._delete_images(job, batch_size)
+
+            if listing is not None:
+                with transaction.atomic():
+                    deleted = _raw_delete(Listing.objects.all_records().filter(pk=listing.pk))
+                    _raw_delete(Address.objects.filter(pk=listing.address_id))
+                ListingDeletionService._track(job, 'listings', deleted)
+        except Exception as e:
+            job.status = JobStatus.failed.name if job.attempts >= MAX_ATTEMPTS else JobStatus.pending.name
+            job.error = str(e)
+            job.save(update_fields=['status', 'error', 'updated_at'])
+            logger.exception(f'Deletion of listing {job.listing_id} failed (attempt {job.attempts})')
+            return job
+
+        job.status = JobStatus.done.name
+        job.step = ''
+        job.finished_at = timezone.now()
+        job.save(update_fields=['status', 'step', 'finished_at', 'updated_at'])
+        logger.info(f'Listing {job.listing_id} purged: {job.progress}')
+        return job
+
+    @staticmethod
+    def _track(job, step, count):
+        job.step = step
+        job.progress[step] = job.progress.get(step, 0) + count
+        job.save(update_fields=['step', 'progress', 'files_removed', 'updated_at'])
+
+    @staticmethod
+    def _delete_batches(job, step, queryset, batch_size):
+        """DELETE ... WHERE pk IN (next batch) until nothing is left"""
+        while True:
+            ids = list(queryset.order_by().values_list('pk', flat=True)[:batch_size])
+            if not ids:
+                return
+            deleted = _raw_delete(queryset.model._base_manager.filter(pk__in=ids))
+            ListingDeletionService._track(job, step, deleted)
+
+    @staticmethod
+    def _delete_images(job, batch_size):
+        """Remove image files from storage, then their rows"""
+        queryset = ListingImg.objects.filter(listing_id=job.listing_id).order_by()
+        while True:
+            images = list(queryset.values_list('pk', 'img')[:batch_size])
+            if not images:
+                return
+            for _, name in images:
+                if not name:
+                    continue
+                try:
+                    default_storage.delete(name)
+                    job.files_removed += 1
+                except OSError as e:
+                    logger.warning(f'Failed to remove image file {name}: {e}')
+            deleted = _raw_delete(ListingImg.objects.filter(pk__in=[pk for pk, _ in images]))
+            ListingDeletionService._track(job, 'listing_imgs', deleted)
@@ -0,0 +1,88 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.http import QueryDict
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from core.benchmark import measure, write_results, compare
+from core.fieldsets import Fieldset
+from listings.models import Listing
+from listings.serializers import ListingSerializer, ListingDetailSerializer, ListingRowSerializer
+from listings.services import ListingService
+
+
+class Command(BaseCommand):
+    """
+    Serialization cost of listing list page and listing detail:
+    ListingSerializer vs values() based ListingRowSerializer, full vs sparse fieldsets
+    Timings include queries of each variant
+    python manage.py benchmark_serializers --page-size 20 --output bench_serializers.json
+    """
+    help = 'Benchmark listing serializers and save results as JSON'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--page-size', type=int, default=20)
+        parser.add_argument('--iterations', type=int, default=200)
+        parser.add_argument('--warmup', type=int, default=10)
+        parser.add_argument('--output', default='bench_serializers.json')
+        parser.add_argument('--compare', help='Baseline JSON file to compare with')
+
+    def handle(self, *args, **options):
+        listing = Listing.objects.filter(is_active=True, images__isnull=False).first()
+        if listing is None:
+            raise CommandError('No listings with images, run generate_synthetic_data first')
+
+        request = Request(APIRequestFactory().get('/api/listings/', SERVER_NAME='localhost'))
+        page_size = options['page_size']
+
+        def model_page():
+            queryset = ListingService.search_listings({})[:page_size]
+            return ListingSerializer(queryset, many=True, context={'request': request}).data
+
+        def row_page(fieldset=None):
+            serializer = ListingRowSerializer(fieldset, request)
+            rows = list(serializer.values(ListingService.search_listings({}))[:page_size])
+            return serializer.serialize(rows)
+
+        def detail(query=''):
+            fieldset = Fieldset.from_query_params(QueryDict(query))
+            select_related, prefetch_related = fieldset.related(
+                select_related=['owner', 'address'],
+                prefetch_related=['amenities', 'images']
+            )
+            queryset = Listing.objects.prefetch_related(*prefetch_related)
+            if select_related:
+                queryset = queryset.select_related(*select_related)
+            return ListingDetailSerializer(
+                queryset.get(pk=listing.pk),
+                context={'request': request, 'fieldset': fieldset}
+            ).data
+
+        sparse = Fieldset(['id', 'title', 'price_per_night', 'city'])
+        cases = {
+            'list ListingSerializer': model_page,
+            'list ListingRowSerializer': row_page,
+            'list ListingRowSerializer fields=id,title,price_per_night,city': lambda: row_page(sparse),
+            'detail full': detail,
+            'detail fields=id,title,address.city': lambda: detail('fields=id,title,address.city'),
+            'detail expand=address': lambda: detail('expand=address'),
+        }
+
+        results = {}
+        for name, func in cases.items():
+            result = measure(func, iterations=options['iterations'], warmup=options['warmup'])
+            results[name] = result
+            self.stdout.write(
+                f"{name:<64} p50={result['p50_ms']}ms p95={result['p95_ms']}ms "
+                f"ops={result['rps']} queries={result['queries']}"
+            )
+
+        write_results(
+            options['output'], 'serializers', results,
+            iterations=options['iterations'], page_size=page_size,
+            listings=Listing.objects.count()
+        )
+        self.stdout.write(self.style.SUCCESS(f'Results saved to {options["output"]}'))
+
+        if options['compare']:
+            for name, metric, old, new, change in compare(options['compare'], results):
+                self.stdout.write(f'{name:<64} {metric:<8} {old:>10} -> {new:>10} ({change:+}%)')
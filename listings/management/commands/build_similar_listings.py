@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from listings.similarity import similarity_index
+
+
+class Command(BaseCommand):
+    """
+    Full rebuild of "more like this" recommendations
+    python manage.py build_similar_listings
+    """
+    help = 'Rebuild listing feature matrix and top-K similar listings'
+
+    def handle(self, *args, **options):
+        count = similarity_index.rebuild()
+        self.stdout.write(self.style.SUCCESS(f'Similar listings rebuilt for {count} listings'))
@@ -0,0 +1,34 @@
+# Generated by Django 6.0 on 2026-10-19 05:01
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('listings', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ListingSimilarity',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Creation date')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Update date')),
+                ('score', models.FloatField()),
+                ('rank', models.PositiveSmallIntegerField()),
+                ('listing', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='similarities', to='listings.listing')),
+                ('similar', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='listings.listing')),
+            ],
+            options={
+                'verbose_name': 'Listing similarity',
+                'verbose_name_plural': 'Listing similarities',
+                'db_table': 'listing_similarities',
+                'ordering': ['listing', 'rank'],
+                'indexes': [models.Index(fields=['listing', 'rank'], name='listing_sim_listing_24cbef_idx')],
+                'unique_together': {('listing', 'similar')},
+            },
+        ),
+    ]
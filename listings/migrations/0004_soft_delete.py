@@ -0,0 +1,36 @@
+# Generated by Django 6.0 on 2026-10-19 09:40
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('listings', '0003_listing_rating_aggregates'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='listing',
+            name='listings_owner_i_d70a22_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='listing',
+            name='listings_is_acti_fd46bf_idx',
+        ),
+        migrations.AddField(
+            model_name='listing',
+            name='deleted_at',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='Deletion date'),
+        ),
+        migrations.AddIndex(
+            model_name='listing',
+            index=models.Index(fields=['deleted_at', 'is_active', '-created_at'], name='listings_deleted_eac50d_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='listing',
+            index=models.Index(fields=['owner', 'deleted_at'], name='listings_owner_i_2b8deb_idx'),
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 6.0 on 2026-10-19 10:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('listings', '0004_soft_delete'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ListingDeletionJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Creation date')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Update date')),
+                ('listing_id', models.PositiveBigIntegerField(unique=True)),
+                ('owner_id', models.PositiveBigIntegerField()),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('running', 'Running'), ('done', 'Done'), ('failed', 'Failed'), ('cancelled', 'Cancelled')], default='pending', max_length=20)),
+                ('run_after', models.DateTimeField()),
+                ('step', models.CharField(blank=True, max_length=50)),
+                ('progress', models.JSONField(default=dict)),
+                ('files_removed', models.PositiveIntegerField(default=0)),
+                ('attempts', models.PositiveSmallIntegerField(default=0)),
+                ('error', models.TextField(blank=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'verbose_name': 'Listing deletion job',
+                'verbose_name_plural': 'Listing deletion jobs',
+                'db_table': 'listing_deletion_jobs',
+                'ordering': ['run_after'],
+                'indexes': [models.Index(fields=['status', 'run_after'], name='listing_del_status_247714_idx')],
+            },
+        ),
+    ]
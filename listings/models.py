@@ -1,8 +1,7 @@
 from django.db import models
-from core.mixins import TimestampMixin
-from core.enums import HouseType, AmenityCategory
+from core.mixins import TimestampMixin, SoftDeleteMixin
+from core.enums import HouseType, AmenityCategory, JobStatus
 from core.validators import validate_positive_price, validate_positive_number
-from django.db.models import Avg
 
 
 class Amenity(TimestampMixin):
@@ -54,7 +53,7 @@ class Address(TimestampMixin):
         parts.append(self.country)
         return ', '.join(parts)
 
-class Listing(TimestampMixin):
+class Listing(SoftDeleteMixin, TimestampMixin):
     """Listing model for Favorite model from users/models relation"""
     title = models.CharField(max_length=255)
     owner = models.ForeignKey('users.User', on_delete=models.CASCADE,
@@ -69,17 +68,24 @@ class Listing(TimestampMixin):
     bedrooms = models.PositiveIntegerField(validators=[validate_positive_number])
     bathrooms = models.PositiveIntegerField(validators=[validate_positive_number])
     price_per_night = models.DecimalField(max_digits=10, decimal_places=2, validators=[validate_positive_price])
+    # Rating aggregates, updated by ReviewService on every review write
+    reviews_count = models.PositiveIntegerField(default=0)
+    rating_sum = models.PositiveIntegerField(default=0)
 
     class Meta:
         db_table = 'listings'
         verbose_name = 'Listing'
         verbose_name_plural = 'Listings'
         ordering = ['-created_at']
+        # Every read filters deleted_at IS NULL (SoftDeleteManager), so it leads
+        # or directly follows the equality filter of hot indexes
         indexes = [
-            models.Index(fields=['owner']),
-            models.Index(fields=['is_active']),
+            models.Index(fields=['deleted_at', 'is_active', '-created_at']),
+            models.Index(fields=['owner', 'deleted_at']),
             models.Index(fields=['house_type']),
             models.Index(fields=['price_per_night']),
+            # Delta sync cursor (listings/sync.py)
+            models.Index(fields=['updated_at', 'id']),
         ]
 
     def __str__(self):
@@ -87,9 +93,10 @@ class Listing(TimestampMixin):
 
     @property
     def avg_rating(self):
-        """Calculate average rating from reviews"""
-        result = self.reviews.aggregate(avg=Avg('rating'))
-        return result['avg']
+        """Average rating from denormalized review aggregates"""
+        if not self.reviews_count:
+            return None
+        return self.rating_sum / self.reviews_count
 
 
 class ListingImg(TimestampMixin):
@@ -113,4 +120,54 @@ class ListingImg(TimestampMixin):
         ordering = ['-main', '-created_at']
 
     def __str__(self):
-        return f'Image #{self.pk}'
\ No newline at end of file
+        return f'Image #{self.pk}'
+
+class ListingSimilarity(TimestampMixin):
+    """
+    Precomputed "more like this" neighbours of a listing
+    Rows are maintained by listings/similarity.py
+    """
+    listing = models.ForeignKey(Listing, on_delete=models.CASCADE, related_name='similarities')
+    similar = models.ForeignKey(Listing, on_delete=models.CASCADE, related_name='+')
+    score = models.FloatField()
+    rank = models.PositiveSmallIntegerField()
+
+    class Meta:
+        db_table = 'listing_similarities'
+        verbose_name = 'Listing similarity'
+        verbose_name_plural = 'Listing similarities'
+        ordering = ['listing', 'rank']
+        unique_together = ('listing', 'similar')
+        indexes = [models.Index(fields=['listing', 'rank'])]
+
+    def __str__(self):
+        return f'{self.listing_id} ~ {self.similar_id} ({self.score:.3f})'
+
+
+class ListingDeletionJob(TimestampMixin):
+    """
+    Chunked hard deletion of a soft deleted listing and its dependents
+    Processed by ListingDeletionService (purge_deleted command) after retention period
+    """
+    # Plain ids, the job outlives listing row
+    listing_id = models.PositiveBigIntegerField(unique=True)
+    owner_id = models.PositiveBigIntegerField()
+    status = models.CharField(max_length=20, choices=JobStatus.choices(), default=JobStatus.pending.name)
+    run_after = models.DateTimeField()
+    step = models.CharField(max_length=50, blank=True)
+    # Deleted rows per table, e.g. {"bookings": 1200, "reviews": 80}
+    progress = models.JSONField(default=dict)
+    files_removed = models.PositiveIntegerField(default=0)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    error = models.TextField(blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        db_table = 'listing_deletion_jobs'
+        verbose_name = 'Listing deletion job'
+        verbose_name_plural = 'Listing deletion jobs'
+        ordering = ['run_after']
+        indexes = [models.Index(fields=['status', 'run_after'])]
+
+    def __str__(self):
+        return f'Deletion of listing {self.listing_id} ({self.status})'
@@ -1,5 +1,8 @@
+from django.conf import settings
+from django.core.files.storage import default_storage
 from rest_framework import serializers
-from .models import Address, Listing, Amenity, ListingImg
+from .models import Address, Listing, Amenity, ListingImg, ListingDeletionJob
+from core.fieldsets import SparseFieldsetMixin
 
 
 class AmenitySerializer(serializers.ModelSerializer):
@@ -28,23 +31,28 @@ class ListingImgSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'created_at']
 
 
-class ListingSerializer(serializers.ModelSerializer):
+class ListingSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Serializer for listing view"""
     owner_name = serializers.CharField(source='owner.get_full_name', read_only=True)
     city = serializers.CharField(source='address.city', read_only=True)
     avg_rating = serializers.FloatField(read_only=True)
     main_img = serializers.SerializerMethodField()
+    # Present only when queryset is annotated (ListingService.annotate_favorited)
+    is_favorited = serializers.BooleanField(read_only=True)
 
     class Meta:
         model = Listing
         fields = [
             'id', 'title', 'created_at', 'city', 'owner_name', 'house_type',
             'max_stayers', 'bedrooms', 'bathrooms', 'price_per_night',
-            'views_count', 'avg_rating', 'main_img', 'is_active']
+            'views_count', 'avg_rating', 'main_img', 'is_active', 'is_favorited']
 
     def get_main_img(self, obj):
-        """Get main image url"""
-        main_img = obj.images.filter(main=True).first()
+        """Get main image url (from main_images prefetch when present)"""
+        if hasattr(obj, 'main_images'):
+            main_img = obj.main_images[0] if obj.main_images else None
+        else:
+            main_img = obj.images.filter(main=True).first()
         if main_img:
             request = self.context.get('request')
             if request:
@@ -52,7 +60,7 @@ class ListingSerializer(serializers.ModelSerializer):
         return None
 
 
-class ListingDetailSerializer(serializers.ModelSerializer):
+class ListingDetailSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Serializer for listing detail view"""
     owner = serializers.StringRelatedField(read_only=True)
     address = AddressSerializer(read_only=True)
@@ -68,6 +76,88 @@ class ListingDetailSerializer(serializers.ModelSerializer):
             'is_active', 'views_count', 'avg_rating', 'created_at', 'updated_at']
 
 
+class ListingRowSerializer:
+    """
+    Read-only fast path of ListingSerializer for list endpoint
+    Builds the same dicts straight from values() rows: no model instances,
+    no field objects per row and one query for main images of the page
+    """
+    # Output field -> values() column
+    COLUMNS = {
+        'id': 'id', 'title': 'title', 'created_at': 'created_at', 'city': 'address__city',
+        'house_type': 'house_type', 'max_stayers': 'max_stayers', 'bedrooms': 'bedrooms',
+        'bathrooms': 'bathrooms', 'price_per_night': 'price_per_night', 'views_count': 'views_count',
+        'is_active': 'is_active',
+    }
+    OWNER_COLUMNS = ('owner__first_name', 'owner__last_name', 'owner__username')
+    RATING_COLUMNS = ('reviews_count', 'rating_sum')
+    FIELDS = [
+        'id', 'title', 'created_at', 'city', 'owner_name', 'house_type',
+        'max_stayers', 'bedrooms', 'bathrooms', 'price_per_night',
+        'views_count', 'avg_rating', 'main_img', 'is_active', 'is_favorited']
+
+    datetime_field = serializers.DateTimeField()
+    price_field = serializers.DecimalField(max_digits=10, decimal_places=2)
+
+    def __init__(self, fieldset=None, request=None):
+        self.request = request
+        self.fields = [
+            name for name in self.FIELDS
+            if fieldset is None or fieldset.includes(name)
+        ]
+
+    def values(self, queryset):
+        """values() queryset with only columns of requested fields (paginate it, then serialize rows)"""
+        columns = {'id'}
+        for name in self.fields:
+            if name in self.COLUMNS:
+                columns.add(self.COLUMNS[name])
+            elif name == 'owner_name':
+                columns.update(self.OWNER_COLUMNS)
+            elif name == 'avg_rating':
+                columns.update(self.RATING_COLUMNS)
+            elif name == 'is_favorited' and 'is_favorited' in queryset.query.annotations:
+                columns.add('is_favorited')
+        return queryset.prefetch_related(None).values(*sorted(columns))
+
+    def main_images(self, listing_ids):
+        """{listing_id: absolute url of main image} in one query"""
+        images = ListingImg.objects.filter(
+            listing_id__in=listing_ids, main=True
+        ).order_by('listing_id', '-created_at').values_list('listing_id', 'img')
+        urls = {}
+        for listing_id, name in images:
+            if listing_id not in urls and name and self.request:
+                urls[listing_id] = self.request.build_absolute_uri(default_storage.url(name))
+        return urls
+
+    def to_representation(self, row, main_images):
+        data = {}
+        for name in self.fields:
+            if name == 'owner_name':
+                full_name = f"{row['owner__first_name']} {row['owner__last_name']}".strip()
+                data[name] = full_name or row['owner__username']
+            elif name == 'avg_rating':
+                data[name] = row['rating_sum'] / row['reviews_count'] if row['reviews_count'] else None
+            elif name == 'main_img':
+                data[name] = main_images.get(row['id'])
+            elif name == 'is_favorited':
+                if 'is_favorited' in row:
+                    data[name] = row['is_favorited']
+            elif name == 'created_at':
+                data[name] = self.datetime_field.to_representation(row['created_at'])
+            elif name == 'price_per_night':
+                data[name] = self.price_field.to_representation(row['price_per_night'])
+            else:
+                data[name] = row[self.COLUMNS[name]]
+        return data
+
+    def serialize(self, rows):
+        """Representation of values() rows"""
+        main_images = self.main_images([row['id'] for row in rows]) if 'main_img' in self.fields else {}
+        return [self.to_representation(row, main_images) for row in rows]
+
+
 class ListingCreateSerializer(serializers.ModelSerializer):
     """Serializer for creating and updating listings"""
     address = AddressSerializer()
@@ -122,4 +212,25 @@ class ListingCreateSerializer(serializers.ModelSerializer):
             setattr(instance, field, value)
         instance.save()
 
-        return instance
\ No newline at end of file
+        return instance
+
+
+class ListingDeletionJobSerializer(serializers.ModelSerializer):
+    """Progress of listing deletion job"""
+    class Meta:
+        model = ListingDeletionJob
+        fields = [
+            'listing_id', 'status', 'run_after', 'step', 'progress',
+            'files_removed', 'attempts', 'error', 'finished_at', 'updated_at'
+        ]
+        read_only_fields = fields
+
+
+class ListingSyncQuerySerializer(serializers.Serializer):
+    """Query params of listing delta sync"""
+    sync_token = serializers.CharField(required=False, allow_blank=True)
+    limit = serializers.IntegerField(
+        min_value=1,
+        max_value=settings.LISTING_SYNC['MAX_PAGE_SIZE'],
+        default=settings.LISTING_SYNC['PAGE_SIZE']
+    )
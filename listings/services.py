@@ -1,6 +1,10 @@
 import logging
-from django.db.models import Q, F
+from django.db import transaction
+from django.db.models import Q, F, Exists, OuterRef, Prefetch
+from django.utils import timezone
 from .models import Listing, ListingImg
+from users.models import Favorite
+from core.outbox import emit
 
 logger = logging.getLogger(__name__)
 
@@ -19,11 +23,34 @@ class ListingService:
     def toggle_active_status(listing):
         """Toggle listing between active and inactive statuses"""
         listing.is_active = not listing.is_active
-        listing.save(update_fields=['is_active'])
         status = 'activated' if listing.is_active else 'deactivated'
+        with transaction.atomic():
+            listing.save(update_fields=['is_active', 'updated_at'])
+            emit('listing', listing.id, f'listing.{status}', {
+                'listing_id': listing.id,
+                'owner_id': listing.owner_id,
+                'is_active': listing.is_active,
+            })
         logger.info(f'Listing {listing.id} {status}')
         return listing
 
+    @staticmethod
+    def main_image_prefetch(lookup='images'):
+        """Prefetch of main image to main_images (read by ListingSerializer.get_main_img)"""
+        return Prefetch(lookup, queryset=ListingImg.objects.filter(main=True), to_attr='main_images')
+
+    @staticmethod
+    def annotate_favorited(queryset, user):
+        """
+        Annotate is_favorited for authenticated user
+        with EXISTS over (user, listing) index of favorites
+        """
+        if not user.is_authenticated:
+            return queryset
+        return queryset.annotate(is_favorited=Exists(
+            Favorite.objects.filter(user=user, listing=OuterRef('pk'))
+        ))
+
     @staticmethod
     def search_listings(query_params):
         """Method for searching listings with filters"""
@@ -70,6 +97,8 @@ class ListingService:
         if main:
             ListingImg.objects.filter(listing=listing,main=True
             ).update(main=False)
+            # main_img is part of listing rows, delta sync picks it up by updated_at
+            Listing.objects.filter(pk=listing.pk).update(updated_at=timezone.now())
 
         img_obj = ListingImg.objects.create(
             listing=listing,
@@ -0,0 +1,72 @@
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete, m2m_changed
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .models import Address, Listing
+from bookings.services import BookingService
+from core.jobs import JobQueue
+from core.signals import bulk_soft_deleted
+
+# Listing fields that are part of the similarity feature vector
+SIMILARITY_FIELDS = {
+    'house_type', 'price_per_night', 'bedrooms', 'max_stayers', 'is_active', 'address', 'deleted_at'
+}
+
+
+def refresh_similar_listings(listing_id):
+    """
+    Mark listing dirty: similarity index is refreshed by a background job after commit,
+    the request never loads the index
+    """
+    transaction.on_commit(
+        lambda: JobQueue.enqueue('listings.refresh_similarity', {'listing_id': listing_id}, coalesce=True)
+    )
+
+
+@receiver(post_save, sender=Listing)
+def listing_saved(sender, instance, update_fields=None, **kwargs):
+    """Refresh similar listings when listing features change"""
+    if update_fields and not SIMILARITY_FIELDS.intersection(update_fields):
+        return
+    if update_fields and 'deleted_at' in update_fields and instance.deleted_at:
+        BookingService.close_for_listing(instance)
+    refresh_similar_listings(instance.pk)
+
+
+@receiver(bulk_soft_deleted, sender=Listing)
+def listings_bulk_soft_deleted(sender, pks, **kwargs):
+    """Close bookings and refresh similar listings of listings soft deleted by queryset"""
+    for listing in Listing.objects.all_records().filter(pk__in=pks).select_related('owner'):
+        BookingService.close_for_listing(listing)
+        refresh_similar_listings(listing.pk)
+
+
+@receiver(post_delete, sender=Listing)
+def listing_deleted(sender, instance, **kwargs):
+    """Drop deleted listing from similarity index"""
+    refresh_similar_listings(instance.pk)
+
+
+@receiver(m2m_changed, sender=Listing.amenities.through)
+def listing_amenities_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    """Refresh similar listings when listing amenities change"""
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    listing_ids = (pk_set or []) if reverse else [instance.pk]
+    for listing_id in listing_ids:
+        refresh_similar_listings(listing_id)
+
+
+@receiver(post_save, sender=Address)
+def address_saved(sender, instance, created, **kwargs):
+    """
+    Refresh similar listings when listing city changes,
+    city is part of listing rows, delta sync picks it up by updated_at
+    """
+    if created:
+        return
+    listings = Listing.objects.all_records().filter(address=instance)
+    listings.update(updated_at=timezone.now())
+    for listing_id in listings.values_list('id', flat=True):
+        refresh_similar_listings(listing_id)
@@ -0,0 +1,298 @@
+import logging
+import threading
+from collections import defaultdict
+
+import numpy as np
+from django.core.cache import cache
+from django.db import transaction
+
+from core.enums import HouseType
+from core.metrics import CACHE_REQUESTS
+from .models import Listing, ListingSimilarity
+
+logger = logging.getLogger(__name__)
+
+TOP_K = 10
+BATCH_SIZE = 512
+CACHE_TIMEOUT = 60 * 60
+GENERATION_KEY = 'listings:similar:generation'
+
+# Weight of every feature group in the final cosine score
+HOUSE_TYPE_WEIGHT = 1.0
+PRICE_WEIGHT = 1.5
+SIZE_WEIGHT = 1.0
+AMENITY_WEIGHT = 1.0
+CITY_WEIGHT = 2.0
+
+HOUSE_TYPES = [house_type.name for house_type in HouseType]
+NUMERIC_COLUMNS = len(HOUSE_TYPES) + 3
+
+
+def similar_cache_key(listing_id):
+    """Cache key of listing top-K neighbour ids"""
+    return f'listings:similar:{listing_id}'
+
+
+def get_similar_ids(listing_id):
+    """
+    Return ids of similar listings ordered by score
+    Reads cache first and falls back to listing_similarities table
+    """
+    key = similar_cache_key(listing_id)
+    similar_ids = cache.get(key)
+    CACHE_REQUESTS.inc(cache='similar_listings', result='miss' if similar_ids is None else 'hit')
+    if similar_ids is None:
+        similar_ids = list(
+            ListingSimilarity.objects.filter(listing_id=listing_id)
+            .order_by('rank').values_list('similar_id', flat=True)
+        )
+        cache.set(key, similar_ids, CACHE_TIMEOUT)
+    return similar_ids
+
+
+def _fetch_rows(listing_ids=None):
+    """Load raw feature values of listings (all of them if ids are not given)"""
+    listings = Listing.objects.all()
+    through = Listing.amenities.through.objects.all()
+    if listing_ids is not None:
+        listings = listings.filter(id__in=listing_ids)
+        through = through.filter(listing_id__in=listing_ids)
+
+    rows = list(listings.order_by().values_list(
+        'id', 'house_type', 'price_per_night', 'bedrooms',
+        'max_stayers', 'is_active', 'address__city'
+    ))
+    amenities = defaultdict(list)
+    for listing_id, amenity_id in through.values_list('listing_id', 'amenity_id'):
+        amenities[listing_id].append(amenity_id)
+    return rows, amenities
+
+
+class ListingSimilarityIndex:
+    """
+    Feature matrix of all listings with vectorized nearest neighbour search
+
+    Every row holds house type one-hot, standardized price/bedrooms/max_stayers,
+    amenity multi-hot and city one-hot. Rows are L2 normalized, so a dot product
+    of two rows is their cosine similarity.
+    Matrix lives in process memory, top-K results are stored in ListingSimilarity
+    and cached, so reading similar listings never touches the matrix.
+    """
+    def __init__(self, top_k=TOP_K):
+        self.top_k = top_k
+        self._lock = threading.RLock()
+        self._generation = None
+        self._reset()
+
+    def _reset(self):
+        """Empty index"""
+        self.ids = np.empty(0, dtype=np.int64)
+        self.positions = {}
+        self.matrix = np.zeros((0, NUMERIC_COLUMNS))
+        self.active = np.zeros(0, dtype=bool)
+        self.neighbours = np.full((0, self.top_k), -1, dtype=np.int64)
+        self.kth_score = np.zeros(0)
+        self.columns = {}
+        self.mean = np.zeros(3)
+        self.std = np.ones(3)
+        self.loaded = False
+
+    def _column(self, key):
+        """Return column of vocabulary feature (amenity/city), adding it when new"""
+        column = self.columns.get(key)
+        if column is None:
+            column = self.matrix.shape[1]
+            self.columns[key] = column
+            self.matrix = np.pad(self.matrix, ((0, 0), (0, 1)))
+        return column
+
+    @staticmethod
+    def _numeric(rows):
+        """Raw numeric features: log price, bedrooms, max stayers"""
+        return np.array(
+            [[np.log1p(float(row[2])), row[3], row[4]] for row in rows],
+            dtype=np.float64
+        ).reshape(len(rows), 3)
+
+    def _vectors(self, rows, amenities):
+        """Build normalized feature rows for listings"""
+        for row in rows:
+            self._column(('city', (row[6] or '').strip().lower()))
+            for amenity_id in amenities.get(row[0], ()):
+                self._column(('amenity', amenity_id))
+
+        count = len(rows)
+        vectors = np.zeros((count, self.matrix.shape[1]))
+        index = np.arange(count)
+
+        house_columns = [HOUSE_TYPES.index(row[1]) if row[1] in HOUSE_TYPES else -1 for row in rows]
+        known = np.array(house_columns) >= 0
+        vectors[index[known], np.array(house_columns)[known]] = HOUSE_TYPE_WEIGHT
+
+        numeric = np.clip((self._numeric(rows) - self.mean) / self.std, -3, 3)
+        base = len(HOUSE_TYPES)
+        vectors[:, base] = numeric[:, 0] * PRICE_WEIGHT
+        vectors[:, base + 1:base + 3] = numeric[:, 1:] * SIZE_WEIGHT
+
+        city_columns = [self.columns[('city', (row[6] or '').strip().lower())] for row in rows]
+        vectors[index, city_columns] = CITY_WEIGHT
+
+        for position, row in enumerate(rows):
+            amenity_ids = amenities.get(row[0], ())
+            if amenity_ids:
+                columns = [self.columns[('amenity', amenity_id)] for amenity_id in amenity_ids]
+                vectors[position, columns] = AMENITY_WEIGHT / np.sqrt(len(columns))
+
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0] = 1
+        return vectors / norms
+
+    def _load(self):
+        """Build matrix from database and read stored neighbours"""
+        self._reset()
+        rows, amenities = _fetch_rows()
+        if rows:
+            active_rows = [row for row in rows if row[5]] or rows
+            numeric = self._numeric(active_rows)
+            self.mean = numeric.mean(axis=0)
+            self.std = numeric.std(axis=0)
+            self.std[self.std == 0] = 1
+
+        self.ids = np.array([row[0] for row in rows], dtype=np.int64)
+        self.positions = {listing_id: position for position, listing_id in enumerate(self.ids.tolist())}
+        self.active = np.array([row[5] for row in rows], dtype=bool)
+        self.matrix = self._vectors(rows, amenities)
+        self.neighbours = np.full((len(rows), self.top_k), -1, dtype=np.int64)
+        self.kth_score = np.full(len(rows), -np.inf)
+
+        stored = ListingSimilarity.objects.order_by().values_list('listing_id', 'similar_id', 'score', 'rank')
+        for listing_id, similar_id, score, rank in stored.iterator(chunk_size=5000):
+            position = self.positions.get(listing_id)
+            if position is None or rank >= self.top_k:
+                continue
+            self.neighbours[position, rank] = similar_id
+            if rank == self.top_k - 1:
+                self.kth_score[position] = score
+
+        self.loaded = True
+        self._generation = cache.get(GENERATION_KEY)
+
+    def _ensure_loaded(self):
+        """Reload matrix if another process changed the index"""
+        if not self.loaded or cache.get(GENERATION_KEY) != self._generation:
+            self._load()
+
+    def _bump_generation(self):
+        """Mark index as changed for other processes"""
+        generation = (cache.get(GENERATION_KEY) or 0) + 1
+        cache.set(GENERATION_KEY, generation, None)
+        self._generation = generation
+
+    def _top_k(self, positions):
+        """Vectorized top-K search for several rows at once"""
+        positions = np.asarray(positions, dtype=np.int64)
+        scores = self.matrix[positions] @ self.matrix.T
+        scores[:, ~self.active] = -np.inf
+        scores[np.arange(len(positions)), positions] = -np.inf
+
+        k = min(self.top_k, len(self.ids) - 1)
+        if k <= 0:
+            return {int(self.ids[position]): [] for position in positions}
+
+        best = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        best_scores = np.take_along_axis(scores, best, axis=1)
+        order = np.argsort(-best_scores, axis=1)
+        best = np.take_along_axis(best, order, axis=1)
+        best_scores = np.take_along_axis(best_scores, order, axis=1)
+
+        result = {}
+        for row, position in enumerate(positions):
+            found = np.isfinite(best_scores[row])
+            result[int(self.ids[position])] = list(zip(
+                self.ids[best[row][found]].tolist(),
+                best_scores[row][found].tolist()
+            ))
+        return result
+
+    def _store(self, results):
+        """Replace stored neighbours of listings and drop their cache"""
+        for listing_id, similar in results.items():
+            position = self.positions[listing_id]
+            self.neighbours[position] = -1
+            self.neighbours[position, :len(similar)] = [similar_id for similar_id, _ in similar]
+            self.kth_score[position] = similar[-1][1] if len(similar) == self.top_k else -np.inf
+
+        with transaction.atomic():
+            ListingSimilarity.objects.filter(listing_id__in=list(results)).delete()
+            ListingSimilarity.objects.bulk_create([
+                ListingSimilarity(listing_id=listing_id, similar_id=similar_id, score=score, rank=rank)
+                for listing_id, similar in results.items()
+                for rank, (similar_id, score) in enumerate(similar)
+            ], batch_size=1000)
+        cache.delete_many([similar_cache_key(listing_id) for listing_id in results])
+
+    def _recompute(self, positions):
+        """Recompute and store neighbours for row positions in batches"""
+        for start in range(0, len(positions), BATCH_SIZE):
+            batch = positions[start:start + BATCH_SIZE]
+            active = [position for position in batch if self.active[position]]
+            results = self._top_k(active) if active else {}
+            results.update({
+                int(self.ids[position]): [] for position in batch if not self.active[position]
+            })
+            self._store(results)
+
+    def rebuild(self):
+        """Full rebuild of the matrix and neighbours of every listing"""
+        with self._lock:
+            self._load()
+            ListingSimilarity.objects.all().delete()
+            self.neighbours[:] = -1
+            self.kth_score[:] = -np.inf
+            self._recompute(np.arange(len(self.ids)))
+            self._bump_generation()
+            logger.info(f'Rebuilt similarity index for {len(self.ids)} listings')
+            return len(self.ids)
+
+    def refresh_listing(self, listing_id):
+        """
+        Incremental update after listing change
+        Recomputes the listing row and only neighbours that it can affect
+        """
+        with self._lock:
+            self._ensure_loaded()
+            rows, amenities = _fetch_rows([listing_id])
+            position = self.positions.get(listing_id)
+
+            if rows:
+                vector = self._vectors(rows, amenities)[0]
+                if position is None:
+                    position = len(self.ids)
+                    self.positions[listing_id] = position
+                    self.ids = np.append(self.ids, listing_id)
+                    self.matrix = np.vstack([self.matrix, vector])
+                    self.active = np.append(self.active, rows[0][5])
+                    self.neighbours = np.vstack([self.neighbours, np.full((1, self.top_k), -1)])
+                    self.kth_score = np.append(self.kth_score, -np.inf)
+                else:
+                    self.matrix[position] = vector
+                    self.active[position] = rows[0][5]
+            elif position is not None:
+                self.matrix[position] = 0
+                self.active[position] = False
+                self.neighbours[position] = -1
+            else:
+                return
+
+            scores = self.matrix @ self.matrix[position]
+            affected = (
+                (self.active & (scores > self.kth_score))
+                | np.any(self.neighbours == listing_id, axis=1)
+            )
+            affected[position] = bool(rows)
+            self._recompute(np.flatnonzero(affected))
+            self._bump_generation()
+            logger.info(f'Refreshed similar listings for listing {listing_id}')
+
+
+similarity_index = ListingSimilarityIndex()
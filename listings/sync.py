@@ -0,0 +1,85 @@
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.core import signing
+from django.utils import timezone
+from rest_framework.exceptions import ValidationError
+
+from .models import Listing
+from .serializers import ListingRowSerializer
+
+SALT = 'listings.sync'
+
+
+class ListingSyncService:
+    """
+    Delta sync of listing catalog for offline clients
+    Changes are read in (updated_at, id) order over the updated_at index,
+    sync token is a signed cursor of the last row sent, so it only moves forward
+    """
+    @staticmethod
+    def encode_token(updated_at, listing_id):
+        micros = int(updated_at.timestamp() * 1_000_000) if updated_at else 0
+        return signing.dumps({'t': micros, 'id': listing_id}, salt=SALT, compress=True)
+
+    @staticmethod
+    def decode_token(token):
+        """(updated_at, listing id) cursor of sync token"""
+        try:
+            payload = signing.loads(token, salt=SALT)
+            micros, listing_id = int(payload['t']), int(payload['id'])
+        except (signing.BadSignature, KeyError, TypeError, ValueError):
+            raise ValidationError({'sync_token': 'Invalid sync token'})
+        if not micros:
+            return None, listing_id
+        return datetime.fromtimestamp(micros / 1_000_000, tz=dt_timezone.utc), listing_id
+
+    @staticmethod
+    def changes(token, limit, fieldset=None, request=None):
+        """
+        Listings changed after token cursor: active ones serialized as in listing list,
+        deactivated and deleted ones as tombstone ids
+        Rows newer than LAG_SECONDS are left for the next call, so rows of transactions
+        committing late are not skipped
+        Tokens older than soft delete retention reset the sync (tombstones may be purged)
+        """
+        config = settings.LISTING_SYNC
+        now = timezone.now()
+        since, last_id = ListingSyncService.decode_token(token) if token else (None, 0)
+        reset = since is not None and since < now - timedelta(days=settings.SOFT_DELETE['RETENTION_DAYS'])
+        if reset:
+            since, last_id = None, 0
+
+        queryset = Listing.objects.all_records().filter(
+            updated_at__lt=now - timedelta(seconds=config['LAG_SECONDS'])
+        )
+        if since is None:
+            # Full sync, client has nothing to delete yet
+            queryset = queryset.filter(deleted_at__isnull=True, is_active=True)
+        else:
+            queryset = queryset.filter(updated_at__gte=since).exclude(updated_at=since, id__lte=last_id)
+        rows = list(
+            queryset.order_by('updated_at', 'id')
+            .values_list('id', 'updated_at', 'is_active', 'deleted_at')[:limit + 1]
+        )
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+
+        live_ids = [listing_id for listing_id, _, is_active, deleted_at in rows if is_active and deleted_at is None]
+        deleted_ids = [listing_id for listing_id, _, is_active, deleted_at in rows if not is_active or deleted_at]
+        serializer = ListingRowSerializer(fieldset, request)
+        changed = []
+        if live_ids:
+            changed = serializer.serialize(list(
+                serializer.values(Listing.objects.filter(id__in=live_ids).order_by('updated_at', 'id'))
+            ))
+
+        if rows:
+            since, last_id = rows[-1][1], rows[-1][0]
+        return {
+            'changed': changed,
+            'deleted': deleted_ids,
+            'sync_token': ListingSyncService.encode_token(since, last_id),
+            'has_more': has_more,
+            'reset': reset,
+        }
@@ -0,0 +1,23 @@
+from core.jobs import task
+from .deletion import ListingDeletionService
+from .similarity import similarity_index
+
+
+@task('listings.run_deletion_jobs')
+def run_deletion_jobs(batch_size=None):
+    """Hard delete soft deleted listings whose retention period is over"""
+    enqueued = ListingDeletionService.enqueue_missing()
+    return {'enqueued': enqueued, 'processed': ListingDeletionService.run_due(batch_size)}
+
+
+@task('listings.rebuild_similarities')
+def rebuild_similarities():
+    """Full rebuild of similar listings"""
+    return {'listings': similarity_index.rebuild()}
+
+
+@task('listings.refresh_similarity')
+def refresh_similarity(listing_id):
+    """Incremental refresh of similar listings after listing change"""
+    similarity_index.refresh_listing(listing_id)
+    return {'listing_id': listing_id}
@@ -1,3 +1,116 @@
-from django.test import TestCase
+from datetime import timedelta
 
-# Create your tests here.
+from django.conf import settings
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from .models import Address, Listing
+from .sync import ListingSyncService
+from core.enums import UserRole
+from users.models import User
+from users.services import UserService
+
+
+class ListingListOrderingTest(TestCase):
+    """Listing list is ordered only by listed model fields"""
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = User.objects.create_user(
+            email='owner@example.com', password='OwnerPassword123',
+            username='owner', role=UserRole.owner.name
+        )
+        for price in (120, 80, 100):
+            Listing.objects.create(
+                title=f'Flat {price}', description='Flat', owner=cls.owner, house_type='apartment',
+                address=Address.objects.create(city='Berlin', street=f'Hauptstrasse {price}', postal_code='10115'),
+                max_stayers=2, bedrooms=1, bathrooms=1, price_per_night=price
+            )
+
+    def get(self, ordering):
+        return APIClient().get(reverse('listing-list'), {'ordering': ordering, 'fields': 'id,price_per_night'})
+
+    def test_ordering_by_price(self):
+        response = self.get('-price_per_night')
+        self.assertEqual(response.status_code, 200)
+        prices = [float(row['price_per_night']) for row in response.data['results']]
+        self.assertEqual(prices, [120, 100, 80])
+
+    def test_ordering_by_annotation_ignored_for_anonymous(self):
+        self.assertEqual(self.get('is_favorited').status_code, 200)
+
+
+@override_settings(LISTING_SYNC={'PAGE_SIZE': 2, 'MAX_PAGE_SIZE': 10, 'LAG_SECONDS': 0})
+class ListingSyncTest(TestCase):
+    """Delta sync cursor: continuity over pages and ties, tombstones, reset of old tokens"""
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = User.objects.create_user(
+            email='owner@example.com', password='OwnerPassword123',
+            username='owner', role=UserRole.owner.name
+        )
+        cls.listings = [
+            Listing.objects.create(
+                title=f'Flat {number}', description='Flat', owner=cls.owner, house_type='apartment',
+                address=Address.objects.create(city='Berlin', street=f'Hauptstrasse {number}', postal_code='10115'),
+                max_stayers=2, bedrooms=1, bathrooms=1, price_per_night=80
+            )
+            for number in range(5)
+        ]
+        # Same updated_at for all rows, pages must be continued by id
+        Listing.objects.update(updated_at=timezone.now() - timedelta(minutes=1))
+
+    def sync(self, token=None, limit=2):
+        return ListingSyncService.changes(token, limit)
+
+    def sync_all(self, token=None):
+        ids, deleted = [], []
+        while True:
+            page = self.sync(token)
+            ids += [row['id'] for row in page['changed']]
+            deleted += page['deleted']
+            token = page['sync_token']
+            if not page['has_more']:
+                return ids, deleted, token
+
+    def test_pages_cover_every_listing_once(self):
+        ids, deleted, token = self.sync_all()
+        self.assertEqual(ids, [listing.id for listing in self.listings])
+        self.assertEqual(deleted, [])
+        self.assertEqual(self.sync(token)['changed'], [])
+
+    def test_changes_after_token(self):
+        _, _, token = self.sync_all()
+        changed, removed = self.listings[3], self.listings[1]
+        changed.price_per_night = 95
+        changed.save()
+        removed.delete()
+
+        ids, deleted, token = self.sync_all(token)
+        self.assertEqual(ids, [changed.id])
+        self.assertEqual(deleted, [removed.id])
+        self.assertEqual(self.sync_all(token)[:2], ([], []))
+
+    def test_old_token_resets_sync(self):
+        self.listings[0].delete()
+        retention = settings.SOFT_DELETE['RETENTION_DAYS']
+        token = ListingSyncService.encode_token(timezone.now() - timedelta(days=retention + 1), 0)
+
+        page = self.sync(token, limit=10)
+        self.assertTrue(page['reset'])
+        self.assertEqual([row['id'] for row in page['changed']], [listing.id for listing in self.listings[1:]])
+        self.assertEqual(page['deleted'], [])
+
+    def test_address_and_owner_name_changes_are_synced(self):
+        _, _, token = self.sync_all()
+        address = self.listings[2].address
+        address.city = 'Hamburg'
+        address.save()
+        page = self.sync(token, limit=10)
+        self.assertEqual([(row['id'], row['city']) for row in page['changed']], [(self.listings[2].id, 'Hamburg')])
+
+        UserService.update_user_profile(self.owner, {'first_name': 'Anna', 'last_name': 'Berg'})
+        page = self.sync(page['sync_token'], limit=10)
+        self.assertEqual(len(page['changed']), 5)
+        self.assertEqual({row['owner_name'] for row in page['changed']}, {self.owner.get_full_name()})
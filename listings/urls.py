@@ -3,10 +3,13 @@ from . import views
 
 urlpatterns = [
     path('listings/', views.ListingListView.as_view(), name='listing-list'),
+    path('listings/sync/', views.sync_listings, name='listing-sync'),
     path('listings/<int:pk>/', views.ListingDetailView.as_view(), name='listing-detail'),
     path('listings/create/', views.ListingCreateView.as_view(), name='listing-create'),
     path('listings/<int:pk>/manage/', views.ListingManageView.as_view(), name='listing-manage'),
     path('listings/<int:pk>/toggle-status/', views.toggle_listing_status, name='listing-toggle'),
     path('listings/<int:pk>/add-image/', views.add_listing_image, name='listing-add-image'),
+    path('listings/<int:pk>/similar/', views.similar_listings, name='listing-similar'),
+    path('listings/<int:pk>/deletion/', views.listing_deletion_status, name='listing-deletion'),
     path('amenities/', views.AmenityListView.as_view(), name='amenity-list'),
 ]
\ No newline at end of file
@@ -4,42 +4,89 @@ from rest_framework.generics import (
     ListAPIView, RetrieveAPIView,
     ListCreateAPIView, RetrieveUpdateDestroyAPIView
 )
-from rest_framework.permissions import AllowAny
+from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
 
-from .models import Listing, Amenity
+from .deletion import ListingDeletionService
+from .models import Listing, Amenity, ListingDeletionJob
 from .serializers import (
     ListingSerializer, ListingDetailSerializer,
     ListingCreateSerializer, AmenitySerializer,
-    ListingImgSerializer
+    ListingImgSerializer, ListingRowSerializer,
+    ListingDeletionJobSerializer, ListingSyncQuerySerializer
 )
 from .services import ListingService
+from .similarity import get_similar_ids
+from .sync import ListingSyncService
 from users.permissions import Owner, AdminOrOwner
+from core.fieldsets import Fieldset
 
 
 class ListingListView(ListAPIView):
     """
     Return list of currentle active listings
     GET /api/listings/
+    GET /api/listings/?fields=id,title,price_per_night
+    Page rows are built from values() by ListingRowSerializer
     """
     serializer_class = ListingSerializer
     permission_classes = [AllowAny]
+    throttle_scope = 'search'
+    ordering_fields = ['price_per_night', 'created_at', 'bedrooms', 'max_stayers']
+
+    @classmethod
+    def get_admission_cost(cls, request):
+        """icontains searches scan listings and addresses, plain pages are cheap"""
+        params = request.GET
+        if params.get('search') or params.get('city'):
+            return 5
+        return 2
 
     def get_queryset(self):
         """Get listings with advanced filters"""
-        return ListingService.search_listings(self.request.query_params)
+        return ListingService.annotate_favorited(
+            ListingService.search_listings(self.request.query_params),
+            self.request.user
+        )
+
+    def list(self, request, *args, **kwargs):
+        serializer = ListingRowSerializer(Fieldset.from_query_params(request.query_params), request)
+        queryset = serializer.values(self.filter_queryset(self.get_queryset()))
+
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(serializer.serialize(page))
+        return Response(serializer.serialize(list(queryset)))
 
 class ListingDetailView(RetrieveAPIView):
     """
     Return detailed info about 1 listing
     GET /api/listings/{id}/
+    GET /api/listings/{id}/?fields=id,title,address.city
+    GET /api/listings/{id}/?expand=address
     """
-    queryset = Listing.objects.filter(is_active=True).select_related(
-        'owner', 'address'
-    ).prefetch_related('amenities', 'images')
     serializer_class = ListingDetailSerializer
     permission_classes = [AllowAny]
     lookup_field = 'pk'
+    admission_cost = 1
+
+    def get_fieldset(self):
+        return Fieldset.from_query_params(self.request.query_params)
+
+    def get_queryset(self):
+        """Active listings, relations are loaded only for requested fields"""
+        select_related, prefetch_related = self.get_fieldset().related(
+            select_related=['owner', 'address'],
+            prefetch_related=['amenities', 'images']
+        )
+        queryset = Listing.objects.filter(is_active=True).prefetch_related(*prefetch_related)
+        # select_related() without arguments would follow every FK
+        if select_related:
+            queryset = queryset.select_related(*select_related)
+        return queryset
+
+    def get_serializer_context(self):
+        return {**super().get_serializer_context(), 'fieldset': self.get_fieldset()}
 
     def retrieve(self, request, *args, **kwargs):
         """Retrieve listing and increment views"""
@@ -77,6 +124,47 @@ class ListingManageView(RetrieveUpdateDestroyAPIView):
             return Listing.objects.all()
         return Listing.objects.filter(owner=self.request.user)
 
+    def perform_destroy(self, instance):
+        """Soft delete, dependents are removed later by the deletion job"""
+        ListingDeletionService.delete_listing(instance)
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def listing_deletion_status(request, pk):
+    """
+    Return progress of listing deletion job (only for admin/owner)
+    GET /api/listings/{id}/deletion/
+    """
+    jobs = ListingDeletionJob.objects.filter(listing_id=pk)
+    if not request.user.is_admin:
+        jobs = jobs.filter(owner_id=request.user.id)
+    job = jobs.first()
+    if job is None:
+        return Response(
+            {'error': 'Deletion job not found'},
+            status=status.HTTP_404_NOT_FOUND
+        )
+    return Response(ListingDeletionJobSerializer(job).data)
+
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def sync_listings(request):
+    """
+    Return listings changed since sync token (offline cache of mobile clients)
+    GET /api/listings/sync/
+    GET /api/listings/sync/?sync_token=...&limit=500&fields=id,title
+    Without token returns all active listings page by page, follow sync_token while has_more,
+    deleted has ids to drop, reset means the token expired and cache must be rebuilt
+    """
+    params = ListingSyncQuerySerializer(data=request.query_params)
+    params.is_valid(raise_exception=True)
+    return Response(ListingSyncService.changes(
+        params.validated_data.get('sync_token'),
+        params.validated_data['limit'],
+        Fieldset.from_query_params(request.query_params),
+        request
+    ))
+
 @api_view(['POST'])
 @permission_classes([AdminOrOwner])
 def toggle_listing_status(request, pk):
@@ -102,6 +190,33 @@ def toggle_listing_status(request, pk):
         'message': f'Listing {"activated" if listing.is_active else "deactivated"}'
     })
 
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def similar_listings(request, pk):
+    """
+    Return listings similar to the given one ("more like this")
+    GET /api/listings/{id}/similar/
+    """
+    if not Listing.objects.filter(pk=pk, is_active=True).exists():
+        return Response(
+            {'error': 'Listing not found'},
+            status=status.HTTP_404_NOT_FOUND
+        )
+
+    similar_ids = get_similar_ids(pk)
+    listings = ListingService.annotate_favorited(
+        Listing.objects.filter(id__in=similar_ids, is_active=True),
+        request.user
+    ).select_related('owner', 'address').prefetch_related(ListingService.main_image_prefetch())
+    listings_by_id = {listing.id: listing for listing in listings}
+
+    serializer = ListingSerializer(
+        [listings_by_id[listing_id] for listing_id in similar_ids if listing_id in listings_by_id],
+        many=True,
+        context={'request': request}
+    )
+    return Response(serializer.data)
+
 class AmenityListView(ListAPIView):
     """
     Return all available amenities
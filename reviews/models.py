@@ -1,9 +1,9 @@
 from django.db import models
-from core.mixins import TimestampMixin
+from core.mixins import TimestampMixin, SoftDeleteMixin
 from core.validators import validate_rating
 
 
-class Review(TimestampMixin):
+class Review(SoftDeleteMixin, TimestampMixin):
     """Review model for listings"""
     listing = models.ForeignKey(
         'listings.Listing',
@@ -24,6 +24,9 @@ class Review(TimestampMixin):
         verbose_name_plural = 'Reviews'
         ordering = ['-created_at']
         unique_together = ('listing', 'author')
+        indexes = [
+            models.Index(fields=['listing', 'deleted_at', '-created_at']),
+        ]
 
     def __str__(self):
         return f'Review by {self.author.username} for {self.listing.title}'
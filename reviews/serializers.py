@@ -0,0 +1,17 @@
+from rest_framework import serializers
+from .models import Review
+
+
+class ReviewSerializer(serializers.ModelSerializer):
+    """Serializer for listing reviews with author and listing data"""
+    author_id = serializers.IntegerField(read_only=True)
+    author_name = serializers.CharField(source='author.get_full_name', read_only=True)
+    listing_title = serializers.CharField(source='listing.title', read_only=True)
+
+    class Meta:
+        model = Review
+        fields = [
+            'id', 'listing', 'listing_title', 'author_id', 'author_name',
+            'rating', 'comment', 'created_at'
+        ]
+        read_only_fields = ['id', 'listing', 'created_at']
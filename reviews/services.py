@@ -0,0 +1,59 @@
+import logging
+from django.db import transaction, IntegrityError
+from django.db.models import F
+from django.utils import timezone
+from .models import Review
+from bookings.models import Booking
+from listings.models import Listing
+from core.enums import BookingStatus
+from core.exceptions import ReviewError, AccessRightsError
+
+logger = logging.getLogger(__name__)
+
+
+class ReviewService:
+    """Service for review business logic"""
+    @staticmethod
+    def listing_reviews(listing_id):
+        """Reviews of a listing, newest first ((listing, created_at) index)"""
+        return Review.objects.filter(
+            listing_id=listing_id
+        ).select_related('author', 'listing')
+
+    @staticmethod
+    def has_completed_booking(user, listing_id):
+        """Check that user stayed in the listing (single EXISTS query)"""
+        return Booking.objects.filter(
+            tenant=user,
+            listing_id=listing_id,
+            book_status=BookingStatus.completed.name
+        ).exists()
+
+    @staticmethod
+    def create_review(author, listing_id, validated_data):
+        """Create review and update listing rating aggregates in one transaction"""
+        if not ReviewService.has_completed_booking(author, listing_id):
+            raise AccessRightsError('Only tenants with completed booking can leave a review')
+
+        try:
+            with transaction.atomic():
+                review = Review.objects.create(
+                    author=author,
+                    listing_id=listing_id,
+                    **validated_data
+                )
+                ReviewService.update_rating(listing_id, 1, review.rating)
+        except IntegrityError:
+            raise ReviewError()
+
+        logger.info(f'Created review {review.id} for listing {listing_id}')
+        return review
+
+    @staticmethod
+    def update_rating(listing_id, count_delta, rating_delta):
+        """Incremental update of listing rating aggregates (listing counts as changed for delta sync)"""
+        Listing.objects.filter(pk=listing_id).update(
+            reviews_count=F('reviews_count') + count_delta,
+            rating_sum=F('rating_sum') + rating_delta,
+            updated_at=timezone.now()
+        )
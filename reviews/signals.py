@@ -0,0 +1,33 @@
+from django.db.models import Count, Sum
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from .models import Review
+from .services import ReviewService
+from core.signals import bulk_soft_deleted
+
+
+@receiver(post_save, sender=Review)
+def review_soft_deleted(sender, instance, created, update_fields=None, **kwargs):
+    """Keep listing rating aggregates in sync when review is soft deleted or restored"""
+    if created or not update_fields or 'deleted_at' not in update_fields:
+        return
+    sign = -1 if instance.deleted_at else 1
+    ReviewService.update_rating(instance.listing_id, sign, sign * instance.rating)
+
+
+@receiver(bulk_soft_deleted, sender=Review)
+def reviews_bulk_soft_deleted(sender, pks, **kwargs):
+    """Keep listing rating aggregates in sync when reviews are soft deleted by queryset (one update per listing)"""
+    rows = Review.objects.all_records().filter(pk__in=pks).values('listing_id').annotate(
+        count=Count('id'), rating=Sum('rating')
+    ).order_by()
+    for row in rows:
+        ReviewService.update_rating(row['listing_id'], -row['count'], -row['rating'])
+
+
+@receiver(post_delete, sender=Review)
+def review_deleted(sender, instance, **kwargs):
+    """Keep listing rating aggregates in sync when review is hard deleted (soft deleted ones are already excluded)"""
+    if instance.deleted_at is None:
+        ReviewService.update_rating(instance.listing_id, -1, -instance.rating)
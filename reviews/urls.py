@@ -0,0 +1,6 @@
+from django.urls import path
+from . import views
+
+urlpatterns = [
+    path('listings/<int:pk>/reviews/', views.ListingReviewListCreateView.as_view(), name='listing-reviews'),
+]
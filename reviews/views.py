@@ -1,3 +1,44 @@
-from django.shortcuts import render
+from rest_framework.generics import ListCreateAPIView, get_object_or_404
+from rest_framework.pagination import CursorPagination
+from rest_framework.permissions import AllowAny
 
-# Create your views here.
+from .serializers import ReviewSerializer
+from .services import ReviewService
+from listings.models import Listing
+from users.permissions import Tenant
+
+
+class ReviewCursorPagination(CursorPagination):
+    """Keyset pagination over (listing, created_at) index"""
+    ordering = '-created_at'
+    page_size = 20
+
+
+class ListingReviewListCreateView(ListCreateAPIView):
+    """
+    List reviews of a listing / Leave a review after completed stay
+    GET /api/listings/{id}/reviews/
+    POST /api/listings/{id}/reviews/
+    """
+    serializer_class = ReviewSerializer
+    pagination_class = ReviewCursorPagination
+    filter_backends = []
+
+    def get_permissions(self):
+        """Anyone can read reviews, only tenants can write them"""
+        if self.request.method == 'POST':
+            return [Tenant()]
+        return [AllowAny()]
+
+    def get_queryset(self):
+        """Return reviews of a listing"""
+        return ReviewService.listing_reviews(self.kwargs['pk'])
+
+    def perform_create(self, serializer):
+        """Create review using review services"""
+        listing = get_object_or_404(Listing.objects.only('id'), pk=self.kwargs['pk'], is_active=True)
+        serializer.instance = ReviewService.create_review(
+            self.request.user,
+            listing.id,
+            serializer.validated_data
+        )
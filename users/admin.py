@@ -1,6 +1,7 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
 from .models import User, Favorite
+from core.paginator import ApproximateCountPaginator
 
 
 @admin.register(User)
@@ -13,6 +14,8 @@ class UserAdmin(BaseUserAdmin):
     list_filter = ['role', 'is_active', 'is_staff', 'gender']
     search_fields = ['email', 'username', 'first_name', 'last_name']
     ordering = ['-created_at']
+    paginator = ApproximateCountPaginator
+    show_full_result_count = False
 
     fieldsets = (
         ('Account', {
@@ -50,8 +53,11 @@ class FavoriteAdmin(admin.ModelAdmin):
     list_filter = ['created_at']
     search_fields = ['user__email', 'user__username', 'listing__title']
     readonly_fields = ['created_at']
+    autocomplete_fields = ['user', 'listing']
+    paginator = ApproximateCountPaginator
+    show_full_result_count = False
 
     def get_queryset(self, request):
-        """Request optimiyation"""
+        """Request optimiyation (listing is shown with address city)"""
         qs = super().get_queryset(request)
-        return qs.select_related('user', 'listing')
+        return qs.select_related('user', 'listing__address')
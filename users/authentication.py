@@ -0,0 +1,28 @@
+from rest_framework.authentication import BaseAuthentication, get_authorization_header
+
+from .tokens import TokenService
+
+KEYWORD = b'bearer'
+
+
+class SignedTokenAuthentication(BaseAuthentication):
+    """
+    Authorization: Bearer <access token>
+    Token signature and claims are verified without database queries,
+    request.auth holds token claims
+    """
+    def authenticate(self, request):
+        auth = get_authorization_header(request).split()
+        if not auth or auth[0].lower() != KEYWORD or len(auth) != 2:
+            return None
+
+        try:
+            token = auth[1].decode()
+        except UnicodeError:
+            return None
+
+        payload = TokenService.verify(token)
+        return TokenService.user_from_claims(payload), payload
+
+    def authenticate_header(self, request):
+        return 'Bearer'
@@ -0,0 +1,43 @@
+from django.conf import settings
+from django.contrib.auth.backends import ModelBackend
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+
+from .models import User
+
+
+def user_cache_key(user_id):
+    """Cache key of authenticated user row"""
+    return f'users:auth:{user_id}'
+
+
+def invalidate_user(user_id):
+    """Drop cached user row (after save/delete)"""
+    cache.delete(user_cache_key(user_id))
+
+
+class CachedModelBackend(ModelBackend):
+    """
+    ModelBackend that resolves session user from cache
+    AuthenticationMiddleware calls get_user() on every request, so without cache
+    every request reloads the user row. Row values (id, role, is_active, password
+    hash for session verification, ...) are cached for USER_CACHE_TIMEOUT seconds
+    and dropped on User save/delete (users/signals.py)
+    """
+    def get_user(self, user_id):
+        key = user_cache_key(user_id)
+        values = cache.get(key)
+        if values is None:
+            user = super().get_user(user_id)
+            if user is None:
+                return None
+            values = [getattr(user, field.attname) for field in User._meta.concrete_fields]
+            cache.set(key, values, settings.USER_CACHE_TIMEOUT)
+            return user
+
+        user = User.from_db(
+            DEFAULT_DB_ALIAS,
+            [field.attname for field in User._meta.concrete_fields],
+            values
+        )
+        return user if self.user_can_authenticate(user) else None
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from users.recommendations import CoFavoriteService
+
+
+class Command(BaseCommand):
+    """
+    Batch rebuild of "people who saved this also saved" recommendations
+    python manage.py build_co_favorites
+    """
+    help = 'Rebuild co-favorite recommendations from favorites and bookings'
+
+    def handle(self, *args, **options):
+        count = CoFavoriteService.rebuild()
+        self.stdout.write(self.style.SUCCESS(f'Co-favorites rebuilt for {count} listings'))
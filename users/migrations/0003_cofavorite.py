@@ -0,0 +1,35 @@
+# Generated by Django 6.0 on 2026-10-19 06:12
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('listings', '0002_listingsimilarity'),
+        ('users', '0002_favorite'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CoFavorite',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Creation date')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Update date')),
+                ('score', models.FloatField(verbose_name='Co-occurrence score')),
+                ('rank', models.PositiveSmallIntegerField(verbose_name='Rank')),
+                ('listing', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='co_favorites', to='listings.listing', verbose_name='Listing')),
+                ('recommended', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='listings.listing', verbose_name='Recommended listing')),
+            ],
+            options={
+                'verbose_name': 'co-favorite',
+                'verbose_name_plural': 'co-favorites',
+                'db_table': 'co_favorites',
+                'ordering': ['listing', 'rank'],
+                'indexes': [models.Index(fields=['listing', 'rank'], name='co_favorite_listing_5b978d_idx')],
+                'unique_together': {('listing', 'recommended')},
+            },
+        ),
+    ]
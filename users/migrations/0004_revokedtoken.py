@@ -0,0 +1,29 @@
+# Generated by Django 6.0 on 2026-10-19 13:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0003_cofavorite'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RevokedToken',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Creation date')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Update date')),
+                ('jti', models.CharField(max_length=32, unique=True, verbose_name='Token id')),
+                ('expires_at', models.DateTimeField(verbose_name='Token expiry')),
+            ],
+            options={
+                'verbose_name': 'revoked token',
+                'verbose_name_plural': 'revoked tokens',
+                'db_table': 'revoked_tokens',
+                'indexes': [models.Index(fields=['created_at'], name='revoked_tok_created_1cb6ef_idx'), models.Index(fields=['expires_at'], name='revoked_tok_expires_cdc4fe_idx')],
+            },
+        ),
+    ]
@@ -121,6 +121,18 @@ class User(AbstractBaseUser, PermissionsMixin, TimestampMixin):
             return f"{self.first_name} {self.last_name} ({self.email})"
         return self.email
 
+    def refresh_from_db(self, using=None, fields=None, from_queryset=None):
+        """
+        Load all deferred fields at once on first access
+        (token users carry only id and role, users/tokens.py), fields taken
+        from token claims are reloaded with them
+        """
+        deferred = self.get_deferred_fields()
+        if fields is not None and deferred and set(fields) <= deferred:
+            fields = list(deferred | getattr(self, '_claim_fields', set()))
+            self._claim_fields = set()
+        super().refresh_from_db(using=using, fields=fields, from_queryset=from_queryset)
+
     def get_full_name(self):
         """Return full name of a user"""
         full_name = f"{self.first_name} {self.last_name}".strip()
@@ -182,3 +194,58 @@ class Favorite(TimestampMixin):
 
     def __str__(self):
         return f"{self.user.username} → {self.listing.title}"
+
+
+class CoFavorite(TimestampMixin):
+    """
+    "People who saved this also saved" neighbours of a listing
+    Top-N rows per listing, maintained by users/recommendations.py
+    """
+    listing = models.ForeignKey(
+        'listings.Listing',
+        on_delete=models.CASCADE,
+        related_name='co_favorites',
+        verbose_name='Listing'
+    )
+    recommended = models.ForeignKey(
+        'listings.Listing',
+        on_delete=models.CASCADE,
+        related_name='+',
+        verbose_name='Recommended listing'
+    )
+    score = models.FloatField('Co-occurrence score')
+    rank = models.PositiveSmallIntegerField('Rank')
+
+    class Meta:
+        db_table = 'co_favorites'
+        verbose_name = 'co-favorite'
+        verbose_name_plural = 'co-favorites'
+        unique_together = ('listing', 'recommended')
+        ordering = ['listing', 'rank']
+        indexes = [
+            models.Index(fields=['listing', 'rank']),
+        ]
+
+    def __str__(self):
+        return f"{self.listing_id} → {self.recommended_id} ({self.score})"
+
+
+class RevokedToken(TimestampMixin):
+    """
+    Revoked token id (logout, refresh rotation), shared by all workers
+    Kept until the token would expire anyway (users/tokens.py)
+    """
+    jti = models.CharField('Token id', max_length=32, unique=True)
+    expires_at = models.DateTimeField('Token expiry')
+
+    class Meta:
+        db_table = 'revoked_tokens'
+        verbose_name = 'revoked token'
+        verbose_name_plural = 'revoked tokens'
+        indexes = [
+            models.Index(fields=['created_at']),
+            models.Index(fields=['expires_at']),
+        ]
+
+    def __str__(self):
+        return self.jti
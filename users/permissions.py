@@ -5,17 +5,18 @@ class AdminOrOwner(permissions.BasePermission):
     """
     Accessibility options only for admins and owners
     (e.g. profile/listings editing ...)
+    Ownership is checked by FK ids, related objects are never loaded
     """
     def has_object_permission(self, request, view, obj):
         if request.user.is_admin:
             return True
 
-        if hasattr(obj, 'owner'):
-            return obj.owner == request.user
-        elif hasattr(obj, 'user'):
-            return obj.user == request.user
+        if hasattr(obj, 'owner_id'):
+            return obj.owner_id == request.user.id
+        elif hasattr(obj, 'user_id'):
+            return obj.user_id == request.user.id
 
-        return obj == request.user
+        return obj.pk == request.user.id
 
 class Admin(permissions.BasePermission):
     """
@@ -53,9 +54,9 @@ class OwnerOrUserReadOnly(permissions.BasePermission):
         if request.method in permissions.SAFE_METHODS:
             return True
 
-        if hasattr(obj, 'owner'):
-            return obj.owner == request.user
-        elif hasattr(obj, 'user'):
-            return obj.user == request.user
+        if hasattr(obj, 'owner_id'):
+            return obj.owner_id == request.user.id
+        elif hasattr(obj, 'user_id'):
+            return obj.user_id == request.user.id
 
         return False
\ No newline at end of file
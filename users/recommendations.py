@@ -0,0 +1,235 @@
+import logging
+
+import numpy as np
+from scipy import sparse
+from django.core.cache import cache
+from django.db import transaction
+
+from .models import Favorite, CoFavorite
+from bookings.models import Booking
+from core.enums import BookingStatus
+from core.jobs import JobQueue
+from core.metrics import CACHE_REQUESTS
+
+logger = logging.getLogger(__name__)
+
+TOP_N = 10
+FAVORITE_WEIGHT = 1.0
+BOOKING_WEIGHT = 2.0
+# Users with huge wishlists add k^2 pairs and almost no signal
+MAX_USER_ITEMS = 500
+# Exact row recomputes of one wishlist update, the rest goes to a follow-up job
+MAX_ROW_REFRESHES = 20
+CACHE_TIMEOUT = 60 * 60
+BATCH_SIZE = 5000
+
+BOOKED_STATUSES = [BookingStatus.confirmed.name, BookingStatus.completed.name]
+
+
+def also_saved_cache_key(listing_id):
+    """Cache key of listing co-favorite ids"""
+    return f'favorites:also-saved:{listing_id}'
+
+
+def _interactions(user_ids=None):
+    """
+    Return (user_id, listing_id, weight) arrays
+    from favorites and confirmed/completed bookings
+    """
+    favorites = Favorite.objects.order_by()
+    bookings = Booking.objects.filter(book_status__in=BOOKED_STATUSES).order_by()
+    if user_ids is not None:
+        favorites = favorites.filter(user_id__in=user_ids)
+        bookings = bookings.filter(tenant_id__in=user_ids)
+
+    favorite_rows = list(favorites.values_list('user_id', 'listing_id'))
+    booking_rows = list(bookings.values_list('tenant_id', 'listing_id').distinct())
+
+    rows = np.array(favorite_rows + booking_rows, dtype=np.int64).reshape(-1, 2)
+    weights = np.concatenate([
+        np.full(len(favorite_rows), FAVORITE_WEIGHT),
+        np.full(len(booking_rows), BOOKING_WEIGHT),
+    ])
+    return rows[:, 0], rows[:, 1], weights
+
+
+def _user_item_matrix(user_ids, listing_ids, weights):
+    """
+    Sparse users x listings matrix, duplicates (favorite + booking) are summed
+    Returns matrix with listing ids of its columns
+    """
+    users, user_index = np.unique(user_ids, return_inverse=True)
+    listings, listing_index = np.unique(listing_ids, return_inverse=True)
+    matrix = sparse.csr_matrix(
+        (weights, (user_index, listing_index)),
+        shape=(len(users), len(listings))
+    )
+
+    items_per_user = np.diff(matrix.indptr)
+    if (items_per_user > MAX_USER_ITEMS).any():
+        keep = sparse.diags((items_per_user <= MAX_USER_ITEMS).astype(np.float64))
+        matrix = (keep @ matrix).tocsr()
+        matrix.eliminate_zeros()
+    return matrix, listings
+
+
+def _top_n(listing_ids, scores, exclude_id):
+    """Top-N (listing_id, score) pairs of a score row"""
+    mask = (scores > 0) & (listing_ids != exclude_id)
+    listing_ids, scores = listing_ids[mask], scores[mask]
+    order = np.lexsort((listing_ids, -scores))[:TOP_N]
+    return list(zip(listing_ids[order].tolist(), scores[order].tolist()))
+
+
+class CoFavoriteService:
+    """Item-to-item co-occurrence recommendations from favorites and bookings"""
+    @staticmethod
+    def get_also_saved_ids(listing_id):
+        """Return co-favorite listing ids ordered by score (cached)"""
+        key = also_saved_cache_key(listing_id)
+        listing_ids = cache.get(key)
+        CACHE_REQUESTS.inc(cache='also_saved', result='miss' if listing_ids is None else 'hit')
+        if listing_ids is None:
+            listing_ids = list(
+                CoFavorite.objects.filter(listing_id=listing_id)
+                .order_by('rank').values_list('recommended_id', flat=True)
+            )
+            cache.set(key, listing_ids, CACHE_TIMEOUT)
+        return listing_ids
+
+    @staticmethod
+    def _store(rows):
+        """Replace stored neighbours of listings: {listing_id: [(recommended_id, score)]}"""
+        with transaction.atomic():
+            CoFavorite.objects.filter(listing_id__in=list(rows)).delete()
+            CoFavorite.objects.bulk_create([
+                CoFavorite(listing_id=listing_id, recommended_id=recommended_id, score=score, rank=rank)
+                for listing_id, neighbours in rows.items()
+                for rank, (recommended_id, score) in enumerate(neighbours)
+            ], batch_size=BATCH_SIZE)
+        cache.delete_many([also_saved_cache_key(listing_id) for listing_id in rows])
+
+    @staticmethod
+    def rebuild():
+        """
+        Batch job: C = X.T @ X over sparse users x listings matrix,
+        then keep top-N of every row
+        """
+        matrix, listings = _user_item_matrix(*_interactions())
+        co_occurrence = (matrix.T @ matrix).tocsr()
+        co_occurrence.setdiag(0)
+        co_occurrence.eliminate_zeros()
+
+        CoFavorite.objects.all().delete()
+        rows = {}
+        for position, listing_id in enumerate(listings.tolist()):
+            start, end = co_occurrence.indptr[position], co_occurrence.indptr[position + 1]
+            if start == end:
+                continue
+            rows[listing_id] = _top_n(
+                listings[co_occurrence.indices[start:end]],
+                co_occurrence.data[start:end],
+                listing_id
+            )
+            if len(rows) >= BATCH_SIZE // TOP_N:
+                CoFavoriteService._store(rows)
+                rows = {}
+        if rows:
+            CoFavoriteService._store(rows)
+
+        logger.info(f'Rebuilt co-favorites for {len(listings)} listings')
+        return len(listings)
+
+    @staticmethod
+    def _row_scores(listing_id):
+        """
+        Exact co-occurrence of one listing with all others:
+        row of X.T @ X restricted to users who interacted with the listing
+        """
+        user_ids = set(Favorite.objects.filter(listing_id=listing_id).values_list('user_id', flat=True))
+        user_ids.update(
+            Booking.objects.filter(listing_id=listing_id, book_status__in=BOOKED_STATUSES)
+            .values_list('tenant_id', flat=True)
+        )
+        if not user_ids:
+            return np.empty(0, dtype=np.int64), np.empty(0)
+
+        matrix, listings = _user_item_matrix(*_interactions(list(user_ids)))
+        column = np.searchsorted(listings, listing_id)
+        if column >= len(listings) or listings[column] != listing_id:
+            return np.empty(0, dtype=np.int64), np.empty(0)
+
+        scores = np.asarray((matrix[:, column].T @ matrix).todense()).ravel()
+        return listings, scores
+
+    @staticmethod
+    def schedule_update(user_id, listing_ids, added=True):
+        """Enqueue one incremental update job for a wishlist change, after commit"""
+        listing_ids = sorted(listing_ids)
+        if not listing_ids:
+            return
+        transaction.on_commit(lambda: JobQueue.enqueue(
+            'users.update_co_favorites',
+            {'user_id': user_id, 'listing_ids': listing_ids, 'added': added},
+            user_id=user_id
+        ))
+
+    @staticmethod
+    def refresh_rows(listing_ids):
+        """Exact recompute of stored neighbours of listings"""
+        rows = {}
+        for listing_id in listing_ids:
+            listings, scores = CoFavoriteService._row_scores(listing_id)
+            rows[listing_id] = _top_n(listings, scores, listing_id)
+        CoFavoriteService._store(rows)
+        return len(rows)
+
+    @staticmethod
+    def update_for_favorites(user_id, listing_ids, added=True):
+        """
+        Incremental update after user added/removed listings to wishlist (runs as background job)
+        Only pairs (listing, other user items) change, so only these rows are touched
+        Rows that lost a listing from full top-N need exact recompute, at most MAX_ROW_REFRESHES
+        of them are recomputed here and the rest by a follow-up job
+        """
+        listing_ids = set(listing_ids)
+        rows, pair_scores = {}, {}
+        for listing_id in listing_ids:
+            listings, scores = CoFavoriteService._row_scores(listing_id)
+            rows[listing_id] = _top_n(listings, scores, listing_id)
+            pair_scores[listing_id] = dict(zip(listings.tolist(), scores.tolist()))
+
+        other_ids = set(Favorite.objects.filter(user_id=user_id).values_list('listing_id', flat=True))
+        other_ids.update(
+            Booking.objects.filter(tenant_id=user_id, book_status__in=BOOKED_STATUSES)
+            .values_list('listing_id', flat=True)
+        )
+        other_ids -= listing_ids
+        if len(other_ids) > MAX_USER_ITEMS:
+            other_ids = set()
+
+        stored = {}
+        for other_id, recommended_id, score in CoFavorite.objects.filter(
+            listing_id__in=other_ids
+        ).order_by('listing_id', 'rank').values_list('listing_id', 'recommended_id', 'score'):
+            stored.setdefault(other_id, []).append((recommended_id, score))
+
+        stale_ids = []
+        for other_id in sorted(other_ids):
+            neighbours = dict(stored.get(other_id, []))
+            if not added and len(neighbours) >= TOP_N and not listing_ids.isdisjoint(neighbours):
+                # Dropped score can let a listing outside of stored top-N overtake it
+                stale_ids.append(other_id)
+                continue
+
+            for listing_id in listing_ids:
+                neighbours[listing_id] = pair_scores[listing_id].get(other_id, 0)
+            ids = np.array(list(neighbours), dtype=np.int64)
+            rows[other_id] = _top_n(ids, np.array(list(neighbours.values()), dtype=np.float64), other_id)
+
+        CoFavoriteService._store(rows)
+        CoFavoriteService.refresh_rows(stale_ids[:MAX_ROW_REFRESHES])
+        if len(stale_ids) > MAX_ROW_REFRESHES:
+            JobQueue.enqueue('users.refresh_co_favorites', {'listing_ids': stale_ids[MAX_ROW_REFRESHES:]})
+        logger.info(f'Updated co-favorites of {len(rows) + len(stale_ids)} listings for user {user_id}')
+        return len(rows) + len(stale_ids)
@@ -1,6 +1,7 @@
 from rest_framework import serializers
 from .models import User, Favorite
 from django.contrib.auth.password_validation import validate_password
+from core.exceptions import DateRangeError
 
 class UserSerializer(serializers.ModelSerializer):
     """User serializer for registration"""
@@ -46,6 +47,17 @@ class UserSerializer(serializers.ModelSerializer):
         return user
 
 
+class LoginSerializer(serializers.Serializer):
+    """Credentials for token login"""
+    email = serializers.EmailField()
+    password = serializers.CharField(write_only=True, style={'input_type': 'password'})
+
+
+class TokenSerializer(serializers.Serializer):
+    """Refresh token for rotation and logout"""
+    refresh = serializers.CharField()
+
+
 class UserProfileSerializer(serializers.ModelSerializer):
     """Serializer for user profile shown"""
     full_name = serializers.CharField(source='get_full_name', read_only=True)
@@ -78,4 +90,29 @@ class FavoriteSerializer(serializers.ModelSerializer):
     class Meta:
         model = Favorite
         fields = ['id', 'user', 'listing', 'listing_id', 'created_at']
-        read_only_fields = ['id', 'user', 'listing', 'created_at']
\ No newline at end of file
+        read_only_fields = ['id', 'user', 'listing', 'created_at']
+
+
+class FavoriteBulkSerializer(serializers.Serializer):
+    """Serializer for bulk wishlist add/remove and membership lookup"""
+    listing_ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        allow_empty=False,
+        max_length=100
+    )
+
+
+class AnalyticsQuerySerializer(serializers.Serializer):
+    """Query params of owner analytics"""
+    date_from = serializers.DateField()
+    date_to = serializers.DateField()
+    listing_id = serializers.IntegerField(required=False)
+    group_by = serializers.ChoiceField(choices=['day', 'month'], default='month')
+
+    def validate(self, data):
+        """Check that date range is valid and not too long"""
+        if data['date_to'] < data['date_from']:
+            raise DateRangeError()
+        if (data['date_to'] - data['date_from']).days > 731:
+            raise DateRangeError('Date range cant be longer than 2 years')
+        return data
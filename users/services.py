@@ -1,12 +1,17 @@
 import logging
-from django.db import transaction
+from django.db import transaction, IntegrityError
+from django.utils import timezone
 from .models import User, Favorite
+from .recommendations import CoFavoriteService
 from listings.models import Listing
 from core.exceptions import AccessRightsError
 
 
 logger = logging.getLogger(__name__)
 
+# User fields shown as owner_name of listings
+OWNER_NAME_FIELDS = {'first_name', 'last_name', 'username'}
+
 class UserService:
     """Service for work with user"""
     @staticmethod
@@ -23,7 +28,12 @@ class UserService:
         for field, val in validated_data.items():
             setattr(user, field, val)
 
-        user.save()
+        with transaction.atomic():
+            # Only changed fields, request user can carry stale values (token claims)
+            user.save(update_fields=[*validated_data, 'updated_at'])
+            if OWNER_NAME_FIELDS.intersection(validated_data):
+                # owner_name is part of listing rows, delta sync picks it up by updated_at
+                Listing.objects.all_records().filter(owner=user).update(updated_at=timezone.now())
         logger.info(f'User profile updated: {user.email}')
         return user
 
@@ -53,38 +63,84 @@ class FavoriteService:
     """Service to work with favorites(wishlist)"""
     @staticmethod
     def add_listing_to_fav(user, listing_id):
-        try:
-            listing = Listing.objects.get(id=listing_id, is_active=True)
-        except Listing.DoesNotExist:
+        """Add listing to wishlist: owner lookup and a single insert"""
+        owner_id = Listing.objects.filter(
+            id=listing_id, is_active=True
+        ).values_list('owner_id', flat=True).first()
+        if owner_id is None:
             raise ValueError('Listing was not found or is unavailable')
 
-        if listing.owner == user:
+        if owner_id == user.id:
             raise AccessRightsError(
                 'You cant add your own listing to wishlist'
             )
 
-        favorite, created = Favorite.objects.get_or_create(
-            user=user,
-            listing=listing
-        )
-
-        if not created:
+        try:
+            with transaction.atomic():
+                favorite = Favorite.objects.create(user=user, listing_id=listing_id)
+        except IntegrityError:
             raise ValueError('Listing already wishlisted')
 
-        logger.info(f'User {user.email} add in wishlist: {listing.title}')
+        CoFavoriteService.schedule_update(user.id, [listing_id], added=True)
+        logger.info(f'User {user.email} add in wishlist: {listing_id}')
         return favorite
 
+    @staticmethod
+    def bulk_add_to_fav(user, listing_ids):
+        """
+        Add several listings to wishlist
+        Unavailable, own and already wishlisted listings are skipped
+        Returns ids of added listings
+        """
+        available = set(
+            Listing.objects.filter(id__in=listing_ids, is_active=True)
+            .exclude(owner=user).values_list('id', flat=True)
+        )
+        new_ids = available - FavoriteService.favorited_ids(user, available)
+        Favorite.objects.bulk_create(
+            [Favorite(user=user, listing_id=listing_id) for listing_id in new_ids],
+            ignore_conflicts=True
+        )
+
+        CoFavoriteService.schedule_update(user.id, new_ids, added=True)
+        logger.info(f'User {user.email} add {len(new_ids)} listings in wishlist')
+        return sorted(new_ids)
+
+    @staticmethod
+    def bulk_remove_from_fav(user, listing_ids):
+        """
+        Remove several listings from wishlist with a single delete
+        Returns ids of removed listings
+        """
+        removed_ids = FavoriteService.favorited_ids(user, listing_ids)
+        if removed_ids:
+            Favorite.objects.filter(user=user, listing_id__in=removed_ids).delete()
+
+        CoFavoriteService.schedule_update(user.id, removed_ids, added=False)
+        logger.info(f'User {user.email} removed {len(removed_ids)} listings from wishlist')
+        return sorted(removed_ids)
+
+    @staticmethod
+    def favorited_ids(user, listing_ids):
+        """Return which of listing ids are wishlisted by user (one (user, listing) index lookup)"""
+        if not listing_ids:
+            return set()
+        return set(
+            Favorite.objects.filter(user=user, listing_id__in=listing_ids)
+            .order_by().values_list('listing_id', flat=True)
+        )
+
     @staticmethod
     def remove_from_favorites(user, listing_id):
         """Removal of listing from wishlist"""
-        try:
-            favorite = Favorite.objects.get(user=user, listing_id=listing_id)
-            favorite.delete()
-            logger.info(f'User {user.email} removed listing from wishlist: {listing_id}')
-            return True
-        except Favorite.DoesNotExist:
+        deleted, _ = Favorite.objects.filter(user=user, listing_id=listing_id).delete()
+        if not deleted:
             return False
 
+        CoFavoriteService.schedule_update(user.id, [listing_id], added=False)
+        logger.info(f'User {user.email} removed listing from wishlist: {listing_id}')
+        return True
+
     @staticmethod
     def user_favorited(user):
         """Receive all users wishlisted listings"""
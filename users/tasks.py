@@ -0,0 +1,27 @@
+from core.jobs import task
+from .recommendations import CoFavoriteService
+from .tokens import TokenDenylist
+
+
+@task('users.update_co_favorites')
+def update_co_favorites(user_id, listing_ids, added=True):
+    """Incremental co-favorites update after wishlist change"""
+    return {'listings': CoFavoriteService.update_for_favorites(user_id, listing_ids, added)}
+
+
+@task('users.refresh_co_favorites')
+def refresh_co_favorites(listing_ids):
+    """Exact recompute of co-favorites of listings"""
+    return {'listings': CoFavoriteService.refresh_rows(listing_ids)}
+
+
+@task('users.rebuild_co_favorites')
+def rebuild_co_favorites():
+    """Full rebuild of co-favorites"""
+    return {'listings': CoFavoriteService.rebuild()}
+
+
+@task('users.purge_revoked_tokens')
+def purge_revoked_tokens():
+    """Delete revocations of expired tokens"""
+    return {'deleted': TokenDenylist.purge()}
@@ -1,3 +1,116 @@
-from django.test import TestCase
+import time
 
-# Create your tests here.
+from django.core.cache import cache
+from django.test import TestCase, RequestFactory
+
+from .backends import CachedModelBackend
+from .models import User
+from .permissions import AdminOrOwner, Owner, OwnerOrUserReadOnly
+from .services import UserService
+from .tokens import TokenDenylist, TokenService
+from core.enums import UserRole
+from listings.models import Address, Listing
+
+
+class CachedUserPermissionsTest(TestCase):
+    """Session user resolution from cache and query-free permission checks"""
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = User.objects.create_user(
+            email='owner@example.com', password='OwnerPassword123',
+            username='owner', role=UserRole.owner.name
+        )
+        cls.listing = Listing.objects.create(
+            title='Flat', description='Flat', owner=cls.owner, house_type='apartment',
+            address=Address.objects.create(city='Berlin', street='Hauptstrasse 1', postal_code='10115'),
+            max_stayers=2, bedrooms=1, bathrooms=1, price_per_night=80
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.backend = CachedModelBackend()
+
+    def request(self, method='get'):
+        request = getattr(RequestFactory(), method)('/')
+        with self.assertNumQueries(1):
+            self.backend.get_user(self.owner.id)
+        with self.assertNumQueries(0):
+            request.user = self.backend.get_user(self.owner.id)
+        return request
+
+    def test_user_resolved_from_cache(self):
+        request = self.request()
+        self.assertEqual(request.user, self.owner)
+        self.assertEqual(request.user.role, UserRole.owner.name)
+        self.assertEqual(request.user.email, self.owner.email)
+
+    def test_cache_invalidated_on_save(self):
+        self.request()
+        User.objects.get(pk=self.owner.id).save()
+        with self.assertNumQueries(1):
+            self.backend.get_user(self.owner.id)
+
+    def test_inactive_user_not_resolved(self):
+        self.request()
+        user = User.objects.get(pk=self.owner.id)
+        user.is_active = False
+        user.save()
+        self.assertIsNone(self.backend.get_user(self.owner.id))
+
+    def test_permission_layer_without_queries(self):
+        request = self.request('post')
+        listing = Listing.objects.get(pk=self.listing.id)
+
+        with self.assertNumQueries(0):
+            self.assertTrue(Owner().has_permission(request, None))
+            self.assertTrue(AdminOrOwner().has_object_permission(request, None, listing))
+            self.assertTrue(OwnerOrUserReadOnly().has_object_permission(request, None, listing))
+            self.assertTrue(AdminOrOwner().has_object_permission(request, None, request.user))
+
+
+class TokenUserTest(TestCase):
+    """User built from token claims does not write stale claims back"""
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            email='tenant@example.com', password='TenantPassword123',
+            username='tenant', role=UserRole.tenant.name
+        )
+
+    def token_user(self):
+        payload = TokenService.verify(TokenService.issue_pair(self.user)['access'])
+        return TokenService.user_from_claims(payload)
+
+    def test_save_keeps_database_role_and_is_active(self):
+        user = self.token_user()
+        User.objects.filter(pk=self.user.pk).update(role=UserRole.owner.name, is_active=False)
+
+        self.assertFalse(user.is_active)
+        self.assertEqual(user.role, UserRole.owner.name)
+        user.save()
+        stored = User.objects.get(pk=self.user.pk)
+        self.assertEqual(stored.role, UserRole.owner.name)
+        self.assertFalse(stored.is_active)
+
+    def test_profile_update_saves_only_changed_fields(self):
+        user = self.token_user()
+        User.objects.filter(pk=self.user.pk).update(role=UserRole.owner.name)
+
+        UserService.update_user_profile(user, {'first_name': 'Anna'})
+        stored = User.objects.get(pk=self.user.pk)
+        self.assertEqual(stored.first_name, 'Anna')
+        self.assertEqual(stored.role, UserRole.owner.name)
+
+
+class TokenDenylistTest(TestCase):
+    """Revocations are shared between workers through the database"""
+    def test_revocation_seen_by_fresh_denylist(self):
+        TokenDenylist().add('revoked-jti', time.time() + 60)
+        denylist = TokenDenylist()
+        self.assertIn('revoked-jti', denylist)
+        self.assertNotIn('other-jti', denylist)
+
+    def test_expired_revocations_dropped(self):
+        TokenDenylist().add('expired-jti', time.time() - 1)
+        self.assertNotIn('expired-jti', TokenDenylist())
+        self.assertEqual(TokenDenylist.purge(), 1)
@@ -0,0 +1,146 @@
+import logging
+import secrets
+import threading
+import time
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.core import signing
+from django.db import DEFAULT_DB_ALIAS
+from django.utils import timezone
+
+from .models import User, RevokedToken
+from core.exceptions import InvalidTokenError
+
+logger = logging.getLogger(__name__)
+
+ACCESS = 'access'
+REFRESH = 'refresh'
+SALT = 'users.tokens'
+
+
+class TokenDenylist:
+    """
+    Revoked token ids, stored in revoked_tokens table until the tokens would expire anyway
+    Workers keep an in-process copy, refreshed with revocations of other workers
+    at most every DENYLIST_SYNC_INTERVAL seconds (one small query, not one per request)
+    """
+    # Revocations committed late are still picked up by the next sync
+    SYNC_MARGIN = 60
+
+    def __init__(self):
+        self._entries = {}
+        self._lock = threading.Lock()
+        self._synced_at = None
+        self._next_sync = 0.0
+
+    def add(self, jti, exp):
+        RevokedToken.objects.get_or_create(
+            jti=jti, defaults={'expires_at': datetime.fromtimestamp(exp, tz=dt_timezone.utc)}
+        )
+        with self._lock:
+            self._entries[jti] = exp
+
+    def __contains__(self, jti):
+        now = time.time()
+        if now >= self._next_sync:
+            self.sync(now)
+        return jti in self._entries
+
+    def __len__(self):
+        return len(self._entries)
+
+    def sync(self, now=None):
+        """Load revocations of other workers and drop entries of expired tokens"""
+        now = now or time.time()
+        rows = RevokedToken.objects.filter(expires_at__gt=datetime.fromtimestamp(now, tz=dt_timezone.utc))
+        if self._synced_at is not None:
+            rows = rows.filter(created_at__gte=self._synced_at - timedelta(seconds=self.SYNC_MARGIN))
+        synced_at = timezone.now()
+        revoked = {jti: expires_at.timestamp() for jti, expires_at in rows.values_list('jti', 'expires_at')}
+        with self._lock:
+            self._entries.update(revoked)
+            self._entries = {jti: exp for jti, exp in self._entries.items() if exp > now}
+            self._synced_at = synced_at
+            self._next_sync = now + settings.TOKEN_AUTH['DENYLIST_SYNC_INTERVAL']
+
+    @staticmethod
+    def purge():
+        """Delete revocations of expired tokens"""
+        deleted, _ = RevokedToken.objects.filter(expires_at__lte=timezone.now()).delete()
+        return deleted
+
+
+denylist = TokenDenylist()
+
+
+class TokenService:
+    """
+    Stateless access/refresh tokens signed with SECRET_KEY
+    Claims: uid (user id), role, typ (access/refresh), jti (token id), exp (unix time)
+    """
+    @staticmethod
+    def _issue(user, token_type, lifetime):
+        payload = {
+            'uid': user.id,
+            'role': user.role,
+            'typ': token_type,
+            'jti': secrets.token_hex(8),
+            'exp': int(time.time()) + lifetime,
+        }
+        return signing.dumps(payload, salt=SALT)
+
+    @staticmethod
+    def issue_pair(user):
+        """New access and refresh tokens of user"""
+        return {
+            'access': TokenService._issue(user, ACCESS, settings.TOKEN_AUTH['ACCESS_LIFETIME']),
+            'refresh': TokenService._issue(user, REFRESH, settings.TOKEN_AUTH['REFRESH_LIFETIME']),
+            'token_type': 'Bearer',
+            'expires_in': settings.TOKEN_AUTH['ACCESS_LIFETIME'],
+        }
+
+    @staticmethod
+    def verify(token, token_type=ACCESS):
+        """Check signature, type, expiry and denylist, return claims (no database access)"""
+        try:
+            payload = signing.loads(token, salt=SALT)
+        except signing.BadSignature:
+            raise InvalidTokenError()
+
+        if payload.get('typ') != token_type or payload.get('exp', 0) <= time.time():
+            raise InvalidTokenError()
+        if payload['jti'] in denylist:
+            raise InvalidTokenError('Token has been revoked')
+        return payload
+
+    @staticmethod
+    def user_from_claims(payload):
+        """
+        User instance built from token claims (id and role for permission checks)
+        Other fields are deferred and loaded in one query on first access,
+        role is reloaded with them, so a later save never writes back the claim
+        """
+        user = User.from_db(DEFAULT_DB_ALIAS, ['id', 'role'], [payload['uid'], payload['role']])
+        user._claim_fields = {'role'}
+        return user
+
+    @staticmethod
+    def revoke(payload):
+        """Add token to denylist until it expires"""
+        denylist.add(payload['jti'], payload['exp'])
+
+    @staticmethod
+    def refresh(token):
+        """
+        Rotate refresh token: old one is revoked, new pair is issued
+        User is reloaded here, so role changes and deactivation apply on refresh
+        """
+        payload = TokenService.verify(token, REFRESH)
+        user = User.objects.filter(pk=payload['uid'], is_active=True).first()
+        if user is None:
+            raise InvalidTokenError('User is inactive or deleted')
+
+        TokenService.revoke(payload)
+        logger.info(f'Refreshed tokens for user {user.id}')
+        return TokenService.issue_pair(user)
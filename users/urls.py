@@ -4,6 +4,9 @@ from . import views
 urlpatterns = [
     # Authentication
     path('register/', views.register, name='user-register'),
+    path('login/', views.login, name='user-login'),
+    path('token/refresh/', views.refresh_token, name='user-token-refresh'),
+    path('logout/', views.logout, name='user-logout'),
 
     # Users
     path('users/', views.UserListView.as_view(), name='user-list'),
@@ -11,8 +14,12 @@ urlpatterns = [
     path('users/me/', views.current_user, name='user-me'),
     path('users/update-profile/', views.update_profile, name='user-update-profile'),
     path('users/statistics/', views.user_statistics, name='user-statistics'),
+    path('users/analytics/', views.owner_analytics, name='user-analytics'),
 
     # Favorites
     path('favorites/', views.FavoriteListCreateView.as_view(), name='favorite-list-create'),
     path('favorites/<int:pk>/', views.FavoriteDetailView.as_view(), name='favorite-detail'),
+    path('favorites/membership/', views.favorite_membership, name='favorite-membership'),
+    path('favorites/bulk/', views.favorite_bulk, name='favorite-bulk'),
+    path('favorites/also-saved/<int:listing_id>/', views.also_saved_listings, name='favorite-also-saved'),
     ]
\ No newline at end of file
@@ -1,8 +1,9 @@
 import logging
 
+from django.contrib.auth import authenticate
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import filters, status
-from rest_framework.decorators import api_view, permission_classes
+from rest_framework.decorators import api_view, permission_classes, throttle_classes
 from rest_framework.generics import (ListAPIView, RetrieveAPIView,
     ListCreateAPIView, RetrieveUpdateDestroyAPIView )
 
@@ -11,9 +12,18 @@ from rest_framework.response import Response
 
 from .models import User, Favorite
 from .serializers import (UserSerializer, UserProfileSerializer,
-    UserInfoUpdateSerializer, FavoriteSerializer )
+    UserInfoUpdateSerializer, FavoriteSerializer, FavoriteBulkSerializer,
+    AnalyticsQuerySerializer, LoginSerializer, TokenSerializer )
 
 from .services import UserService, FavoriteService
+from .recommendations import CoFavoriteService
+from .tokens import TokenService, REFRESH
+from listings.models import Listing
+from listings.serializers import ListingSerializer
+from listings.services import ListingService
+from bookings.services import BookingRollupService
+from core.exceptions import AccessRightsError, InvalidTokenError
+from core.throttling import AuthRateThrottle
 
 logger = logging.getLogger(__name__)
 
@@ -21,6 +31,7 @@ logger = logging.getLogger(__name__)
 # User views
 @api_view(['POST'])
 @permission_classes([AllowAny])
+@throttle_classes([AuthRateThrottle])
 def register(request):
     """
     Register new user
@@ -49,6 +60,69 @@ def register(request):
     return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
+@api_view(['POST'])
+@permission_classes([AllowAny])
+@throttle_classes([AuthRateThrottle])
+def login(request):
+    """
+    Obtain access/refresh token pair
+    POST /api/login/
+    {
+        "email": "joe@test.com",
+        "password": "TestTest123"
+    }
+    """
+    serializer = LoginSerializer(data=request.data)
+    serializer.is_valid(raise_exception=True)
+
+    user = authenticate(
+        request,
+        email=serializer.validated_data['email'],
+        password=serializer.validated_data['password']
+    )
+    if user is None:
+        return Response(
+            {'error': 'Invalid email or password'},
+            status=status.HTTP_401_UNAUTHORIZED
+        )
+
+    logger.info(f'User logged in with token: {user.email}')
+    return Response(TokenService.issue_pair(user))
+
+
+@api_view(['POST'])
+@permission_classes([AllowAny])
+@throttle_classes([AuthRateThrottle])
+def refresh_token(request):
+    """
+    Exchange refresh token for a new token pair (old refresh token is revoked)
+    POST /api/token/refresh/ {"refresh": "..."}
+    """
+    serializer = TokenSerializer(data=request.data)
+    serializer.is_valid(raise_exception=True)
+    return Response(TokenService.refresh(serializer.validated_data['refresh']))
+
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def logout(request):
+    """
+    Revoke current access token and given refresh token
+    POST /api/logout/ {"refresh": "..."}
+    """
+    if isinstance(request.auth, dict):
+        TokenService.revoke(request.auth)
+
+    serializer = TokenSerializer(data=request.data)
+    if serializer.is_valid():
+        try:
+            TokenService.revoke(TokenService.verify(serializer.validated_data['refresh'], REFRESH))
+        except InvalidTokenError:
+            pass
+
+    return Response({'message': 'Logged out'})
+
+
 class UserListView(ListAPIView):
     """
     Get list of all users
@@ -120,6 +194,22 @@ def user_statistics(request):
     return Response(stats)
 
 
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def owner_analytics(request):
+    """
+    Occupancy rate, ADR and revenue of owner listings from daily rollups
+    GET /api/users/analytics/?date_from=2026-01-01&date_to=2026-12-31&group_by=month&listing_id=1
+    """
+    if not (request.user.is_owner or request.user.is_admin):
+        raise AccessRightsError('Analytics are available only for owners')
+
+    serializer = AnalyticsQuerySerializer(data=request.query_params)
+    serializer.is_valid(raise_exception=True)
+    analytics = BookingRollupService.owner_analytics(request.user, **serializer.validated_data)
+    return Response(analytics)
+
+
 #Favouriye views
 class FavoriteListCreateView(ListCreateAPIView):
     """
@@ -135,9 +225,10 @@ class FavoriteListCreateView(ListCreateAPIView):
     ordering = ['-created_at']
 
     def get_queryset(self):
-        """Return only current user favorites"""
+        """Return only current user favorites (deleted listings are hidden)"""
         return Favorite.objects.filter(
-            user=self.request.user
+            user=self.request.user,
+            listing__deleted_at__isnull=True
         ).select_related('listing', 'user')
 
     def create(self, request, *args, **kwargs):
@@ -190,11 +281,70 @@ class FavoriteDetailView(RetrieveUpdateDestroyAPIView):
     def destroy(self, request, *args, **kwargs):
         """Remove from favorites"""
         favorite = self.get_object()
-        favorite.delete()
-        logger.info(
-            f'User {request.user.email} removed from favorites: {favorite.listing_id}'
-        )
+        FavoriteService.remove_from_favorites(request.user, favorite.listing_id)
         return Response(
             {'message': 'Removed from favorites'},
             status=status.HTTP_204_NO_CONTENT
-        )
\ No newline at end of file
+        )
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def favorite_membership(request):
+    """
+    Which of given listings are wishlisted by current user ("heart" state)
+    GET /api/favorites/membership/?listing_ids=1,2,3
+    """
+    raw_ids = request.query_params.get('listing_ids', '')
+    serializer = FavoriteBulkSerializer(data={
+        'listing_ids': [listing_id for listing_id in raw_ids.split(',') if listing_id]
+    })
+    serializer.is_valid(raise_exception=True)
+
+    listing_ids = serializer.validated_data['listing_ids']
+    favorited = FavoriteService.favorited_ids(request.user, listing_ids)
+    return Response({
+        str(listing_id): listing_id in favorited for listing_id in listing_ids
+    })
+
+
+@api_view(['POST', 'DELETE'])
+@permission_classes([IsAuthenticated])
+def favorite_bulk(request):
+    """
+    Add / remove several listings to wishlist at once
+    POST /api/favorites/bulk/ {"listing_ids": [1, 2, 3]}
+    DELETE /api/favorites/bulk/ {"listing_ids": [1, 2, 3]}
+    """
+    serializer = FavoriteBulkSerializer(data=request.data)
+    serializer.is_valid(raise_exception=True)
+    listing_ids = serializer.validated_data['listing_ids']
+
+    if request.method == 'POST':
+        added = FavoriteService.bulk_add_to_fav(request.user, listing_ids)
+        return Response({'added': added}, status=status.HTTP_201_CREATED)
+
+    removed = FavoriteService.bulk_remove_from_fav(request.user, listing_ids)
+    return Response({'removed': removed})
+
+
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def also_saved_listings(request, listing_id):
+    """
+    People who saved this listing also saved
+    GET /api/favorites/also-saved/{listing_id}/
+    """
+    listing_ids = CoFavoriteService.get_also_saved_ids(listing_id)
+    listings = ListingService.annotate_favorited(
+        Listing.objects.filter(id__in=listing_ids, is_active=True),
+        request.user
+    ).select_related('owner', 'address').prefetch_related(ListingService.main_image_prefetch())
+    listings_by_id = {listing.id: listing for listing in listings}
+
+    serializer = ListingSerializer(
+        [listings_by_id[pk] for pk in listing_ids if pk in listings_by_id],
+        many=True,
+        context={'request': request}
+    )
+    return Response(serializer.data)